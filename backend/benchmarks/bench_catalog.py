@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Per-worker memory of the career catalog: in-process tuple vs compiled mmap.
+
+Builds a synthetic catalog of --careers careers (names, colleges and roadmap
+steps drawn from pools, as a real catalog repeats them), then in a fresh
+interpreter per variant loads it, builds the scoring model and ranks
+--profiles profiles. Reports the private (RssAnon) and file-backed, shared
+(RssFile) memory the catalog added, from /proc/self/status (Linux).
+
+    python backend/benchmarks/bench_catalog.py --careers 5000
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).parent
+BACKEND_DIR = BENCH_DIR.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+CHILD_SCRIPT = """
+import json, os, random, sys, time
+from types import MappingProxyType
+import numpy  # not part of the catalog's cost
+
+def rss():
+    fields = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            name, _, value = line.partition(":")
+            if name in ("RssAnon", "RssFile"):
+                fields[name] = int(value.split()[0])
+    return fields
+
+variant, source, profiles = sys.argv[1], sys.argv[2], int(sys.argv[3])
+before = rss()
+import career_catalog
+if variant == "tuple":
+    with open(source, encoding="utf-8") as f:
+        career_catalog.CAREER_CATALOG = tuple(MappingProxyType(json.loads(line)) for line in f)
+started = time.perf_counter()
+career_catalog.scoring_model()
+loaded = time.perf_counter() - started
+rng = random.Random(7)
+started = time.perf_counter()
+for _ in range(profiles):
+    career_catalog.rank_careers({
+        "stream": rng.choice(["Science", "Commerce", "Arts"]),
+        "marks_percentage": rng.randint(40, 99),
+        "career_interests": rng.sample(["engineering", "medical", "business", "law", "finance"], 2),
+        "strong_subjects": ["Mathematics"], "subjects": ["Mathematics", "English"], "career_goal": "Job",
+    })
+ranked = time.perf_counter() - started
+after = rss()
+print(json.dumps({
+    "catalog": type(career_catalog.CAREER_CATALOG).__name__,
+    "anon_kb": after["RssAnon"] - before["RssAnon"],
+    "file_kb": after["RssFile"] - before["RssFile"],
+    "model_ms": loaded * 1000,
+    "rank_us": ranked / profiles * 1e6,
+}))
+"""
+
+
+def synthetic_catalog(careers: int, seed: int = 1) -> list:
+    from career_catalog import BUILTIN_CATALOG
+
+    rng = random.Random(seed)
+    colleges = [f"College of Studies {i}, City {i % 97}" for i in range(max(careers // 2, 10))]
+    subjects = [f"Subject {i}" for i in range(200)] + ["Mathematics", "English", "Physics", "Economics"]
+    interests = [f"interest-{i}" for i in range(150)] + ["engineering", "medical", "business", "law", "finance"]
+    rows = []
+    for i in range(careers):
+        base = dict(BUILTIN_CATALOG[i % len(BUILTIN_CATALOG)])
+        base.update({
+            "name": f"{base['name']} #{i}",
+            "top_colleges": rng.sample(colleges, 5),
+            "roadmap": list(base["roadmap"]),
+            "streams": list(base["streams"]),
+            "interests": rng.sample(interests, 3),
+            "subjects": rng.sample(subjects, 4),
+            "goals": list(base["goals"]),
+        })
+        rows.append(base)
+    return rows
+
+
+def run(variant: str, source: str, profiles: int, env: dict) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT, variant, source, str(profiles)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--careers", type=int, default=5000)
+    parser.add_argument("--profiles", type=int, default=200, help="rankings timed per variant")
+    args = parser.parse_args()
+
+    from catalog_store import compile_catalog
+
+    careers = synthetic_catalog(args.careers)
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "careers.jsonl")
+        with open(source, "w", encoding="utf-8") as f:
+            for career in careers:
+                f.write(json.dumps(career, ensure_ascii=False) + "\n")
+        compiled = os.path.join(tmp, "career_catalog.bin")
+        report = compile_catalog(careers, compiled)
+        print(f"{args.careers} careers, {report['strings']} distinct strings, {report['bytes'] / 1024:.0f} KB compiled\n")
+
+        env = dict(os.environ, PYTHONPATH=str(BACKEND_DIR))
+        results = {
+            "tuple": run("tuple", source, args.profiles, dict(env, CAREER_CATALOG_PATH="")),
+            "mmap": run("mmap", source, args.profiles, dict(env, CAREER_CATALOG_PATH=compiled)),
+        }
+
+    print(f"{'variant':<10}{'private KB':>12}{'shared KB':>12}{'model ms':>10}{'rank us':>10}")
+    for variant, result in results.items():
+        print(f"{variant:<10}{result['anon_kb']:>12}{result['file_kb']:>12}"
+              f"{result['model_ms']:>10.1f}{result['rank_us']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the Edu9 API.
+
+Every run is a fresh interpreter, as on a new container or worker:
+
+- import: `python -X importtime -c "import server"`, reporting the total
+  and the slowest modules server imports directly
+- startup: time from `import server` until the lifespan has started (Mongo
+  via mongomock-motor, the LLM faked as in loadtest.py), i.e. ready to serve
+- warm-up: the modules the app loads lazily (numpy for the fallback ranking,
+  the tokenizer), which a preloaded gunicorn master imports once for all
+  workers
+
+    python backend/benchmarks/bench_coldstart.py --runs 5
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).parent
+BACKEND_DIR = BENCH_DIR.parent
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+STARTUP_SCRIPT = """
+import asyncio, json, sys, time
+import motor.motor_asyncio
+from mongomock_motor import AsyncMongoMockClient
+motor.motor_asyncio.AsyncIOMotorClient = AsyncMongoMockClient
+from loadtest import FakeLlmChat, FakeUserMessage
+
+started = time.perf_counter()
+import server
+server.LlmChat, server.UserMessage = FakeLlmChat, FakeUserMessage
+imported = time.perf_counter()
+
+async def main():
+    async with server.app.router.lifespan_context(server.app):
+        ready = time.perf_counter()
+        lazy = [name for name in ("numpy", "tiktoken") if name in sys.modules]
+        server.warm_up()
+        warm = time.perf_counter()
+    print(json.dumps({
+        "import_ms": (imported - started) * 1000,
+        "startup_ms": (ready - started) * 1000,
+        "warm_up_ms": (warm - ready) * 1000,
+        "loaded_before_warm_up": lazy,
+    }))
+
+asyncio.run(main())
+"""
+
+
+def child_env() -> dict:
+    env = dict(os.environ)
+    env.setdefault("MONGO_URL", "mongodb://coldstart")
+    env.setdefault("DB_NAME", "edu9_coldstart")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(BACKEND_DIR), str(BENCH_DIR), env.get("PYTHONPATH")]))
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    return env
+
+
+def import_profile() -> tuple:
+    """Total server import time and the cumulative time of each module it imports directly, in ms"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import server"],
+        cwd=BACKEND_DIR, env=child_env(), capture_output=True, text=True, check=True
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative, depth, name = int(match.group(2)) / 1000, len(match.group(3)), match.group(4)
+        if depth == 1:
+            # Children are printed before their parent: what preceded server's line is server's
+            if name == "server":
+                return cumulative, modules
+            modules = {}
+        elif depth == 3:
+            modules[name] = cumulative
+    raise RuntimeError("server not found in the -X importtime output")
+
+
+def startup_profile() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", STARTUP_SCRIPT],
+        cwd=BACKEND_DIR, env=child_env(), capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per measurement")
+    parser.add_argument("--top", type=int, default=12, help="slowest direct imports to list")
+    args = parser.parse_args()
+
+    totals, modules = [], {}
+    for _ in range(args.runs):
+        total, direct = import_profile()
+        totals.append(total)
+        for name, ms in direct.items():
+            modules.setdefault(name, []).append(ms)
+    startups = [startup_profile() for _ in range(args.runs)]
+
+    print(f"import server (-X importtime, median of {args.runs}): {statistics.median(totals):8.1f} ms")
+    slowest = sorted(modules.items(), key=lambda item: -statistics.median(item[1]))[:args.top]
+    for name, samples in slowest:
+        print(f"  {name:<40}{statistics.median(samples):8.1f} ms")
+    print()
+    for key, label in (("import_ms", "import"), ("startup_ms", "import + lifespan startup"),
+                       ("warm_up_ms", "lazy imports done, after ready")):
+        print(f"{label:<42}{statistics.median(run[key] for run in startups):8.1f} ms")
+    loaded = sorted({name for run in startups for name in run["loaded_before_warm_up"]})
+    print(f"{'loaded before warm_up':<42}{', '.join(loaded) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: career JSON extraction from recorded LLM replies.
+
+Compares the original greedy regex + json.loads with llm_json.extract_careers
+on every reply in llm_replies.jsonl, reporting parse success and time per call.
+
+    python backend/benchmarks/bench_llm_json.py [--number 2000]
+"""
+
+import argparse
+import json
+import re
+import sys
+import timeit
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+from llm_json import extract_careers  # noqa: E402
+
+CORPUS = BENCH_DIR / "llm_replies.jsonl"
+
+
+def greedy_regex(reply):
+    """The extraction generate_career_recommendations used before llm_json"""
+    match = re.search(r'\[[\s\S]*\]', reply)
+    if not match:
+        return None
+    try:
+        return json.loads(match.group())
+    except ValueError:
+        return None
+
+
+def load_corpus():
+    with open(CORPUS, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000, help="calls per reply and extractor")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    totals = {"greedy_regex": 0.0, "extract_careers": 0.0}
+    parsed = {"greedy_regex": 0, "extract_careers": 0}
+
+    print(f"{'reply':<24}{'bytes':>7}  {'regex us':>9} {'ok':>3}  {'extract us':>10} {'ok':>3}")
+    for entry in corpus:
+        reply = entry["reply"]
+        row = [f"{entry['name']:<24}{len(reply.encode('utf-8')):>7}"]
+        for name, fn in (("greedy_regex", greedy_regex), ("extract_careers", extract_careers)):
+            seconds = timeit.timeit(lambda: fn(reply), number=args.number) / args.number
+            ok = isinstance(fn(reply), list)
+            totals[name] += seconds
+            parsed[name] += ok
+            width = 9 if name == "greedy_regex" else 10
+            row.append(f"{seconds * 1e6:>{width}.1f} {'yes' if ok else 'no':>3}")
+        print("  ".join(row))
+
+    print()
+    for name in totals:
+        print(f"{name:<16} parsed {parsed[name]}/{len(corpus)} replies, "
+              f"mean {totals[name] / len(corpus) * 1e6:.1f} us per reply")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: response serialization for the read routes.
+
+Compares the model path the routes used before (Model(**doc) per document,
+then FastAPI's response_model validation and JSONResponse) with projected
+documents encoded directly by fast_json.FastJSONResponse. Documents are
+synthetic but shaped like what Mongo returns for each collection.
+
+    python backend/benchmarks/bench_serialization.py [--rows 100] [--number 500]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional
+
+BENCH_DIR = Path(__file__).parent
+sys.path.insert(0, str(BENCH_DIR))
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+from bson import ObjectId  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+
+from fast_json import FastJSONResponse, fill_defaults, model_defaults, public_projection  # noqa: E402
+from loadtest import load_app  # noqa: E402
+
+
+def booking_doc(i: int) -> dict:
+    doc = {
+        "_id": ObjectId(), "id": str(uuid.uuid4()), "user_id": "user-1", "name": f"Student {i}",
+        "phone": "9876543210", "consultation_type": "Online", "date": "2026-11-01", "time": "10:00 AM",
+        "status": "confirmed", "counsellor_id": f"counsellor-{i % 3 + 1}",
+        "created_at": datetime(2026, 10, 1) + timedelta(minutes=i),
+    }
+    if i % 2:
+        # Booked before the slot engine assigned counsellors
+        del doc["counsellor_id"]
+    return doc
+
+
+def assessment_doc() -> dict:
+    return {
+        "_id": ObjectId(), "id": str(uuid.uuid4()), "user_id": "user-1", "student_name": "Student",
+        "stream": "Science", "subjects": ["Physics", "Chemistry", "Mathematics"], "marks_percentage": 87.5,
+        "career_interests": ["engineering", "abroad"], "strong_subjects": ["Physics"], "career_goal": "Job",
+        "parent_details": {"name": "Parent", "phone": "9999999999"}, "created_at": datetime(2026, 10, 1),
+    }
+
+
+def membership_doc() -> dict:
+    return {
+        "_id": ObjectId(), "id": str(uuid.uuid4()), "user_id": "user-1", "name": "Student",
+        "phone": "9876543210", "amount": 10000, "status": "active", "payment_status": "paid",
+        "created_at": datetime(2026, 10, 1),
+    }
+
+
+def project(doc: dict, projection: dict) -> dict:
+    """What Mongo returns for the projected query"""
+    return {key: value for key, value in doc.items() if projection.get(key)}
+
+
+async def model_path(field, build, docs) -> bytes:
+    content = await serialize_response(field=field, response_content=build(docs))
+    return JSONResponse(content).body
+
+
+async def fast_path(docs, defaults) -> bytes:
+    """As the routes do it: documents older than a field get its default"""
+    if isinstance(docs, list):
+        return FastJSONResponse([fill_defaults(doc, defaults) for doc in docs]).body
+    return FastJSONResponse(fill_defaults(docs, defaults)).body
+
+
+async def timed(fn, number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        await fn()
+    return (time.perf_counter() - start) / number
+
+
+async def run(args):
+    load_app(0)
+    import server
+    cases = [
+        ("bookings", List[server.Booking], server.Booking,
+         [booking_doc(i) for i in range(args.rows)], lambda docs: [server.Booking(**b) for b in docs]),
+        ("assessment", Optional[server.Assessment], server.Assessment,
+         assessment_doc(), lambda doc: server.Assessment(**doc)),
+        ("membership", Optional[server.Membership], server.Membership,
+         membership_doc(), lambda doc: server.Membership(**doc)),
+    ]
+
+    print(f"{'route':<12}{'model us':>10}{'fast us':>10}{'speedup':>9}  same json")
+    for name, response_type, model, docs, build in cases:
+        field = create_response_field(name=f"Response_{name}", type_=response_type, mode="serialization")
+        projection = public_projection(model)
+        defaults = model_defaults(model)
+        projected = [project(d, projection) for d in docs] if isinstance(docs, list) else project(docs, projection)
+
+        slow = await timed(lambda: model_path(field, build, docs), args.number)
+        fast = await timed(lambda: fast_path(projected, defaults), args.number)
+        same = json.loads(await model_path(field, build, docs)) == json.loads(await fast_path(projected, defaults))
+        print(f"{name:<12}{slow * 1e6:>10.1f}{fast * 1e6:>10.1f}{slow / fast:>8.1f}x  {'yes' if same else 'NO'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100, help="bookings per listing")
+    parser.add_argument("--number", type=int, default=500, help="serializations per case and path")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
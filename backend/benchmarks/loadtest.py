@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Offline load test for the Edu9 API.
+
+Replays the app's user flow (skip/OTP -> assessment -> recommendations ->
+booking -> membership -> read screens) at a fixed concurrency against the
+FastAPI app in-process. MongoDB is replaced by mongomock-motor and the LLM by
+a deterministic fake with configurable latency, so runs are reproducible and
+need no network.
+
+    python backend/benchmarks/loadtest.py --users 500 --concurrency 50
+    python backend/benchmarks/loadtest.py --save-baseline backend/benchmarks/baseline.json
+    python backend/benchmarks/loadtest.py --compare backend/benchmarks/baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).parent
+BACKEND_DIR = BENCH_DIR.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+STREAMS = {
+    "Science": ["Physics", "Chemistry", "Mathematics", "Biology", "Computer Science", "English"],
+    "Commerce": ["Accountancy", "Business Studies", "Economics", "Mathematics", "English"],
+    "Arts": ["History", "Geography", "Political Science", "Economics", "Sociology", "Psychology"],
+}
+INTERESTS = ["engineering", "medical", "business", "aviation", "abroad", "law", "arts", "finance", "teaching", "government"]
+GOALS = ["Job", "Higher Studies", "Study Abroad"]
+TIME_SLOTS = ["10:00 AM", "11:00 AM", "12:00 PM", "2:00 PM", "3:00 PM", "4:00 PM", "5:00 PM"]
+
+
+class FakeUserMessage:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeLlmChat:
+    """Deterministic stand-in for LlmChat: fixed latency, careers derived from the prompt"""
+
+    latency = 1.0
+    calls = 0
+
+    def __init__(self, api_key=None, session_id=None, system_message=None):
+        self.session_id = session_id
+
+    def with_model(self, provider, model):
+        return self
+
+    async def send_message(self, message):
+        FakeLlmChat.calls += 1
+        await asyncio.sleep(self.latency)
+        seed = sum(message.text.encode("utf-8")) % 1000
+        careers = [{
+            "name": f"Career {seed}-{i}",
+            "suitability": "Matches the student's strengths and interests.",
+            "course": "B.Tech",
+            "duration": "4 years",
+            "estimated_cost": "₹4-8 Lakhs",
+            "top_colleges": ["College 1", "College 2", "College 3"],
+            "job_prospects": "Good demand.",
+            "starting_salary": "₹4-6 LPA",
+            "roadmap": ["Step 1", "Step 2", "Step 3", "Step 4"],
+        } for i in range(3)]
+        return "```json\n" + json.dumps(careers, ensure_ascii=False) + "\n```"
+
+
+def load_app(llm_latency: float, llm_concurrency: int = 0):
+    """Import the API with Mongo and the LLM replaced by local stand-ins"""
+    os.environ.setdefault("MONGO_URL", "mongodb://loadtest")
+    os.environ.setdefault("DB_NAME", "edu9_loadtest")
+    if llm_concurrency:
+        os.environ["LLM_MAX_CONCURRENCY"] = str(llm_concurrency)
+
+    import motor.motor_asyncio
+    from mongomock_motor import AsyncMongoMockClient
+    motor.motor_asyncio.AsyncIOMotorClient = AsyncMongoMockClient
+
+    import server
+    FakeLlmChat.latency = llm_latency
+    # The LLM integration is imported on first use, so these stand in for it from the start
+    server.LlmChat = FakeLlmChat
+    server.UserMessage = FakeUserMessage
+    return server.app
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+
+    async def call(self, client, route, method, url, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            ok = response.status_code < 400
+        except Exception:
+            response, ok = None, False
+        self.latencies.setdefault(route, []).append(time.perf_counter() - start)
+        if not ok:
+            self.errors[route] = self.errors.get(route, 0) + 1
+        return response
+
+
+async def user_flow(client, recorder: Recorder, rng: random.Random, profiles: list, index: int):
+    if index % 2:
+        r = await recorder.call(client, "POST /auth/skip", "POST", "/api/auth/skip")
+        user_id = r.json()["user_id"]
+        name = "Guest User"
+    else:
+        phone = f"9{index:09d}"
+        name = f"Student {index}"
+        await recorder.call(client, "POST /auth/send-otp", "POST", "/api/auth/send-otp",
+                            json={"phone": phone, "name": name})
+        r = await recorder.call(client, "POST /auth/verify-otp", "POST", "/api/auth/verify-otp",
+                                json={"phone": phone, "otp": "1234"})
+        user_id = r.json()["user_id"]
+
+    profile = rng.choice(profiles)
+    r = await recorder.call(client, "POST /assessments", "POST", "/api/assessments", json={
+        "user_id": user_id, "student_name": name, **profile,
+        "parent_name": "Parent", "parent_phone": "9999999999",
+    })
+    assessment_id = r.json()["id"]
+
+    await recorder.call(client, "POST /career-recommendations", "POST",
+                        f"/api/career-recommendations?assessment_id={assessment_id}&user_id={user_id}")
+    await recorder.call(client, "GET /career-recommendations/{user_id}", "GET", f"/api/career-recommendations/{user_id}")
+    await recorder.call(client, "GET /assessments/{user_id}", "GET", f"/api/assessments/{user_id}")
+
+    date = f"2026-11-{rng.randint(1, 28):02d}"
+    r = await recorder.call(client, "GET /slots", "GET", f"/api/slots?date={date}")
+    free = [slot["time"] for slot in r.json()["slots"] if slot["available"]] if r and r.status_code == 200 else []
+    await recorder.call(client, "POST /bookings", "POST", "/api/bookings", json={
+        "user_id": user_id, "name": name, "phone": "9999999999",
+        "consultation_type": rng.choice(["Online", "Offline"]),
+        "date": date, "time": rng.choice(free or TIME_SLOTS),
+    })
+    await recorder.call(client, "GET /bookings/{user_id}", "GET", f"/api/bookings/{user_id}")
+
+    await recorder.call(client, "POST /memberships", "POST", "/api/memberships",
+                        json={"user_id": user_id, "name": name, "phone": "9999999999"})
+    await recorder.call(client, "GET /memberships/{user_id}", "GET", f"/api/memberships/{user_id}")
+
+
+def make_profiles(rng: random.Random, count: int) -> list:
+    profiles = []
+    for _ in range(count):
+        stream = rng.choice(list(STREAMS))
+        subjects = rng.sample(STREAMS[stream], 3)
+        profiles.append({
+            "stream": stream,
+            "subjects": subjects,
+            "marks_percentage": rng.randint(45, 98),
+            "career_interests": rng.sample(INTERESTS, rng.randint(1, 3)),
+            "strong_subjects": subjects[:1],
+            "career_goal": rng.choice(GOALS),
+        })
+    return profiles
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def summarize(recorder: Recorder, elapsed: float) -> dict:
+    routes = {}
+    total = 0
+    for route, values in sorted(recorder.latencies.items()):
+        values = sorted(values)
+        total += len(values)
+        routes[route] = {
+            "count": len(values),
+            "errors": recorder.errors.get(route, 0),
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+        }
+    return {"routes": routes, "requests": total, "elapsed_s": round(elapsed, 3),
+            "requests_per_s": round(total / elapsed, 1) if elapsed else 0.0}
+
+
+def print_report(result: dict):
+    print(f"{'route':<40}{'count':>7}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for route, stats in result["routes"].items():
+        print(f"{route:<40}{stats['count']:>7}{stats['errors']:>8}"
+              f"{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}")
+    print(f"\n{result['requests']} requests in {result['elapsed_s']} s: {result['requests_per_s']} req/s, "
+          f"{result['llm_calls']} LLM calls")
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list:
+    """Routes whose p95 or the overall throughput regressed beyond tolerance"""
+    regressions = []
+    for route, stats in result["routes"].items():
+        before = baseline["routes"].get(route)
+        if not before or not before["p95_ms"]:
+            continue
+        change = (stats["p95_ms"] - before["p95_ms"]) / before["p95_ms"]
+        marker = "REGRESSION" if change > tolerance else ""
+        print(f"{route:<40} p95 {before['p95_ms']:>9.2f} -> {stats['p95_ms']:>9.2f} ms ({change:+.0%}) {marker}")
+        if marker:
+            regressions.append(route)
+    if baseline.get("requests_per_s"):
+        change = (result["requests_per_s"] - baseline["requests_per_s"]) / baseline["requests_per_s"]
+        marker = "REGRESSION" if change < -tolerance else ""
+        print(f"{'throughput':<40} {baseline['requests_per_s']:>13} -> {result['requests_per_s']:>9} req/s ({change:+.0%}) {marker}")
+        if marker:
+            regressions.append("throughput")
+    return regressions
+
+
+async def run(args) -> dict:
+    import httpx
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    app = load_app(args.llm_latency, args.llm_concurrency)
+    rng = random.Random(args.seed)
+    profiles = make_profiles(rng, args.profiles)
+    recorder = Recorder()
+    queue = asyncio.Queue()
+    for index in range(args.users):
+        queue.put_nowait(index)
+
+    async def worker(client):
+        while True:
+            try:
+                index = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await user_flow(client, recorder, rng, profiles, index)
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+            start = time.perf_counter()
+            await asyncio.gather(*(worker(client) for _ in range(args.concurrency)))
+            elapsed = time.perf_counter() - start
+
+    result = summarize(recorder, elapsed)
+    result["llm_calls"] = FakeLlmChat.calls
+    result["config"] = {k: getattr(args, k) for k in ("users", "concurrency", "profiles", "llm_latency", "llm_concurrency", "seed")}
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-process load test for the Edu9 API")
+    parser.add_argument("--users", type=int, default=200, help="user flows to replay")
+    parser.add_argument("--concurrency", type=int, default=20, help="flows running at once")
+    parser.add_argument("--profiles", type=int, default=50, help="distinct assessment profiles")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="fake LLM latency in seconds")
+    parser.add_argument("--llm-concurrency", type=int, default=8, help="LLM_MAX_CONCURRENCY for the app")
+    parser.add_argument("--seed", type=int, default=9)
+    parser.add_argument("--save-baseline", metavar="PATH", help="write results as the new baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed regression ratio")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    print_report(result)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("config") != result["config"]:
+            print("Warning: baseline was recorded with a different configuration")
+        if compare(result, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
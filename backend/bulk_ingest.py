@@ -0,0 +1,153 @@
+import csv
+import json
+from itertools import islice
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+from starlette.concurrency import run_in_threadpool
+
+# Assessment fields that hold lists; CSV cells separate items with ';' or '|'
+LIST_FIELDS = ("subjects", "career_interests", "strong_subjects")
+
+FORMATS = ("csv", "jsonl")
+
+
+def detect_format(filename: str, content_type: str) -> str:
+    name = (filename or "").lower()
+    if name.endswith((".jsonl", ".ndjson")) or "ndjson" in (content_type or "") or "jsonl" in (content_type or ""):
+        return "jsonl"
+    return "csv"
+
+
+def _split_list(value) -> List[str]:
+    if isinstance(value, list):
+        return value
+    if value is None:
+        return []
+    text = str(value).replace("|", ";")
+    return [item.strip() for item in text.split(";") if item.strip()]
+
+
+def _normalize_row(row: dict) -> dict:
+    row = {str(k).strip(): v for k, v in row.items() if k is not None}
+    for field in LIST_FIELDS:
+        if field in row:
+            row[field] = _split_list(row[field])
+    return row
+
+
+def _text_lines(file) -> Iterator[str]:
+    """Lines of a UTF-8 upload decoded one at a time, so undecodable bytes fail on their own row"""
+    first = True
+    for chunk in file:
+        # Split on \r too, as Excel's Macintosh CSV ends lines with it alone
+        for line in chunk.splitlines(keepends=True):
+            text = line.decode("utf-8")
+            if first:
+                text = text.lstrip("\ufeff")
+                first = False
+            yield text
+
+
+def iter_rows(file, fmt: str) -> Iterator[Tuple[int, object]]:
+    """Lazily yield (row_number, row) from an upload file object, one line at a time"""
+    text = _text_lines(file)
+    if fmt == "jsonl":
+        for number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield number, ValueError(f"Invalid JSON: {str(e)}")
+                continue
+            if not isinstance(row, dict):
+                yield number, ValueError("Row is not a JSON object")
+                continue
+            yield number, _normalize_row(row)
+    else:
+        reader = csv.DictReader(text)
+        # Row 1 is the header
+        for number, row in enumerate(reader, start=2):
+            yield number, _normalize_row(row)
+
+
+def _read_batch(rows: Iterator[Tuple[int, object]], size: int) -> Tuple[list, Optional[str]]:
+    """Up to size rows, and why reading had to stop when the rest of the file cannot be parsed"""
+    batch = []
+    try:
+        batch.extend(islice(rows, size))
+    except UnicodeDecodeError as e:
+        return batch, f"File is not UTF-8 text ({str(e)}), save it as CSV UTF-8 and upload the remaining rows"
+    except csv.Error as e:
+        return batch, f"Malformed CSV ({str(e)}), fix the file and upload the remaining rows"
+    return batch, None
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in e['loc']) or 'row'}: {e['msg']}" for e in error.errors()
+    )
+
+
+async def ingest_rows(
+    rows: Iterator[Tuple[int, object]],
+    collection,
+    build_document: Callable[[dict], dict],
+    batch_size: int = 500,
+) -> dict:
+    """Validate rows and write them with unordered insert_many batches.
+
+    A file that stops decoding part way ends the import with an error on
+    the first row not read; the report still lists every row inserted
+    before it, so the client knows which rows to upload again. ``failed``
+    counts only rows that were read and not inserted.
+    """
+    report = {"total_rows": 0, "inserted": 0, "failed": 0, "complete": True, "errors": [], "assessments": []}
+    last_row = 1
+
+    while report["complete"]:
+        # File reads happen off the event loop, one batch at a time
+        batch, stop_reason = await run_in_threadpool(_read_batch, rows, batch_size)
+        if batch:
+            last_row = batch[-1][0]
+        if stop_reason:
+            report["complete"] = False
+            report["errors"].append({"row": last_row + 1, "error": stop_reason})
+        if not batch:
+            break
+
+        documents = []
+        row_numbers = []
+        for number, row in batch:
+            report["total_rows"] += 1
+            if isinstance(row, Exception):
+                report["errors"].append({"row": number, "error": str(row)})
+                continue
+            try:
+                documents.append(build_document(row))
+                row_numbers.append(number)
+            except ValidationError as e:
+                report["errors"].append({"row": number, "error": _validation_message(e)})
+
+        if not documents:
+            continue
+
+        failed_indexes = set()
+        try:
+            await collection.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            for write_error in e.details.get("writeErrors", []):
+                index = write_error["index"]
+                failed_indexes.add(index)
+                report["errors"].append({"row": row_numbers[index], "error": write_error.get("errmsg", "Write failed")})
+
+        for index, document in enumerate(documents):
+            if index not in failed_indexes:
+                report["assessments"].append({"row": row_numbers[index], "id": document["id"], "user_id": document["user_id"]})
+
+    report["inserted"] = len(report["assessments"])
+    report["failed"] = report["total_rows"] - report["inserted"]
+    report["errors"].sort(key=lambda e: e["row"])
+    return report
@@ -0,0 +1,554 @@
+import logging
+import os
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import List
+
+from catalog_store import CatalogStore, source_digest
+
+# Career fields returned to the app
+CAREER_FIELDS = (
+    "name", "suitability", "course", "duration", "estimated_cost",
+    "top_colleges", "job_prospects", "starting_salary", "roadmap",
+)
+
+# Scoring weights for the fallback ranking
+STREAM_WEIGHT = 3.0
+INTEREST_WEIGHT = 2.0
+STRONG_SUBJECT_WEIGHT = 1.0
+SUBJECT_WEIGHT = 0.25
+GOAL_WEIGHT = 0.5
+MARKS_SHORTFALL_PENALTY = 0.15  # per percentage point below min_marks
+
+
+def _career(name, suitability, course, duration, estimated_cost, top_colleges, job_prospects,
+            starting_salary, roadmap, streams, interests, subjects, min_marks=0, goals=()):
+    return MappingProxyType({
+        "name": name,
+        "suitability": suitability,
+        "course": course,
+        "duration": duration,
+        "estimated_cost": estimated_cost,
+        "top_colleges": tuple(top_colleges),
+        "job_prospects": job_prospects,
+        "starting_salary": starting_salary,
+        "roadmap": tuple(roadmap),
+        "streams": tuple(streams),
+        "interests": tuple(interests),
+        "subjects": tuple(subjects),
+        "min_marks": min_marks,
+        "goals": tuple(goals),
+    })
+
+
+BUILTIN_CATALOG = (
+    # ---------- Engineering / IT ----------
+    _career(
+        "Software Engineering (B.Tech CSE)",
+        "Your strong Science background and analytical skills make you ideal for IT. High demand in India with excellent growth.",
+        "B.Tech Computer Science", "4 years", "₹4-15 Lakhs",
+        ["IITs", "NITs", "BITS Pilani", "VIT", "SRM"],
+        "Very high demand. Companies like TCS, Infosys, Google, Microsoft hire freshers regularly.",
+        "₹4-12 LPA",
+        ["Clear JEE/State entrance exam", "Get admission in B.Tech CSE", "Learn programming & projects", "Internships in 3rd year", "Campus placement in 4th year"],
+        streams=["Science"], interests=["engineering"],
+        subjects=["Mathematics", "Physics", "Computer Science"], min_marks=60, goals=["Job"],
+    ),
+    _career(
+        "Data Science & AI",
+        "Your Maths and Science skills are perfect for this futuristic field. One of the highest paying careers today.",
+        "B.Tech + M.Tech/MS in Data Science", "4-6 years", "₹5-20 Lakhs",
+        ["IITs", "IISc Bangalore", "ISI Kolkata", "IIIT Hyderabad"],
+        "Extremely high demand. Every company needs data scientists. Work from home options available.",
+        "₹8-20 LPA",
+        ["B.Tech in CSE/IT/Maths", "Learn Python, Statistics, ML", "Online certifications", "Build portfolio projects", "Apply to tech companies"],
+        streams=["Science"], interests=["engineering"],
+        subjects=["Mathematics", "Computer Science"], min_marks=70, goals=["Job", "Higher Studies"],
+    ),
+    _career(
+        "Electronics & Communication Engineering",
+        "Good at Physics and Maths? ECE leads to chip design, telecom and embedded systems, a growing sector in India.",
+        "B.Tech ECE", "4 years", "₹4-15 Lakhs",
+        ["IITs", "NITs", "BITS Pilani", "IIIT Hyderabad", "PES University"],
+        "Semiconductor and telecom companies are expanding in India. Software roles are open to ECE graduates too.",
+        "₹4-10 LPA",
+        ["Clear JEE/State entrance exam", "Join B.Tech ECE", "Learn circuits, embedded systems & VLSI", "Do core internships", "Placement or M.Tech via GATE"],
+        streams=["Science"], interests=["engineering"],
+        subjects=["Physics", "Mathematics"], min_marks=60, goals=["Job", "Higher Studies"],
+    ),
+    _career(
+        "Mechanical Engineering",
+        "Suits students who like machines, design and how things work. A core branch with jobs in manufacturing, automobiles and energy.",
+        "B.Tech Mechanical", "4 years", "₹4-12 Lakhs",
+        ["IITs", "NITs", "BITS Pilani", "RVCE Bangalore", "COEP Pune"],
+        "Steady demand in automobile, manufacturing and EV companies. PSU jobs through GATE.",
+        "₹3.5-8 LPA",
+        ["Clear JEE/State entrance exam", "Join B.Tech Mechanical", "Learn CAD and design tools", "Industrial internships", "Placement, GATE or MS abroad"],
+        streams=["Science"], interests=["engineering"],
+        subjects=["Physics", "Mathematics"], min_marks=55, goals=["Job", "Higher Studies"],
+    ),
+    _career(
+        "Architecture (B.Arch)",
+        "A mix of creativity and Maths. Ideal if you enjoy drawing, design and buildings.",
+        "B.Arch", "5 years", "₹5-15 Lakhs",
+        ["SPA Delhi", "IIT Roorkee", "CEPT Ahmedabad", "JJ School of Architecture", "NIT Trichy"],
+        "Work with architecture firms, real estate developers or start your own practice.",
+        "₹3-8 LPA",
+        ["Clear NATA/JEE Paper 2", "Join B.Arch", "Build a strong design portfolio", "Internship with an architect", "Register with Council of Architecture"],
+        streams=["Science"], interests=["arts", "engineering"],
+        subjects=["Mathematics", "Physics"], min_marks=50, goals=["Job"],
+    ),
+    _career(
+        "Biotechnology",
+        "Combines Biology with technology. Good for students who like research and life sciences.",
+        "B.Tech/B.Sc Biotechnology", "3-4 years", "₹3-10 Lakhs",
+        ["IITs", "VIT", "Manipal", "Amity University", "Anna University"],
+        "Jobs in pharma, research labs, agriculture and healthcare companies. Higher studies improve prospects.",
+        "₹3-7 LPA",
+        ["Choose B.Tech/B.Sc Biotech", "Learn lab techniques", "Research internships", "M.Sc/M.Tech or MS abroad", "Join pharma or research company"],
+        streams=["Science"], interests=["medical", "engineering"],
+        subjects=["Biology", "Chemistry"], min_marks=55, goals=["Higher Studies"],
+    ),
+    # ---------- Medical & Paramedical ----------
+    _career(
+        "Medicine (MBBS)",
+        "If you have interest in helping people and have good memory, MBBS offers a respected and stable career.",
+        "MBBS + MD/MS", "5.5 years (MBBS) + 3 years (PG)", "₹20-80 Lakhs",
+        ["AIIMS", "CMC Vellore", "JIPMER", "MAMC Delhi", "KEM Mumbai"],
+        "Always in demand. Can work in hospitals, start own clinic, or join government service.",
+        "₹6-15 LPA",
+        ["Clear NEET UG exam", "Complete MBBS from good college", "Do internship seriously", "Prepare for NEET PG", "Specialize in chosen field"],
+        streams=["Science"], interests=["medical"],
+        subjects=["Biology", "Chemistry", "Physics"], min_marks=75, goals=["Job", "Higher Studies"],
+    ),
+    _career(
+        "Dental Surgery (BDS)",
+        "A respected medical career with a shorter path than MBBS and the option of your own clinic.",
+        "BDS + MDS", "5 years (BDS) + 3 years (MDS)", "₹10-50 Lakhs",
+        ["Maulana Azad Institute of Dental Sciences", "Manipal College of Dental Sciences", "Government Dental College Mumbai"],
+        "Work in hospitals, dental chains or set up your own practice.",
+        "₹4-8 LPA",
+        ["Clear NEET UG exam", "Complete BDS", "Internship in dental hospital", "Optional MDS specialization", "Start practice or join hospital"],
+        streams=["Science"], interests=["medical"],
+        subjects=["Biology", "Chemistry"], min_marks=65, goals=["Job"],
+    ),
+    _career(
+        "Pharmacy (B.Pharm)",
+        "Good for Science students who like Chemistry and Biology. Pharma is one of India's largest industries.",
+        "B.Pharm / Pharm.D", "4-6 years", "₹3-10 Lakhs",
+        ["Jamia Hamdard", "NIPER", "Manipal College of Pharmaceutical Sciences", "BITS Pilani"],
+        "Jobs in pharma companies, hospitals, drug regulation and research.",
+        "₹3-6 LPA",
+        ["Clear state CET/NEET where required", "Join B.Pharm", "Industrial training", "M.Pharm or MBA Pharma", "Join pharma company"],
+        streams=["Science"], interests=["medical"],
+        subjects=["Chemistry", "Biology"], min_marks=50, goals=["Job", "Higher Studies"],
+    ),
+    _career(
+        "Nursing (B.Sc Nursing)",
+        "A caring profession with guaranteed demand in India and abroad.",
+        "B.Sc Nursing", "4 years", "₹2-6 Lakhs",
+        ["AIIMS", "CMC Vellore", "PGIMER Chandigarh", "Manipal College of Nursing"],
+        "Very high demand in hospitals. Excellent opportunities in UK, Canada, Gulf and Australia.",
+        "₹3-6 LPA",
+        ["Clear nursing entrance exam", "Complete B.Sc Nursing", "Clinical internship", "Register with Nursing Council", "Hospital job or work abroad"],
+        streams=["Science"], interests=["medical", "abroad"],
+        subjects=["Biology", "Chemistry"], min_marks=45, goals=["Job", "Study Abroad"],
+    ),
+    _career(
+        "Physiotherapy (BPT)",
+        "Helps patients recover movement. Suits students who like Biology and working directly with people.",
+        "Bachelor of Physiotherapy", "4.5 years", "₹3-8 Lakhs",
+        ["Manipal", "CMC Vellore", "Jamia Hamdard", "KMC Mangalore"],
+        "Demand in hospitals, sports teams and fitness centres. Private practice possible.",
+        "₹3-5 LPA",
+        ["Clear entrance exam", "Complete BPT", "Clinical internship", "MPT specialization", "Hospital job or own clinic"],
+        streams=["Science"], interests=["medical"],
+        subjects=["Biology"], min_marks=50, goals=["Job"],
+    ),
+    _career(
+        "Medical Lab Technology (BMLT)",
+        "A paramedical career with short duration and quick employment in diagnostics.",
+        "B.Sc Medical Lab Technology", "3 years", "₹1.5-4 Lakhs",
+        ["AIIMS", "PGIMER Chandigarh", "Manipal", "CMC Vellore"],
+        "Diagnostic labs and hospitals hire regularly. Growing healthcare sector.",
+        "₹2.5-4 LPA",
+        ["Join B.Sc MLT", "Learn lab and diagnostic equipment", "Internship in hospital lab", "Certifications", "Join lab or hospital"],
+        streams=["Science"], interests=["medical"],
+        subjects=["Biology", "Chemistry"], min_marks=45, goals=["Job"],
+    ),
+    # ---------- Aviation ----------
+    _career(
+        "Commercial Pilot (CPL)",
+        "If flying excites you and you have Physics and Maths, becoming a pilot is a high-paying dream career.",
+        "Commercial Pilot License training", "1.5-2 years", "₹40-80 Lakhs",
+        ["IGRUA Rae Bareli", "CAE Oxford Aviation Academy", "Bombay Flying Club", "Redbird Flight Training Academy"],
+        "Indian airlines are expanding fleets quickly and need thousands of pilots.",
+        "₹10-25 LPA",
+        ["Get DGCA Class 1 medical", "Clear DGCA theory exams", "Complete 200 flying hours", "Obtain CPL", "Type rating and airline joining"],
+        streams=["Science"], interests=["aviation"],
+        subjects=["Physics", "Mathematics"], min_marks=50, goals=["Job"],
+    ),
+    _career(
+        "Aircraft Maintenance Engineering (AME)",
+        "Keeps aircraft safe to fly. Ideal for Science students who like machines and aviation.",
+        "AME (DGCA approved)", "3-4 years", "₹5-12 Lakhs",
+        ["Hindustan Institute of Aeronautics", "Jet Aircraft Maintenance Engineering Academy", "Rajiv Gandhi Aviation Academy"],
+        "Airlines and MRO companies need licensed engineers. Good salary growth with licenses.",
+        "₹4-8 LPA",
+        ["Join DGCA approved AME institute", "Complete modules and exams", "Practical training at MRO", "Obtain AME license", "Join airline or MRO"],
+        streams=["Science"], interests=["aviation", "engineering"],
+        subjects=["Physics", "Mathematics"], min_marks=50, goals=["Job"],
+    ),
+    _career(
+        "Aviation & Airport Management",
+        "Business roles in the aviation industry, open to students from every stream.",
+        "BBA Aviation / MBA Airport Management", "3 years", "₹3-8 Lakhs",
+        ["Rajiv Gandhi Aviation Academy", "Amity School of Aviation", "University of Petroleum and Energy Studies"],
+        "Jobs with airlines, airports, cargo and ground handling companies.",
+        "₹3-6 LPA",
+        ["Join BBA Aviation", "Learn airline and airport operations", "Internship at an airport", "Optional MBA", "Join airline or airport operator"],
+        streams=["Science", "Commerce", "Arts"], interests=["aviation", "business"],
+        subjects=["English", "Business Studies"], min_marks=45, goals=["Job"],
+    ),
+    _career(
+        "Cabin Crew & Hospitality",
+        "Great for confident, well-spoken students who love travel and meeting people.",
+        "Cabin Crew / Hospitality Diploma", "6 months - 1 year", "₹1-3 Lakhs",
+        ["Frankfinn Institute", "Air Hostess Academy", "IHM Hotel Management Institutes"],
+        "Airlines recruit regularly. International carriers pay very well.",
+        "₹3-6 LPA",
+        ["Complete 12th with good communication", "Join cabin crew course", "Grooming and language training", "Airline interviews", "Join domestic or international airline"],
+        streams=["Science", "Commerce", "Arts"], interests=["aviation"],
+        subjects=["English"], min_marks=0, goals=["Job"],
+    ),
+    # ---------- Commerce, Management & Finance ----------
+    _career(
+        "Chartered Accountancy (CA)",
+        "Your Commerce background is perfect for CA. Most respected finance career in India with excellent income.",
+        "CA Foundation + Intermediate + Final", "4-5 years", "₹1-3 Lakhs",
+        ["ICAI (Institute of Chartered Accountants)"],
+        "Very high demand in companies, audit firms, and self-practice. Can earn very well.",
+        "₹7-15 LPA",
+        ["Register for CA Foundation", "Clear Foundation exam", "Complete articleship training", "Clear Intermediate & Final", "Join firm or start practice"],
+        streams=["Commerce"], interests=["finance"],
+        subjects=["Accountancy", "Economics", "Mathematics"], min_marks=55, goals=["Job"],
+    ),
+    _career(
+        "BBA + MBA",
+        "Great path for business and management career. Opens doors to corporate leadership roles.",
+        "BBA + MBA", "3 + 2 years", "₹10-25 Lakhs",
+        ["IIMs", "XLRI", "FMS Delhi", "SP Jain", "Christ University"],
+        "Wide range of jobs - Marketing, Finance, HR, Operations in top companies.",
+        "₹6-25 LPA (depends on college)",
+        ["Complete BBA from good college", "Gain 1-2 years work experience", "Prepare for CAT/XAT", "Get into top MBA college", "Summer internship & placement"],
+        streams=["Commerce", "Science", "Arts"], interests=["business"],
+        subjects=["Business Studies", "Economics"], min_marks=50, goals=["Job", "Higher Studies"],
+    ),
+    _career(
+        "Investment Banking & Finance",
+        "If you love numbers and markets, this is one of the highest paying careers in Commerce stream.",
+        "B.Com + CFA/MBA Finance", "5-6 years", "₹8-20 Lakhs",
+        ["SRCC Delhi", "St. Xavier's", "Narsee Monjee", "Christ University"],
+        "Jobs in banks, mutual funds, stock broking. Can earn very high with experience.",
+        "₹6-15 LPA",
+        ["B.Com from top college", "Learn about stock markets", "Do CFA or MBA Finance", "Internship in finance sector", "Join investment firm"],
+        streams=["Commerce"], interests=["finance", "business"],
+        subjects=["Accountancy", "Economics", "Mathematics"], min_marks=65, goals=["Job", "Higher Studies"],
+    ),
+    _career(
+        "Company Secretary (CS)",
+        "A professional course for Commerce students interested in company law and corporate governance.",
+        "CS Executive + Professional", "3-4 years", "₹1-2 Lakhs",
+        ["ICSI (Institute of Company Secretaries of India)"],
+        "Every listed company needs a Company Secretary. Stable corporate career.",
+        "₹4-10 LPA",
+        ["Register for CSEET", "Clear CS Executive", "Complete practical training", "Clear CS Professional", "Join company or practice"],
+        streams=["Commerce"], interests=["finance", "law"],
+        subjects=["Accountancy", "Business Studies"], min_marks=50, goals=["Job"],
+    ),
+    _career(
+        "Actuarial Science",
+        "For students excellent at Maths and Statistics. One of the best paid and rarest professions.",
+        "Actuarial exams (IAI) + B.Sc Statistics/Maths", "4-6 years", "₹2-6 Lakhs",
+        ["Institute of Actuaries of India", "Christ University", "Amity University"],
+        "Insurance and consulting firms pay very well. Few qualified actuaries in India.",
+        "₹6-12 LPA",
+        ["Clear ACET exam", "Study Statistics or Maths degree", "Clear actuarial papers", "Internship in insurance firm", "Join insurer or consultancy"],
+        streams=["Commerce", "Science"], interests=["finance"],
+        subjects=["Mathematics", "Economics"], min_marks=70, goals=["Job"],
+    ),
+    _career(
+        "Hotel Management",
+        "Suits outgoing students who enjoy hospitality, food and travel.",
+        "BHM / B.Sc Hospitality", "3-4 years", "₹4-12 Lakhs",
+        ["IHM Pusa Delhi", "IHM Mumbai", "Welcomgroup Manipal", "Oberoi STEP"],
+        "Hotels, airlines, cruise lines and restaurants hire regularly in India and abroad.",
+        "₹3-6 LPA",
+        ["Clear NCHM JEE", "Join Hotel Management", "Industrial training in hotels", "Choose department", "Join hotel chain or start venture"],
+        streams=["Commerce", "Arts", "Science"], interests=["business"],
+        subjects=["English", "Business Studies"], min_marks=45, goals=["Job"],
+    ),
+    _career(
+        "Digital Marketing",
+        "Creative and data-driven career that any stream can enter. Growing fast with online business.",
+        "BBA Marketing / Digital Marketing Certification", "1-3 years", "₹1-5 Lakhs",
+        ["MICA Ahmedabad", "Symbiosis", "Christ University", "Online certifications (Google, Meta)"],
+        "Every company needs digital presence. Freelancing and remote work possible.",
+        "₹3-7 LPA",
+        ["Learn SEO, social media and ads", "Get certified", "Build portfolio with real projects", "Internship at agency", "Join brand or agency"],
+        streams=["Commerce", "Arts", "Science"], interests=["business", "arts"],
+        subjects=["English", "Business Studies", "Economics"], min_marks=0, goals=["Job"],
+    ),
+    _career(
+        "Banking (IBPS/SBI PO)",
+        "Secure government bank jobs with good work-life balance, open to graduates of any stream.",
+        "Any Graduation + Bank PO exams", "3-4 years", "₹1-3 Lakhs",
+        ["Any recognized university", "Coaching: any reputed bank exam institute"],
+        "Public sector banks recruit thousands every year. Promotions to manager level.",
+        "₹6-9 LPA",
+        ["Complete graduation", "Prepare for IBPS/SBI PO", "Clear Prelims and Mains", "Clear Interview", "Join as Probationary Officer"],
+        streams=["Commerce", "Science", "Arts"], interests=["finance", "government"],
+        subjects=["Mathematics", "Economics", "English"], min_marks=0, goals=["Job"],
+    ),
+    # ---------- Arts, Law & Humanities ----------
+    _career(
+        "Law (LLB)",
+        "Arts students excel in Law. Great career for those who like arguments, reading, and helping people.",
+        "BA LLB / LLB", "5 years (Integrated) / 3 years", "₹3-15 Lakhs",
+        ["NLSIU Bangalore", "NALSAR Hyderabad", "NLU Delhi", "NUJS Kolkata"],
+        "Work as advocate, legal advisor, judge, or in corporate legal teams.",
+        "₹4-12 LPA",
+        ["Clear CLAT/AILET exam", "Complete law degree", "Internships under senior lawyers", "Enroll with Bar Council", "Start practice or join firm"],
+        streams=["Arts", "Commerce", "Science"], interests=["law"],
+        subjects=["Political Science", "History", "English"], min_marks=50, goals=["Job"],
+    ),
+    _career(
+        "Journalism & Mass Communication",
+        "If you love writing, speaking, and staying updated, media is exciting and rewarding.",
+        "BA/BMM in Journalism", "3 years", "₹2-8 Lakhs",
+        ["IIMC Delhi", "Xavier's Mumbai", "Symbiosis Pune", "ACJ Chennai"],
+        "Work in news channels, newspapers, digital media, PR agencies.",
+        "₹3-8 LPA",
+        ["Complete Journalism degree", "Internship at media house", "Build portfolio of work", "Specialize in area of interest", "Join media organization"],
+        streams=["Arts"], interests=["arts"],
+        subjects=["English", "Political Science", "Sociology"], min_marks=0, goals=["Job"],
+    ),
+    _career(
+        "Civil Services (IAS/IPS)",
+        "Arts graduates have high success rate in UPSC. Most prestigious career to serve nation.",
+        "Any Graduation + UPSC Prep", "3-5 years", "₹2-5 Lakhs (coaching)",
+        ["Any recognized university", "Coaching: Vajiram, Vision IAS"],
+        "Become IAS, IPS, IFS officer. Lead government departments. Serve nation.",
+        "₹8-12 LPA + perks",
+        ["Complete graduation", "Start UPSC preparation", "Clear Prelims exam", "Clear Mains exam", "Clear Interview & training"],
+        streams=["Arts", "Science", "Commerce"], interests=["government"],
+        subjects=["History", "Political Science", "Geography", "Economics"], min_marks=0, goals=["Job"],
+    ),
+    _career(
+        "Design (Fashion / Product / UI-UX)",
+        "For creative students who love drawing, style or technology. Design careers are booming.",
+        "B.Des", "4 years", "₹6-20 Lakhs",
+        ["NID Ahmedabad", "NIFT", "IIT Bombay IDC", "Srishti Manipal", "Pearl Academy"],
+        "Jobs with fashion brands, product companies, tech firms and design studios.",
+        "₹4-10 LPA",
+        ["Prepare for NID/NIFT/UCEED", "Build creative portfolio", "Complete B.Des", "Internships with studios", "Join company or freelance"],
+        streams=["Arts", "Science", "Commerce"], interests=["arts"],
+        subjects=["English"], min_marks=0, goals=["Job"],
+    ),
+    _career(
+        "Psychology",
+        "Understanding people and helping them with mental health. A growing and meaningful career.",
+        "BA/B.Sc Psychology + MA", "5 years", "₹3-10 Lakhs",
+        ["Delhi University", "Christ University", "Fergusson College", "TISS Mumbai"],
+        "Counsellors, clinical psychologists and HR professionals are in rising demand.",
+        "₹3-6 LPA",
+        ["Complete BA/B.Sc Psychology", "Masters in chosen specialization", "Supervised practice", "RCI license for clinical work", "Practice or join organization"],
+        streams=["Arts", "Science"], interests=["medical", "teaching"],
+        subjects=["Psychology", "Sociology", "Biology"], min_marks=50, goals=["Higher Studies", "Job"],
+    ),
+    _career(
+        "Teaching (B.Ed)",
+        "If you enjoy explaining things and working with children, teaching is stable and respected.",
+        "Graduation + B.Ed", "5 years", "₹1-4 Lakhs",
+        ["Regional Institutes of Education", "Delhi University", "Banaras Hindu University", "Jamia Millia Islamia"],
+        "Schools always need teachers. Government teaching jobs through CTET/TET are secure.",
+        "₹3-6 LPA",
+        ["Complete graduation in your subject", "Complete B.Ed", "Clear CTET/State TET", "Teaching internship", "Join school"],
+        streams=["Arts", "Science", "Commerce"], interests=["teaching"],
+        subjects=["English", "History", "Mathematics"], min_marks=0, goals=["Job"],
+    ),
+    _career(
+        "Professor & Research (UGC NET / PhD)",
+        "For students who love a subject deeply and want to teach in colleges or do research.",
+        "Graduation + Masters + NET/PhD", "5-8 years", "₹2-6 Lakhs",
+        ["Delhi University", "JNU", "IISc Bangalore", "University of Hyderabad"],
+        "Colleges and universities hire NET/PhD qualified faculty. Research fellowships available.",
+        "₹5-10 LPA",
+        ["Graduate in chosen subject", "Complete Masters", "Clear UGC NET/CSIR NET", "PhD with fellowship", "Join college or research institute"],
+        streams=["Arts", "Science", "Commerce"], interests=["teaching"],
+        subjects=["History", "Economics", "Physics", "Mathematics"], min_marks=60, goals=["Higher Studies"],
+    ),
+    _career(
+        "Defence Services (NDA)",
+        "A disciplined and honoured career serving the nation, right after 12th.",
+        "NDA / CDS entry", "3 years + training", "Free (government funded)",
+        ["National Defence Academy Pune", "Indian Military Academy", "Indian Naval Academy", "Air Force Academy"],
+        "Commissioned officer in Army, Navy or Air Force with excellent benefits.",
+        "₹8-12 LPA + perks",
+        ["Clear NDA written exam", "Clear SSB interview", "Medical fitness", "Training at NDA", "Commission as officer"],
+        streams=["Science", "Arts", "Commerce"], interests=["government"],
+        subjects=["Mathematics", "Physics", "English"], min_marks=0, goals=["Job"],
+    ),
+    # ---------- Study Abroad ----------
+    _career(
+        "MS / Bachelor's Abroad in Computer Science",
+        "Study in the USA, Canada, Germany or Australia and gain global exposure with strong tech job prospects.",
+        "Bachelor's/Master's in Computer Science abroad", "3-4 years", "₹20-60 Lakhs",
+        ["University of Toronto", "TU Munich", "University of Melbourne", "Arizona State University"],
+        "Work permits after study in many countries. Global tech companies hire international graduates.",
+        "₹25-60 LPA (abroad)",
+        ["Prepare for IELTS/TOEFL and SAT/GRE", "Shortlist universities", "Apply with SOP and LORs", "Arrange education loan/scholarship", "Apply for student visa"],
+        streams=["Science"], interests=["abroad", "engineering"],
+        subjects=["Mathematics", "Computer Science"], min_marks=65, goals=["Study Abroad"],
+    ),
+    _career(
+        "MBBS Abroad",
+        "A practical route to becoming a doctor if NEET government seats are hard to get.",
+        "MBBS abroad (NMC recognized)", "6 years", "₹20-50 Lakhs",
+        ["Tbilisi State Medical University", "Kazan Federal University", "Kathmandu University", "University of the Philippines"],
+        "Clear NExT/FMGE to practise in India, or work abroad after licensing.",
+        "₹6-12 LPA",
+        ["Qualify NEET UG", "Choose NMC recognized university", "Apply and get visa", "Complete MBBS and internship", "Clear FMGE/NExT"],
+        streams=["Science"], interests=["abroad", "medical"],
+        subjects=["Biology", "Chemistry"], min_marks=50, goals=["Study Abroad"],
+    ),
+    _career(
+        "Business & Management Abroad",
+        "International business degrees open global careers in consulting, finance and marketing.",
+        "BBA/BBM or MBA abroad", "3-4 years", "₹25-70 Lakhs",
+        ["University of Manchester", "University of British Columbia", "Monash University", "National University of Singapore"],
+        "Post-study work visas help graduates gain international experience.",
+        "₹20-50 LPA (abroad)",
+        ["Prepare for IELTS/TOEFL", "Shortlist universities", "Apply with SOP and LORs", "Arrange funds/scholarship", "Apply for student visa"],
+        streams=["Commerce", "Arts", "Science"], interests=["abroad", "business", "finance"],
+        subjects=["Business Studies", "Economics", "English"], min_marks=60, goals=["Study Abroad"],
+    ),
+)
+
+
+# Compiled by `python catalog_store.py compile`; every worker maps the same file read-only
+CATALOG_PATH = os.environ.get('CAREER_CATALOG_PATH', str(Path(__file__).parent / 'career_catalog.bin'))
+
+
+def load_catalog():
+    """The compiled catalog when a current one exists, else the built-in tuple"""
+    if not CATALOG_PATH or not os.path.exists(CATALOG_PATH):
+        return BUILTIN_CATALOG
+    try:
+        store = CatalogStore(CATALOG_PATH)
+    except (OSError, ValueError) as e:
+        logging.warning(f"Could not map the compiled career catalog, using the built-in one: {str(e)}")
+        return BUILTIN_CATALOG
+    if store.builtin and store.source_digest != source_digest(BUILTIN_CATALOG):
+        logging.warning(f"{CATALOG_PATH} is older than the built-in catalog, run catalog_store.py compile")
+        return BUILTIN_CATALOG
+    return store
+
+
+CAREER_CATALOG = load_catalog()
+
+
+def _vocabulary(field: str) -> dict:
+    values = sorted({v.lower() for career in CAREER_CATALOG for v in career[field]})
+    return {v: i for i, v in enumerate(values)}
+
+
+class ScoringModel:
+    """Precompiled feature matrices, one row per career"""
+
+    def __init__(self):
+        import numpy as np
+
+        self.np = np
+        if isinstance(CAREER_CATALOG, CatalogStore):
+            self._load(CAREER_CATALOG)
+            return
+        self.streams = _vocabulary("streams")
+        self.interests = _vocabulary("interests")
+        self.subjects = _vocabulary("subjects")
+        self.goals = _vocabulary("goals")
+        self.stream_matrix = self._matrix("streams", self.streams)
+        self.interest_matrix = self._matrix("interests", self.interests)
+        self.subject_matrix = self._matrix("subjects", self.subjects)
+        self.goal_matrix = self._matrix("goals", self.goals)
+        self.min_marks = np.array([career["min_marks"] for career in CAREER_CATALOG], dtype=np.float32)
+
+    def _load(self, store: CatalogStore):
+        """Views over the matrices compiled into the mapped file, nothing copied per worker"""
+        self.streams = store.vocabulary("streams")
+        self.interests = store.vocabulary("interests")
+        self.subjects = store.vocabulary("subjects")
+        self.goals = store.vocabulary("goals")
+        self.stream_matrix = self._view(store, "streams", self.streams)
+        self.interest_matrix = self._view(store, "interests", self.interests)
+        self.subject_matrix = self._view(store, "subjects", self.subjects)
+        self.goal_matrix = self._view(store, "goals", self.goals)
+        self.min_marks = self.np.frombuffer(store.min_marks_buffer(), dtype=self.np.float32)
+
+    def _view(self, store: CatalogStore, field: str, vocabulary: dict):
+        return self.np.frombuffer(store.matrix_buffer(field), dtype=self.np.float32).reshape(len(store), len(vocabulary))
+
+    def _matrix(self, field: str, vocabulary: dict):
+        matrix = self.np.zeros((len(CAREER_CATALOG), len(vocabulary)), dtype=self.np.float32)
+        for row, career in enumerate(CAREER_CATALOG):
+            for value in career[field]:
+                matrix[row, vocabulary[value.lower()]] = 1.0
+        return matrix
+
+    def one_hot(self, values, vocabulary: dict):
+        vector = self.np.zeros(len(vocabulary), dtype=self.np.float32)
+        for value in values or []:
+            index = vocabulary.get(str(value).strip().lower())
+            if index is not None:
+                vector[index] = 1.0
+        return vector
+
+
+@lru_cache(maxsize=None)
+def scoring_model() -> ScoringModel:
+    """The shared scoring model, built on first use so importing the catalog does not import numpy"""
+    return ScoringModel()
+
+
+def score_careers(assessment: dict):
+    """Score every catalog career against the student profile in one batched pass"""
+    model = scoring_model()
+    try:
+        marks = float(assessment.get('marks_percentage', 70))
+    except (TypeError, ValueError):
+        marks = 70.0
+
+    scores = STREAM_WEIGHT * (model.stream_matrix @ model.one_hot([assessment.get('stream', 'Science')], model.streams))
+    scores += INTEREST_WEIGHT * (model.interest_matrix @ model.one_hot(assessment.get('career_interests'), model.interests))
+    scores += STRONG_SUBJECT_WEIGHT * (model.subject_matrix @ model.one_hot(assessment.get('strong_subjects'), model.subjects))
+    scores += SUBJECT_WEIGHT * (model.subject_matrix @ model.one_hot(assessment.get('subjects'), model.subjects))
+    scores += GOAL_WEIGHT * (model.goal_matrix @ model.one_hot([assessment.get('career_goal')], model.goals))
+    scores -= MARKS_SHORTFALL_PENALTY * model.np.maximum(model.min_marks - marks, 0.0)
+    return scores
+
+
+def career_payload(career) -> dict:
+    """Mutable API copy of a catalog career"""
+    payload = {field: career[field] for field in CAREER_FIELDS}
+    payload["top_colleges"] = list(career["top_colleges"])
+    payload["roadmap"] = list(career["roadmap"])
+    return payload
+
+
+def rank_careers(assessment: dict, limit: int = 3) -> List[dict]:
+    """Top catalog careers for the student, best match first"""
+    scores = score_careers(assessment)
+    # Stable sort keeps catalog order between equal scores
+    order = scoring_model().np.argsort(-scores, kind="stable")[:limit]
+    return [career_payload(CAREER_CATALOG[i]) for i in order]
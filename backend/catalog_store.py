@@ -0,0 +1,268 @@
+"""Compiled, memory-mapped career catalog.
+
+The catalog is compiled offline into one little-endian file: a table of
+interned UTF-8 strings, fixed-width career records of string ids, a pool of
+string ids for the list fields, and the scoring vocabularies and feature
+matrices already laid out as float32 arrays. Workers map the file
+read-only, so the pages live once in the OS page cache however many
+workers serve it, and careers are read through __slots__ views without
+being copied into Python objects first.
+
+    python catalog_store.py compile                      # the built-in catalog
+    python catalog_store.py compile --source careers.jsonl --output /data/career_catalog.bin
+    python catalog_store.py info career_catalog.bin
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import operator
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+MAGIC = b"EDU9CAT\x00"
+FORMAT_VERSION = 1
+# Compiled from the catalog in career_catalog.py, so it can be checked for staleness
+FLAG_BUILTIN = 1
+
+SCALAR_FIELDS = ("name", "suitability", "course", "duration", "estimated_cost", "job_prospects", "starting_salary")
+LIST_FIELDS = ("top_colleges", "roadmap", "streams", "interests", "subjects", "goals")
+# Fields the fallback ranking one-hot encodes
+FEATURE_FIELDS = ("streams", "interests", "subjects", "goals")
+FIELDS = SCALAR_FIELDS + LIST_FIELDS + ("min_marks",)
+# Per career: one string id per scalar field, (start, count) in the list pool per list field
+RECORD_WIDTH = len(SCALAR_FIELDS) + 2 * len(LIST_FIELDS)
+
+SECTIONS = (
+    ["string_offsets", "string_data", "records", "list_pool", "min_marks"]
+    + [f"vocabulary_{field}" for field in FEATURE_FIELDS]
+    + [f"matrix_{field}" for field in FEATURE_FIELDS]
+)
+_HEADER = struct.Struct("<8sIIII32s")
+_SECTION = struct.Struct("<QQ")
+_ALIGN = 8
+
+_SCALAR_INDEX = {field: i for i, field in enumerate(SCALAR_FIELDS)}
+_LIST_INDEX = {field: len(SCALAR_FIELDS) + 2 * i for i, field in enumerate(LIST_FIELDS)}
+
+
+class CatalogFormatError(ValueError):
+    pass
+
+
+def source_digest(careers: Iterable[Mapping]) -> bytes:
+    """sha256 of the catalog content, to tell whether a compiled file is current"""
+    canonical = [
+        {field: list(career[field]) if field in LIST_FIELDS else career.get(field, 0) for field in FIELDS}
+        for career in careers
+    ]
+    return hashlib.sha256(json.dumps(canonical, ensure_ascii=False, sort_keys=True).encode("utf-8")).digest()
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def compile_catalog(careers: Sequence[Mapping], path, builtin: bool = False) -> dict:
+    """Write careers to path in the compiled format, atomically replacing any previous file"""
+    strings: Dict[str, int] = {}
+
+    def intern(value) -> int:
+        value = str(value)
+        if value not in strings:
+            strings[value] = len(strings)
+        return strings[value]
+
+    records, pool, min_marks = array("I"), array("I"), array("f")
+    for career in careers:
+        records.extend(intern(career[field]) for field in SCALAR_FIELDS)
+        for field in LIST_FIELDS:
+            values = list(career[field])
+            records.extend((len(pool), len(values)))
+            pool.extend(intern(value) for value in values)
+        min_marks.append(float(career.get("min_marks", 0)))
+
+    sections = {"records": records, "list_pool": pool, "min_marks": min_marks}
+    for field in FEATURE_FIELDS:
+        vocabulary = sorted({value.lower() for career in careers for value in career[field]})
+        columns = {value: column for column, value in enumerate(vocabulary)}
+        matrix = array("f", bytes(4 * len(careers) * len(vocabulary)))
+        for row, career in enumerate(careers):
+            for value in career[field]:
+                matrix[row * len(vocabulary) + columns[value.lower()]] = 1.0
+        sections[f"vocabulary_{field}"] = array("I", (intern(value) for value in vocabulary))
+        sections[f"matrix_{field}"] = matrix
+
+    # Interning is done once every string has been seen
+    encoded = [value.encode("utf-8") for value in strings]
+    offsets = array("I", [0])
+    for value in encoded:
+        offsets.append(offsets[-1] + len(value))
+    sections["string_offsets"] = offsets
+    payloads = [
+        b"".join(encoded) if name == "string_data" else _little_endian(sections[name])
+        for name in SECTIONS
+    ]
+
+    position = _HEADER.size + _SECTION.size * len(SECTIONS)
+    table, body = [], []
+    for payload in payloads:
+        padding = -position % _ALIGN
+        body.append(b"\0" * padding)
+        position += padding
+        table.append(_SECTION.pack(position, len(payload)))
+        body.append(payload)
+        position += len(payload)
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, len(careers), FLAG_BUILTIN if builtin else 0,
+                          len(SECTIONS), source_digest(careers))
+
+    path = Path(path)
+    temporary = path.with_name(path.name + ".tmp")
+    with open(temporary, "wb") as f:
+        f.write(header)
+        f.writelines(table)
+        f.writelines(body)
+    # Workers that mapped the old file keep reading it until they reload
+    os.replace(temporary, path)
+    return {"careers": len(careers), "strings": len(strings), "bytes": position}
+
+
+class CareerView(Mapping):
+    """Read-only career backed by the mapped file, shaped like the built-in catalog entries"""
+
+    __slots__ = ("_store", "_record")
+
+    def __init__(self, store: "CatalogStore", index: int):
+        self._store = store
+        self._record = index * RECORD_WIDTH
+
+    def __getitem__(self, field: str):
+        store = self._store
+        if field in _SCALAR_INDEX:
+            return store.string(store._records[self._record + _SCALAR_INDEX[field]])
+        if field in _LIST_INDEX:
+            start = store._records[self._record + _LIST_INDEX[field]]
+            count = store._records[self._record + _LIST_INDEX[field] + 1]
+            return tuple(store.string(string_id) for string_id in store._pool[start:start + count])
+        if field == "min_marks":
+            value = store._min_marks[self._record // RECORD_WIDTH]
+            return int(value) if value.is_integer() else value
+        raise KeyError(field)
+
+    def __iter__(self):
+        return iter(FIELDS)
+
+    def __len__(self) -> int:
+        return len(FIELDS)
+
+    def __repr__(self) -> str:
+        return f"CareerView({self['name']!r})"
+
+
+class CatalogStore(Sequence):
+    """The compiled catalog mapped read-only; indexing returns CareerView objects"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        if sys.byteorder != "little":
+            raise CatalogFormatError("The compiled catalog is little-endian only")
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self._mmap)
+        if len(buffer) < _HEADER.size:
+            raise CatalogFormatError(f"{self.path} is not a compiled catalog")
+        magic, version, self._count, self.flags, section_count, self.source_digest = _HEADER.unpack_from(buffer)
+        if magic != MAGIC or version != FORMAT_VERSION or section_count != len(SECTIONS):
+            raise CatalogFormatError(f"{self.path} is not a version {FORMAT_VERSION} compiled catalog")
+        self._sections = {}
+        for i, name in enumerate(SECTIONS):
+            offset, length = _SECTION.unpack_from(buffer, _HEADER.size + i * _SECTION.size)
+            if offset + length > len(buffer):
+                raise CatalogFormatError(f"{self.path} is truncated")
+            self._sections[name] = buffer[offset:offset + length]
+        self._string_offsets = self._sections["string_offsets"].cast("I")
+        self._string_data = self._sections["string_data"]
+        self._records = self._sections["records"].cast("I")
+        self._pool = self._sections["list_pool"].cast("I")
+        self._min_marks = self._sections["min_marks"].cast("f")
+
+    @property
+    def builtin(self) -> bool:
+        return bool(self.flags & FLAG_BUILTIN)
+
+    def string(self, string_id: int) -> str:
+        return str(self._string_data[self._string_offsets[string_id]:self._string_offsets[string_id + 1]], "utf-8")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        index = operator.index(index)
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("career index out of range")
+        return CareerView(self, index)
+
+    def vocabulary(self, field: str) -> Dict[str, int]:
+        """Lowercased feature values of a scoring field, mapped to their matrix column"""
+        return {self.string(string_id): column
+                for column, string_id in enumerate(self._sections[f"vocabulary_{field}"].cast("I"))}
+
+    def matrix_buffer(self, field: str) -> memoryview:
+        """Row-major float32 one-hot matrix, one row per career and one column per vocabulary value"""
+        return self._sections[f"matrix_{field}"]
+
+    def min_marks_buffer(self) -> memoryview:
+        return self._sections["min_marks"]
+
+    def info(self) -> dict:
+        return {
+            "path": self.path,
+            "careers": self._count,
+            "strings": len(self._string_offsets) - 1,
+            "bytes": len(self._mmap),
+            "builtin": self.builtin,
+            "source_digest": self.source_digest.hex()[:16],
+        }
+
+
+def _read_jsonl(path) -> List[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compile or inspect the memory-mapped career catalog")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    compile_parser = subcommands.add_parser("compile", help="compile a catalog into the binary format")
+    compile_parser.add_argument("--source", help="JSONL with one career per line (default: the built-in catalog)")
+    compile_parser.add_argument("--output", help="default: CAREER_CATALOG_PATH or career_catalog.bin next to this file")
+    info_parser = subcommands.add_parser("info", help="describe a compiled catalog")
+    info_parser.add_argument("path", nargs="?")
+    args = parser.parse_args(argv)
+
+    from career_catalog import BUILTIN_CATALOG, CATALOG_PATH
+
+    if args.command == "compile":
+        careers = _read_jsonl(args.source) if args.source else BUILTIN_CATALOG
+        report = compile_catalog(careers, args.output or CATALOG_PATH, builtin=not args.source)
+    else:
+        report = CatalogStore(args.path or CATALOG_PATH).info()
+    for name, value in report.items():
+        print(f"{name:<16}{value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
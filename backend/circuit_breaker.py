@@ -0,0 +1,121 @@
+import time
+from collections import deque
+from typing import Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Gauge values for /api/metrics
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpen(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """Stops calling a dependency while its recent calls mostly fail or run slow.
+
+    Calls are judged over a rolling time window. Once at least min_calls
+    were seen and the share of failed or slow ones reaches failure_ratio,
+    the circuit opens and allow() raises CircuitOpen for open_seconds. It
+    then half-opens and lets a single probe through: success closes the
+    circuit, failure opens it again. allow() hands the probe a token, and
+    only results reported with that token decide the half-open state, so
+    calls that started earlier cannot close it or free the probe's place.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float = 60,
+        min_calls: int = 10,
+        failure_ratio: float = 0.5,
+        slow_call_seconds: float = 20,
+        open_seconds: float = 30,
+    ):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.failure_ratio = failure_ratio
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe: Optional[object] = None
+        # (finished_at, failed_or_slow)
+        self._calls: deque = deque()
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._probe = None
+        return self._state
+
+    def allow(self) -> Optional[object]:
+        """Raise CircuitOpen unless a call may go ahead now.
+
+        Returns the probe token when the call is the half-open probe, else
+        None. Pass it to record_success/record_failure, and to release() in
+        a finally block so a probe that never reached the dependency frees
+        its place.
+        """
+        state = self.state
+        if state == OPEN or (state == HALF_OPEN and self._probe is not None):
+            self.rejected += 1
+            raise CircuitOpen(f"{self.name} circuit is {state}")
+        if state == HALF_OPEN:
+            self._probe = object()
+            return self._probe
+        return None
+
+    def record_success(self, seconds: float, probe: Optional[object] = None):
+        self._record(seconds >= self.slow_call_seconds, probe)
+
+    def record_failure(self, probe: Optional[object] = None):
+        self._record(True, probe)
+
+    def release(self, probe: Optional[object] = None):
+        """The call ended; a probe that reported nothing lets the next call probe instead"""
+        if probe is not None and probe is self._probe:
+            self._probe = None
+
+    def _record(self, bad: bool, probe: Optional[object]):
+        now = time.monotonic()
+        if self._state != CLOSED:
+            # Only the current probe says whether the dependency recovered
+            if probe is None or probe is not self._probe:
+                return
+            self._probe = None
+            if bad:
+                self._open(now)
+            else:
+                self._state = CLOSED
+                self._calls.clear()
+            return
+        self._calls.append((now, bad))
+        while self._calls and self._calls[0][0] < now - self.window_seconds:
+            self._calls.popleft()
+        if self._state == CLOSED and len(self._calls) >= self.min_calls:
+            failures = sum(1 for _, failed in self._calls if failed)
+            if failures / len(self._calls) >= self.failure_ratio:
+                self._open(now)
+
+    def _open(self, now: float):
+        self._state = OPEN
+        self._opened_at = now
+        self._calls.clear()
+        self.opened += 1
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "recent_calls": len(self._calls),
+            "recent_failures": sum(1 for _, failed in self._calls if failed),
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
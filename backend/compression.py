@@ -0,0 +1,132 @@
+import gzip
+import re
+from typing import Optional
+
+import metrics
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip covers every client
+    brotli = None
+
+_ACCEPT_ENCODING_ITEM = re.compile(r"\s*([a-z*]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*$")
+ENCODINGS = ("br", "gzip")
+
+
+def matching_etag(if_none_match: Optional[str], etag: str) -> Optional[str]:
+    """The If-None-Match entry naming etag or one of its compressed variants, None when the client's copy is stale"""
+    if not if_none_match:
+        return None
+    if if_none_match.strip() == "*":
+        return etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        tag = candidate[2:] if candidate.startswith("W/") else candidate
+        for encoding in ENCODINGS:
+            tag = tag.replace(f"-{encoding}\"", "\"")
+        if tag == etag:
+            return candidate
+    return None
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Preferred encoding we support from an Accept-Encoding header, brotli over gzip at equal weight"""
+    weights = {}
+    for item in accept_encoding.lower().split(","):
+        match = _ACCEPT_ENCODING_ITEM.match(item)
+        if not match:
+            continue
+        try:
+            weights[match.group(1)] = float(match.group(2)) if match.group(2) else 1.0
+        except ValueError:
+            continue
+    wildcard = weights.get("*", 0.0)
+    candidates = [name for name in ENCODINGS if name != "br" or brotli is not None]
+    scored = [(weights.get(name, wildcard), -order, name) for order, name in enumerate(candidates)]
+    weight, _, name = max(scored)
+    return name if weight > 0 else None
+
+
+def _is_json(content_type: str) -> bool:
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return media_type == "application/json" or media_type.endswith("+json")
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing complete JSON responses above minimum_size.
+
+    The response body must arrive in one message: streamed responses (SSE,
+    NDJSON) go out as they are so nothing delays their chunks.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = negotiate_encoding(accept_encoding) if accept_encoding else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+
+        async def send_compressed(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                headers = dict((k.lower(), v) for k, v in message.get("headers", []))
+                if (_is_json(headers.get(b"content-type", b"").decode("latin-1"))
+                        and b"content-encoding" not in headers):
+                    # Held back until the body shows whether it is worth compressing
+                    start = message
+                    return
+            elif message["type"] == "http.response.body" and start is not None:
+                held, start = start, None
+                body = message.get("body", b"")
+                if message.get("more_body", False) or len(body) < self.minimum_size:
+                    await send(_with_vary(held))
+                    await send(message)
+                    return
+                compressed = self.compress(body, encoding)
+                metrics.http_compression_saved_bytes_total.inc(encoding, amount=len(body) - len(compressed))
+                headers = [
+                    # A strong etag names one representation, so the compressed one gets its own
+                    (k, v[:-1] + b"-" + encoding.encode() + b'"' if k.lower() == b"etag" and v.endswith(b'"') else v)
+                    for k, v in held.get("headers", []) if k.lower() != b"content-length"
+                ]
+                headers += [(b"content-encoding", encoding.encode()), (b"content-length", str(len(compressed)).encode())]
+                await send(_with_vary({**held, "headers": headers}))
+                await send({**message, "body": compressed})
+                return
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        # mtime=0 so the same body always compresses to the same bytes
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+
+def _with_vary(message: dict) -> dict:
+    """The response depends on Accept-Encoding, tell shared caches"""
+    headers = list(message.get("headers", []))
+    for index, (name, value) in enumerate(headers):
+        if name.lower() == b"vary":
+            if b"accept-encoding" not in value.lower():
+                headers[index] = (name, value + b", Accept-Encoding")
+            break
+    else:
+        headers.append((b"vary", b"Accept-Encoding"))
+    return {**message, "headers": headers}
@@ -0,0 +1,142 @@
+"""Mongo client settings and the read/write classes routes declare.
+
+Pool size, timeouts and wire compression come from MONGO_* settings. Routes
+do not use the bare database for their own reads and writes but pick:
+
+- a read class: reads(user_id) goes to a secondary (secondaryPreferred
+  with bounded staleness) unless the user wrote through this process
+  recently, in which case it stays on the primary so they see their write;
+  primary for lookups that must see writes made through any process
+  (a document created a moment ago, a check before an insert)
+- a write class: WRITE_CRITICAL (majority, journaled) for bookings and
+  payments, WRITE_STANDARD (w=1) for user data, WRITE_BACKGROUND (w=1,
+  unjournaled) for audit events and caches that can be rebuilt
+"""
+import os
+from typing import Dict, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import WriteConcern
+from pymongo.read_preferences import Primary, SecondaryPreferred
+
+from ttl_cache import TTLCache
+
+WRITE_CRITICAL = "critical"
+WRITE_STANDARD = "standard"
+WRITE_BACKGROUND = "background"
+
+READ_PRIMARY = "primary"
+READ_REPLICA = "replica"
+
+# The lowest bound the server accepts for maxStalenessSeconds
+MIN_MAX_STALENESS_SECONDS = 90
+
+
+def client_options() -> dict:
+    """AsyncIOMotorClient keyword arguments for the pool, timeouts and compression"""
+    options = {
+        "appname": os.environ.get('MONGO_APP_NAME', 'edu9-api'),
+        "maxPoolSize": int(os.environ.get('MONGO_MAX_POOL_SIZE', '100')),
+        "minPoolSize": int(os.environ.get('MONGO_MIN_POOL_SIZE', '0')),
+        # Past this a request fails instead of queueing behind a saturated pool
+        "waitQueueTimeoutMS": int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', '5000')),
+        "connectTimeoutMS": int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', '5000')),
+        "serverSelectionTimeoutMS": int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000')),
+        "socketTimeoutMS": int(os.environ.get('MONGO_SOCKET_TIMEOUT_MS', '30000')),
+    }
+    max_idle_ms = os.environ.get('MONGO_MAX_IDLE_TIME_MS')
+    if max_idle_ms:
+        options["maxIdleTimeMS"] = int(max_idle_ms)
+    # e.g. "zstd,snappy,zlib"; the server picks the first it also supports
+    compressors = os.environ.get('MONGO_COMPRESSORS', '')
+    if compressors:
+        options["compressors"] = compressors
+    return options
+
+
+def _w(value: str):
+    return int(value) if value.isdigit() else value
+
+
+def write_concerns() -> Dict[str, WriteConcern]:
+    timeout_ms = int(os.environ.get('MONGO_WRITE_TIMEOUT_MS', '5000'))
+    return {
+        WRITE_CRITICAL: WriteConcern(w=_w(os.environ.get('MONGO_CRITICAL_WRITE_CONCERN', 'majority')), j=True,
+                                     wtimeout=timeout_ms),
+        WRITE_STANDARD: WriteConcern(w=1),
+        WRITE_BACKGROUND: WriteConcern(w=1, j=False),
+    }
+
+
+def replica_read_preference(max_staleness_seconds: int):
+    """secondaryPreferred, skipping secondaries more than max_staleness_seconds behind (-1 for no bound)"""
+    if 0 <= max_staleness_seconds < MIN_MAX_STALENESS_SECONDS:
+        raise ValueError(f"Max staleness must be -1 or at least {MIN_MAX_STALENESS_SECONDS} seconds")
+    return SecondaryPreferred(max_staleness=max_staleness_seconds)
+
+
+def create_client(url: str, event_listeners=()) -> AsyncIOMotorClient:
+    return AsyncIOMotorClient(url, event_listeners=list(event_listeners), **client_options())
+
+
+class CollectionView:
+    """Collections of a database with fixed read preference and write concern, created on first use"""
+
+    def __init__(self, database, **options):
+        self._database = database
+        self._options = options
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        collection = self._database.get_collection(name, **self._options)
+        setattr(self, name, collection)
+        return collection
+
+    def __getitem__(self, name: str):
+        return getattr(self, name)
+
+
+class Database:
+    """A Motor database behind the read and write classes"""
+
+    def __init__(self, database, max_staleness_seconds: int = MIN_MAX_STALENESS_SECONDS,
+                 read_your_writes_seconds: Optional[float] = None, max_tracked_writers: int = 100000):
+        self.database = database
+        self._writes = {name: CollectionView(database, write_concern=concern)
+                        for name, concern in write_concerns().items()}
+        # Replica reads for data no user writes online (batch outputs, catalogs)
+        self.replica = CollectionView(database, read_preference=replica_read_preference(max_staleness_seconds))
+        self._reads = {READ_PRIMARY: CollectionView(database, read_preference=Primary()), READ_REPLICA: self.replica}
+        if read_your_writes_seconds is None:
+            # A secondary may trail the primary by up to the staleness bound
+            read_your_writes_seconds = max(max_staleness_seconds, MIN_MAX_STALENESS_SECONDS)
+        self._recent_writers = TTLCache(max_entries=max_tracked_writers, ttl_seconds=read_your_writes_seconds)
+        self.routed_reads = {READ_PRIMARY: 0, READ_REPLICA: 0}
+
+    @property
+    def primary(self) -> CollectionView:
+        """Primary reads, whoever wrote last and through whichever process"""
+        return self._reads[READ_PRIMARY]
+
+    def wrote(self, user_id: Optional[str]):
+        """Keep the user's reads on the primary until a secondary is sure to have caught up"""
+        if user_id:
+            self._recent_writers.set(user_id, True)
+
+    def writes(self, write_class: str, user_id: Optional[str] = None) -> CollectionView:
+        """Collections to write with the class's concern; marks user_id as a recent writer"""
+        self.wrote(user_id)
+        return self._writes[write_class]
+
+    def reads(self, user_id: Optional[str] = None) -> CollectionView:
+        """Replica reads for lag-tolerant screens, primary for users who just wrote"""
+        target = READ_PRIMARY if user_id and self._recent_writers.get(user_id) else READ_REPLICA
+        self.routed_reads[target] += 1
+        return self._reads[target]
+
+    def stats(self) -> dict:
+        return {
+            "routed_reads": dict(self.routed_reads),
+            "recent_writers": len(self._recent_writers),
+        }
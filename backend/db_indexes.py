@@ -0,0 +1,208 @@
+"""Index manifest for every collection the API queries.
+
+Applied idempotently at startup. Run ``python db_indexes.py check`` to apply
+the manifest and verify with explain() that no route query shape falls back
+to a collection scan, and ``python db_indexes.py dedupe`` to resolve users that
+share a phone, which otherwise keep the unique phone index from building.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+
+# Placeholder phone guests were created with before they had none
+LEGACY_GUEST_PHONE = "0000000000"
+# An index with the same keys or name but other options already exists
+INDEX_CONFLICT_CODES = (85, 86)
+# A unique index cannot be built over documents that already share a key
+DUPLICATE_KEY_CODE = 11000
+
+# (collection, keys, options)
+INDEX_MANIFEST = [
+    # Every user with a phone is unique on it; guests have none (phone null, guest true)
+    ("users", [("phone", ASCENDING)], {"unique": True, "partialFilterExpression": {"phone": {"$type": "string"}}}),
+    ("users", [("id", ASCENDING)], {"unique": True}),
+    ("otp_codes", [("phone", ASCENDING)], {"unique": True}),
+    ("otp_codes", [("expires_at", ASCENDING)], {"expireAfterSeconds": 0}),
+    ("assessments", [("id", ASCENDING)], {"unique": True}),
+    ("assessments", [("user_id", ASCENDING)], {}),
+    # id included so the ETag check on the latest recommendation is a covered query
+    ("career_recommendations", [("user_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], {}),
+    # Also serves keyset pagination, which sorts on (created_at, id) newest first
+    ("bookings", [("user_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], {}),
+    ("memberships", [("user_id", ASCENDING), ("status", ASCENDING)], {}),
+    ("recommendation_cache", [("key", ASCENDING)], {"unique": True}),
+    ("recommendation_cache", [("expires_at", ASCENDING)], {"expireAfterSeconds": 0}),
+    ("recommendation_jobs", [("id", ASCENDING)], {"unique": True}),
+    # Startup recovery of jobs left queued or running by a stopped process
+    ("recommendation_jobs", [("status", ASCENDING), ("updated_at", ASCENDING)], {}),
+    ("counsellors", [("id", ASCENDING)], {"unique": True}),
+    ("materialized_recommendations", [("bucket", ASCENDING), ("version", ASCENDING)], {"unique": True}),
+    # One reservation per counsellor and slot; date first so a day's index rebuild uses it
+    ("slot_reservations", [("date", ASCENDING), ("slot", ASCENDING), ("counsellor_id", ASCENDING)], {"unique": True}),
+]
+
+# (name, collection, filter, sort) for every query the routes issue
+QUERY_SHAPES = [
+    ("users by phone", "users", {"phone": "9876543210"}, None),
+    ("otp_codes by phone", "otp_codes", {"phone": "9876543210", "code_hash": "x", "expires_at": {"$gt": datetime(2000, 1, 1)}}, None),
+    ("assessments by id", "assessments", {"id": "x"}, None),
+    ("assessments by user_id", "assessments", {"user_id": "x"}, None),
+    ("latest career_recommendations by user_id", "career_recommendations", {"user_id": "x"}, [("created_at", DESCENDING)]),
+    ("bookings by user_id", "bookings", {"user_id": "x"}, None),
+    ("latest bookings by user_id", "bookings", {"user_id": "x"}, [("created_at", DESCENDING)]),
+    ("bookings page after cursor", "bookings", {"user_id": "x", "$or": [
+        {"created_at": {"$lt": datetime(2000, 1, 1)}},
+        {"created_at": datetime(2000, 1, 1), "id": {"$lt": "x"}},
+    ]}, [("created_at", DESCENDING), ("id", DESCENDING)]),
+    ("memberships by user_id and status", "memberships", {"user_id": "x", "status": "active"}, None),
+    ("recommendation_cache by key", "recommendation_cache", {"key": "x", "expires_at": {"$gt": datetime(2000, 1, 1)}}, None),
+    ("recommendation_jobs by id", "recommendation_jobs", {"id": "x"}, None),
+    ("stale recommendation_jobs", "recommendation_jobs", {"status": "queued", "updated_at": {"$lt": datetime(2000, 1, 1)}}, None),
+    ("materialized_recommendations by bucket", "materialized_recommendations", {"bucket": "x", "version": "v1"}, None),
+    ("slot_reservations by date", "slot_reservations", {"date": "2026-01-01"}, None),
+    ("slot_reservation by counsellor slot", "slot_reservations", {"date": "2026-01-01", "slot": 600, "counsellor_id": "x"}, None),
+]
+
+
+async def migrate_guest_phones(db) -> int:
+    """Clear the shared placeholder phone of older guests so the unique phone index can cover them"""
+    result = await db.users.update_many({"phone": LEGACY_GUEST_PHONE}, {"$set": {"phone": None, "guest": True}})
+    return result.modified_count
+
+
+async def find_duplicate_phones(db) -> dict:
+    """Map every phone held by more than one user to their ids, the one that keeps it first"""
+    pipeline = [
+        {"$match": {"phone": {"$type": "string"}}},
+        {"$sort": {"verified": DESCENDING, "created_at": ASCENDING}},
+        {"$group": {"_id": "$phone", "ids": {"$push": "$id"}}},
+        {"$match": {"ids.1": {"$exists": True}}},
+    ]
+    return {group["_id"]: group["ids"] async for group in db.users.aggregate(pipeline, allowDiskUse=True)}
+
+
+async def dedupe_phones(db, duplicates: dict) -> int:
+    """Leave each duplicated phone on its verified, else oldest, user, returns the number cleared
+
+    The other users keep their data; their phone moves to ``duplicate_phone`` for follow-up.
+    """
+    cleared = 0
+    for phone, ids in duplicates.items():
+        result = await db.users.update_many(
+            {"id": {"$in": ids[1:]}, "phone": phone},
+            {"$set": {"phone": None, "duplicate_phone": phone}}
+        )
+        cleared += result.modified_count
+    return cleared
+
+
+async def ensure_indexes(db) -> int:
+    """Create every index in the manifest, returns the number of failures"""
+    failures = 0
+    try:
+        await migrate_guest_phones(db)
+    except Exception as e:
+        logging.error(f"Could not migrate guest phones: {str(e)}")
+    for collection, keys, options in INDEX_MANIFEST:
+        try:
+            await _create_index(db[collection], keys, options)
+        except OperationFailure as e:
+            failures += 1
+            if e.code == DUPLICATE_KEY_CODE:
+                logging.error(
+                    f"Could not create unique index {keys} on {collection}: existing documents share a key, "
+                    f"run db_indexes.py dedupe to resolve duplicate phones: {str(e)}"
+                )
+            else:
+                logging.error(f"Could not create index {keys} on {collection}: {str(e)}")
+        except Exception as e:
+            failures += 1
+            logging.error(f"Could not create index {keys} on {collection}: {str(e)}")
+    return failures
+
+
+async def _create_index(collection, keys, options):
+    try:
+        await collection.create_index(keys, **options)
+    except OperationFailure as e:
+        if e.code not in INDEX_CONFLICT_CODES:
+            raise
+        # The manifest changed the index's options: rebuild it as listed
+        name = options.get("name") or "_".join(f"{field}_{direction}" for field, direction in keys)
+        logging.warning(f"Rebuilding index {name} on {collection.name}: {str(e)}")
+        await collection.drop_index(name)
+        await collection.create_index(keys, **options)
+
+
+def _plan_stages(plan) -> list:
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            stages.extend(_plan_stages(value))
+    return stages
+
+
+async def verify_query_plans(db) -> list:
+    """Explain every query shape, returns (name, stages) for shapes that scan the collection"""
+    scans = []
+    for name, collection, query, sort in QUERY_SHAPES:
+        cursor = db[collection].find(query).limit(1)
+        if sort:
+            cursor = cursor.sort(sort)
+        explain = await cursor.explain()
+        stages = _plan_stages(explain.get("queryPlanner", {}).get("winningPlan", {}))
+        if "COLLSCAN" in stages:
+            scans.append((name, stages))
+    return scans
+
+
+async def _main(command: str, dry_run: bool = False) -> int:
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    try:
+        if command == "dedupe":
+            duplicates = await find_duplicate_phones(db)
+            for phone, ids in duplicates.items():
+                print(f"Duplicate phone {phone}: keeping {ids[0]}, clearing {', '.join(ids[1:])}")
+            if dry_run:
+                print(f"{len(duplicates)} duplicated phones, nothing changed")
+                return 1 if duplicates else 0
+            cleared = await dedupe_phones(db, duplicates)
+            print(f"Cleared the phone of {cleared} users across {len(duplicates)} duplicated phones")
+
+        failures = await ensure_indexes(db)
+        print(f"Applied {len(INDEX_MANIFEST) - failures}/{len(INDEX_MANIFEST)} indexes")
+        if command in ("apply", "dedupe"):
+            return 1 if failures else 0
+
+        scans = await verify_query_plans(db)
+        for name, stages in scans:
+            print(f"COLLSCAN: {name} ({' -> '.join(stages)})")
+        print(f"Checked {len(QUERY_SHAPES)} query shapes, {len(scans)} collection scans")
+        return 1 if failures or scans else 0
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply and verify the Edu9 Mongo index manifest")
+    parser.add_argument("command", choices=["apply", "check", "dedupe"])
+    parser.add_argument("--dry-run", action="store_true", help="dedupe: only report duplicated phones")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(_main(args.command, args.dry_run)))
@@ -0,0 +1,54 @@
+import json
+from datetime import datetime
+from typing import Any, Optional, Type
+
+from pydantic import BaseModel
+from starlette.responses import Response
+
+try:
+    import orjson
+
+    def dumps(content: Any) -> bytes:
+        return orjson.dumps(content)
+except ImportError:  # orjson is optional, the stdlib encoder is the fallback
+    def _default(value):
+        if isinstance(value, datetime):
+            return value.isoformat()
+        raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+    def dumps(content: Any) -> bytes:
+        return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def public_projection(model: Type[BaseModel]) -> dict:
+    """Mongo projection returning exactly the model's fields, without _id"""
+    return {"_id": 0, **{name: 1 for name in model.model_fields}}
+
+
+def model_defaults(model: Type[BaseModel]) -> dict:
+    """Constant defaults of the model's optional fields, for documents stored before a field existed"""
+    return {
+        name: field.default for name, field in model.model_fields.items()
+        if not field.is_required() and field.default_factory is None
+    }
+
+
+def fill_defaults(document: Optional[dict], defaults: dict) -> Optional[dict]:
+    """Set the fields a document predates to their model default, in place"""
+    if document is not None:
+        for name, value in defaults.items():
+            document.setdefault(name, value)
+    return document
+
+
+class FastJSONResponse(Response):
+    """JSON response for documents we wrote ourselves, skips model validation and jsonable_encoder.
+
+    Pair it with public_projection so only the response model's fields leave the database,
+    and with fill_defaults where older documents lack a field added since.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,40 @@
+"""Gunicorn settings for serving the API with several uvicorn workers.
+
+    gunicorn -c gunicorn.conf.py server:app
+
+The master imports server once (preload_app) and forks the workers from it,
+so a new or restarted worker starts without re-importing the stack. Each
+worker then runs the app lifespan on its own event loop, opening its own
+Mongo client and LLM client after the fork.
+"""
+import gc
+import multiprocessing
+import os
+
+bind = os.environ.get('BIND', '0.0.0.0:8001')
+workers = int(os.environ.get('WEB_CONCURRENCY', str(min(multiprocessing.cpu_count() * 2, 8))))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '60'))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', '5'))
+# Time for the lifespan shutdown to drain queued jobs (RECOMMENDATION_JOB_DRAIN_SECONDS)
+# and then the write-behind buffers
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+# Recycle workers now and then; with the preloaded master that costs a fork, not an import
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '0'))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', '0'))
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG') or None
+
+
+def when_ready(arbiter):
+    import server
+
+    # The app loads some modules lazily; import them here so every worker inherits them
+    try:
+        server.warm_up()
+    except Exception as e:
+        arbiter.log.warning(f"Warm-up failed, workers load modules on first use: {str(e)}")
+    # Keep the preloaded objects out of the collector so workers share their pages copy-on-write
+    gc.freeze()
@@ -0,0 +1,110 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Callable
+
+import metrics
+
+QUEUE_FULL = "queue_full"
+WAIT_TIMEOUT = "timeout"
+
+
+class LlmOverloaded(Exception):
+    def __init__(self, reason: str):
+        super().__init__(f"LLM overloaded ({reason})")
+        self.reason = reason
+
+
+class LlmClientManager:
+    """Long-lived LLM settings plus admission control for provider calls.
+
+    At most max_concurrent calls run at once. Up to max_waiting more wait
+    for a slot, each for at most wait_timeout seconds; anything beyond that
+    is shed immediately with LlmOverloaded so callers can fall back instead
+    of piling onto a rate-limited provider.
+    """
+
+    def __init__(
+        self,
+        chat_factory: Callable,
+        api_key: str,
+        system_message: str,
+        provider: str,
+        model: str,
+        max_concurrent: int = 8,
+        max_waiting: int = 32,
+        wait_timeout: float = 5.0,
+    ):
+        self.chat_factory = chat_factory
+        self.api_key = api_key
+        self.system_message = system_message
+        self.provider = provider
+        self.model = model
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.in_flight = 0
+        self.waiting = 0
+        self.calls = 0
+        self.shed = 0
+
+    def chat(self, session_id: str, **params):
+        """New chat for one call; params (max_tokens, response_format) are passed on when the integration takes them"""
+        # Chats carry per-session message history, so each call gets its own
+        chat = self.chat_factory(
+            api_key=self.api_key,
+            session_id=session_id,
+            system_message=self.system_message
+        ).with_model(self.provider, self.model)
+        with_params = getattr(chat, "with_params", None)
+        if params and with_params is not None:
+            chat = with_params(**params) or chat
+        return chat
+
+    def takes_params(self) -> bool:
+        """Whether the integration's chats accept request params; chat() drops them otherwise"""
+        probe = self.chat_factory(
+            api_key=self.api_key,
+            session_id="params-check",
+            system_message=self.system_message
+        ).with_model(self.provider, self.model)
+        return getattr(probe, "with_params", None) is not None
+
+    def _reject(self, reason: str):
+        self.shed += 1
+        metrics.llm_shed_total.inc(reason)
+        raise LlmOverloaded(reason)
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one of the concurrent call slots for the duration of the block"""
+        if not self._semaphore.locked():
+            # A free slot is taken without suspending
+            await self._semaphore.acquire()
+        else:
+            if self.waiting >= self.max_waiting:
+                self._reject(QUEUE_FULL)
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.wait_timeout)
+            except asyncio.TimeoutError:
+                self._reject(WAIT_TIMEOUT)
+            finally:
+                self.waiting -= 1
+        self.in_flight += 1
+        self.calls += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_waiting": self.max_waiting,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "calls": self.calls,
+            "shed": self.shed,
+        }
@@ -0,0 +1,175 @@
+import json
+import re
+from typing import Callable, List, Optional
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:  # orjson is optional, the stdlib decoder is the fallback
+    _loads = json.loads
+
+
+class JsonArrayStreamParser:
+    """Incrementally parses a JSON array of objects out of streamed LLM text.
+
+    Prose before the array is skipped. Each element object is decoded and
+    returned as soon as its closing brace arrives.
+    """
+
+    def __init__(self):
+        self.in_array = False
+        self.finished = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._element: List[str] = []
+
+    def feed(self, chunk: str) -> List[dict]:
+        items = []
+        for ch in chunk:
+            if self.finished:
+                break
+            if not self.in_array:
+                if ch == '[':
+                    self.in_array = True
+                continue
+
+            if self._depth == 0:
+                if ch == '{':
+                    self._depth = 1
+                    self._element = [ch]
+                elif ch == ']':
+                    self.finished = True
+                elif ch not in ' \t\r\n,':
+                    # Bracket in prose, not the array we want: keep looking
+                    self.in_array = False
+                continue
+
+            self._element.append(ch)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == '{' or ch == '[':
+                self._depth += 1
+            elif ch == '}' or ch == ']':
+                self._depth -= 1
+                if self._depth == 0:
+                    item = _decode(''.join(self._element))
+                    self._element = []
+                    if isinstance(item, dict):
+                        items.append(item)
+        return items
+
+
+# Inside an array: a complete JSON string (never spans lines) or a bracket
+_TOKEN = re.compile(r'"(?:[^"\\\n]|\\.)*"|[\[\]{}]')
+_OPENERS = {']': '[', '}': '{'}
+# A string (kept as is) or a comma followed only by whitespace and a closer
+_TRAILING_COMMA = re.compile(r'("(?:[^"\\]|\\.)*")|,(\s*[\]}])')
+
+
+def remove_trailing_commas(text: str) -> str:
+    """Drop commas directly before a closing bracket or brace, outside strings"""
+    return _TRAILING_COMMA.sub(lambda m: m.group(1) or m.group(2), text)
+
+
+def _decode(candidate: str):
+    try:
+        return _loads(candidate)
+    except ValueError:
+        pass
+    try:
+        return _loads(remove_trailing_commas(candidate))
+    except ValueError:
+        return None
+
+
+def array_spans(text: str) -> List[tuple]:
+    """(start, end) of every balanced [...] in text, found in a single pass.
+
+    Prose outside brackets is skipped without tokenizing, so quotes and code
+    fences around the JSON do not matter. An unclosed bracket (prose or a
+    truncated reply) just never produces a span, mismatched brackets resync.
+    """
+    spans = []
+    stack = []
+    pos = 0
+    while True:
+        if not stack:
+            pos = text.find('[', pos)
+            if pos == -1:
+                break
+            stack.append(('[', pos))
+            pos += 1
+            continue
+        match = _TOKEN.search(text, pos)
+        if match is None:
+            break
+        pos = match.end()
+        token = match.group()
+        if token[0] == '"':
+            continue
+        if token in '[{':
+            stack.append((token, match.start()))
+            continue
+        opener, start = stack.pop()
+        if opener != _OPENERS[token]:
+            stack.clear()
+            continue
+        if opener == '[':
+            spans.append((start, pos))
+    spans.sort()
+    return spans
+
+
+def extract_json_array(text: str, accept: Optional[Callable[[list], bool]] = None) -> Optional[list]:
+    """First JSON array in an LLM reply, tolerating prose, code fences and trailing commas"""
+    if not text:
+        return None
+
+    # Fast path: the reply is one array, possibly fenced, with no stray brackets
+    first, last = text.find('['), text.rfind(']')
+    if first != -1 and last > first:
+        try:
+            value = _loads(text[first:last + 1])
+        except ValueError:
+            value = None
+        if isinstance(value, list) and (accept is None or accept(value)):
+            return value
+
+    tried_end = -1
+    for start, end in array_spans(text):
+        if start < tried_end:
+            # Nested inside an array already tried, e.g. a career's roadmap
+            continue
+        value = _decode(text[start:end])
+        if isinstance(value, list) and (accept is None or accept(value)):
+            return value
+        tried_end = end
+    return None
+
+
+def _is_career_list(value: list) -> bool:
+    return bool(value) and all(isinstance(item, dict) for item in value)
+
+
+def extract_careers(text: str) -> Optional[List[dict]]:
+    """Career objects from an LLM reply, None when the reply holds none.
+
+    Accepts the structured-output shape {"careers": [...]} as well as a bare array.
+    """
+    if text and text.lstrip().startswith('{'):
+        try:
+            value = _loads(text)
+        except ValueError:
+            value = None
+        if isinstance(value, dict) and isinstance(value.get("careers"), list) and _is_career_list(value["careers"]):
+            return value["careers"]
+    return extract_json_array(text, accept=_is_career_list)
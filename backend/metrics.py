@@ -0,0 +1,331 @@
+import hashlib
+import logging
+import threading
+import time
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import monitoring
+from starlette.routing import Match
+
+# Seconds; covers Mongo sub-millisecond reads up to slow LLM calls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (64, 128, 256, 512, 768, 1024, 1536, 2048, 4096, 8192)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        # labels -> [bucket counts..., sum, count]
+        self._values: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        bucket_labels = self.labelnames + ("le",)
+        with self._lock:
+            for labels, state in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, state):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{_format_labels(bucket_labels, labels + (_format_value(bound),))} {cumulative}")
+                lines.append(f"{self.name}_bucket{_format_labels(bucket_labels, labels + ('+Inf',))} {state[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(state[-2])}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {state[-1]}")
+        return lines
+
+
+class CallbackMetric:
+    """Counter or gauge whose samples are read from a callback at scrape time"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...],
+                 callback: Callable[[], Dict[tuple, float]], kind: str = "gauge"):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.callback = callback
+        self.kind = kind
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in sorted(self.callback().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, *args, **kwargs) -> Counter:
+        return self.register(Counter(*args, **kwargs))
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        return self.register(Histogram(*args, **kwargs))
+
+    def callback(self, *args, **kwargs) -> CallbackMetric:
+        return self.register(CallbackMetric(*args, **kwargs))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+http_request_seconds = registry.histogram(
+    "edu9_http_request_duration_seconds", "HTTP request latency by route", ("method", "route"))
+http_responses_total = registry.counter(
+    "edu9_http_responses_total", "HTTP responses by route and status code", ("method", "route", "status"))
+http_compression_saved_bytes_total = registry.counter(
+    "edu9_http_compression_saved_bytes_total", "Response bytes saved by compression, by encoding", ("encoding",))
+http_not_modified_total = registry.counter(
+    "edu9_http_not_modified_total", "Conditional GETs answered 304 instead of resending the body", ("route",))
+mongo_command_seconds = registry.histogram(
+    "edu9_mongo_command_duration_seconds", "MongoDB command latency", ("collection", "command"))
+mongo_command_failures_total = registry.counter(
+    "edu9_mongo_command_failures_total", "Failed MongoDB commands", ("collection", "command"))
+mongo_pool_checkout_seconds = registry.histogram(
+    "edu9_mongo_pool_checkout_duration_seconds", "Wait for a pooled connection by server and outcome",
+    ("member", "outcome"))
+mongo_pool_cleared_total = registry.counter(
+    "edu9_mongo_pool_cleared_total", "Connection pools cleared after network errors, by server", ("member",))
+llm_call_seconds = registry.histogram(
+    "edu9_llm_call_duration_seconds", "LLM call latency by outcome and prompt mode", ("outcome", "mode"))
+llm_tokens_total = registry.counter(
+    "edu9_llm_tokens_total", "LLM tokens by kind (prompt, completion)", ("kind",))
+llm_call_tokens = registry.histogram(
+    "edu9_llm_call_tokens", "Tokens per LLM call by kind and prompt mode", ("kind", "mode"), buckets=TOKEN_BUCKETS)
+llm_shed_total = registry.counter(
+    "edu9_llm_shed_total", "LLM calls shed by admission control, by reason", ("reason",))
+llm_budget_exceeded_total = registry.counter(
+    "edu9_llm_budget_exceeded_total", "Recommendations answered with the fallback because the LLM ran over budget")
+write_behind_flush_seconds = registry.histogram(
+    "edu9_write_behind_flush_duration_seconds", "Write-behind insert_many latency", ("collection", "outcome"))
+write_behind_documents_total = registry.counter(
+    "edu9_write_behind_documents_total", "Write-behind documents by outcome (written, rejected)", ("collection", "outcome"))
+recommendations_total = registry.counter(
+    "edu9_career_recommendations_total", "Career recommendations served by source", ("source",))
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Rough token count (~4 characters per token) for providers that do not report usage"""
+    return (len(text) + 3) // 4 if text else 0
+
+
+def observe_llm_call(seconds: float, outcome: str, prompt_tokens: int = 0, completion_tokens: int = 0, mode: str = ""):
+    llm_call_seconds.observe(seconds, outcome, mode)
+    if prompt_tokens:
+        llm_tokens_total.inc("prompt", amount=prompt_tokens)
+        llm_call_tokens.observe(prompt_tokens, "prompt", mode)
+    if completion_tokens:
+        llm_tokens_total.inc("completion", amount=completion_tokens)
+        llm_call_tokens.observe(completion_tokens, "completion", mode)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and status per route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = _route_template(scope)
+            http_request_seconds.observe(time.perf_counter() - start, scope["method"], route)
+            http_responses_total.inc(scope["method"], route, str(status["code"]))
+
+
+def _route_template(scope) -> str:
+    app = scope.get("app")
+    router = getattr(app, "router", None)
+    for route in getattr(router, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", scope["path"])
+    # Keep label cardinality bounded for unknown paths
+    return "unmatched"
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """pymongo command monitoring: latency per collection and command"""
+
+    def __init__(self):
+        self._pending: Dict[Tuple[int, int], Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, event):
+        return (event.request_id, event.operation_id)
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        if not isinstance(target, str):
+            # getMore carries the cursor id here, the collection separately
+            target = event.command.get("collection", "")
+        with self._lock:
+            self._pending[self._key(event)] = (target or "", event.command_name)
+
+    def _finish(self, event):
+        with self._lock:
+            return self._pending.pop(self._key(event), ("", event.command_name))
+
+    def succeeded(self, event):
+        collection, command = self._finish(event)
+        mongo_command_seconds.observe(event.duration_micros / 1e6, collection, command)
+
+    def failed(self, event):
+        collection, command = self._finish(event)
+        mongo_command_seconds.observe(event.duration_micros / 1e6, collection, command)
+        mongo_command_failures_total.inc(collection, command)
+
+
+@lru_cache(maxsize=None)
+def _alias(address: Tuple[str, int]) -> str:
+    host, port = address
+    return "member-" + hashlib.sha256(f"{host}:{port}".encode("utf-8")).hexdigest()[:8]
+
+
+def _member(event) -> str:
+    """Stable alias of the event's server, so published stats and metrics do not expose host:port"""
+    return _alias(event.address)
+
+
+class MongoPoolListener(monitoring.ConnectionPoolListener):
+    """pymongo pool monitoring: checkout wait per server pool and connections in use.
+
+    A checkout starts and ends on the same thread, so the start time is kept
+    thread-locally per server.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.checked_out: Dict[str, int] = {}
+
+    def _starts(self) -> dict:
+        starts = getattr(self._local, "starts", None)
+        if starts is None:
+            starts = self._local.starts = {}
+        return starts
+
+    def _observe(self, event, outcome: str):
+        started = self._starts().pop(event.address, None)
+        if started is not None:
+            mongo_pool_checkout_seconds.observe(time.perf_counter() - started, _member(event), outcome)
+
+    def connection_check_out_started(self, event):
+        self._starts()[event.address] = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        self._observe(event, "ok")
+        member = _member(event)
+        with self._lock:
+            self.checked_out[member] = self.checked_out.get(member, 0) + 1
+
+    def connection_check_out_failed(self, event):
+        # reason is timeout (wait queue timeout), connectionError or poolClosed
+        self._observe(event, event.reason)
+
+    def connection_checked_in(self, event):
+        member = _member(event)
+        with self._lock:
+            self.checked_out[member] = max(self.checked_out.get(member, 0) - 1, 0)
+
+    def pool_cleared(self, event):
+        mongo_pool_cleared_total.inc(_member(event))
+
+    def pool_closed(self, event):
+        with self._lock:
+            self.checked_out.pop(_member(event), None)
+
+    def pool_created(self, event):
+        # The only place the alias is tied to the server, for operators reading the logs
+        host, port = event.address
+        logging.info(f"Mongo connection pool {_member(event)} is {host}:{port}")
+
+    def pool_ready(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
@@ -0,0 +1,92 @@
+import hashlib
+import hmac
+import secrets
+from datetime import datetime, timedelta
+from typing import Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+OTP_LENGTH = 4
+# Wrong guesses a pending code survives before it is deleted
+OTP_MAX_ATTEMPTS = 5
+
+
+def is_well_formed(code: str) -> bool:
+    return len(code) == OTP_LENGTH and code.isdigit()
+
+
+class OtpStore:
+    """One-time codes in a TTL-indexed collection, stored only as keyed hashes"""
+
+    def __init__(self, collection, ttl_seconds: int = 300, secret: str = "", max_attempts: int = OTP_MAX_ATTEMPTS):
+        self.collection = collection
+        self.ttl_seconds = ttl_seconds
+        self.max_attempts = max_attempts
+        self._secret = secret.encode("utf-8")
+
+    def _hash(self, phone: str, code: str) -> str:
+        return hmac.new(self._secret, f"{phone}:{code}".encode("utf-8"), hashlib.sha256).hexdigest()
+
+    async def issue(self, phone: str) -> str:
+        """Create (or replace) the pending code for a phone in one upsert"""
+        code = f"{secrets.randbelow(10 ** OTP_LENGTH):0{OTP_LENGTH}d}"
+        now = datetime.utcnow()
+        await self.collection.update_one(
+            {"phone": phone},
+            {"$set": {
+                "code_hash": self._hash(phone, code),
+                "attempts": 0,
+                "created_at": now,
+                # The TTL index removes the document once this passes
+                "expires_at": now + timedelta(seconds=self.ttl_seconds),
+            }},
+            upsert=True,
+        )
+        return code
+
+    async def consume(self, phone: str, code: str) -> bool:
+        """Check and delete a pending code atomically, so it works only once
+
+        Each wrong guess counts against the code, which is deleted after
+        max_attempts of them, so a 4-digit code cannot be brute-forced.
+        """
+        now = datetime.utcnow()
+        doc = await self.collection.find_one_and_delete({
+            "phone": phone,
+            "code_hash": self._hash(phone, code),
+            "expires_at": {"$gt": now},
+            "attempts": {"$not": {"$gte": self.max_attempts}},
+        }, projection={"_id": 1})
+        if doc is not None:
+            return True
+
+        pending = await self.collection.find_one_and_update(
+            {"phone": phone, "expires_at": {"$gt": now}},
+            {"$inc": {"attempts": 1}},
+            projection={"_id": 0, "attempts": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+        if pending is not None and pending["attempts"] >= self.max_attempts:
+            await self.collection.delete_one({"phone": phone, "attempts": {"$gte": self.max_attempts}})
+        return False
+
+
+async def upsert_user_by_phone(users, phone: str, set_fields: dict, insert_fields: dict) -> Optional[dict]:
+    """Atomic find-or-create of the user owning a phone, one round trip"""
+    update = {"$setOnInsert": insert_fields}
+    if set_fields:
+        update["$set"] = set_fields
+    for attempt in range(2):
+        try:
+            return await users.find_one_and_update(
+                {"phone": phone},
+                update,
+                projection={"_id": 0, "id": 1},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            # Lost an upsert race on the unique phone index: the user exists now
+            if attempt:
+                raise
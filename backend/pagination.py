@@ -0,0 +1,57 @@
+import base64
+import json
+from datetime import datetime
+from typing import AsyncIterator, Optional, Tuple
+
+from fast_json import dumps, fill_defaults
+
+# Listings walk newest first; id breaks ties between equal timestamps
+KEYSET_SORT = [("created_at", -1), ("id", -1)]
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(document: dict) -> str:
+    """Opaque token pointing just past this document in KEYSET_SORT order"""
+    payload = {"created_at": document["created_at"].isoformat(), "id": document["id"]}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        return datetime.fromisoformat(payload["created_at"]), str(payload["id"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {str(e)}")
+
+
+def keyset_filter(query: dict, cursor: Optional[str]) -> dict:
+    """Restrict query to documents after the cursor, served by an index on KEYSET_SORT"""
+    if not cursor:
+        return query
+    created_at, doc_id = decode_cursor(cursor)
+    return {**query, "$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "id": {"$lt": doc_id}},
+    ]}
+
+
+async def fetch_page(collection, query: dict, cursor: Optional[str], limit: int, projection: dict) -> dict:
+    """One page of documents plus the cursor for the next one (None on the last page)"""
+    # One extra document tells us whether another page exists without a count
+    documents = await collection.find(keyset_filter(query, cursor), projection) \
+        .sort(KEYSET_SORT).limit(limit + 1).to_list(limit + 1)
+    next_cursor = encode_cursor(documents[limit - 1]) if len(documents) > limit else None
+    return {"items": documents[:limit], "next_cursor": next_cursor}
+
+
+async def iter_ndjson(collection, query: dict, projection: dict, batch_size: int,
+                      defaults: Optional[dict] = None) -> AsyncIterator[bytes]:
+    """Stream every matching document as one JSON line, batch_size documents per round trip"""
+    cursor = collection.find(query, projection).sort(KEYSET_SORT).batch_size(batch_size)
+    async for document in cursor:
+        yield dumps(fill_defaults(document, defaults or {})) + b"\n"
@@ -0,0 +1,226 @@
+"""Offline precompute of career recommendations per profile bucket.
+
+Profiles are bucketed on stream x marks band x career goal x top interests.
+The job enumerates the buckets present in the assessments collection, asks
+the LLM once per bucket with bounded parallelism and stores the careers in
+the materialized_recommendations collection under a version. Each bucket
+is written as soon as it is done, so an interrupted run resumes where it
+stopped when started again with the same version.
+
+    python precompute.py run --version v1 --concurrency 4
+    python precompute.py report --version v1
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from recommendation_cache import marks_band
+
+# Coarser than the profile cache: one answer per 10-point band
+BUCKET_MARKS_WIDTH = 10
+TOP_INTERESTS = 2
+
+PROFILE_FIELDS = {
+    "_id": 0, "stream": 1, "subjects": 1, "marks_percentage": 1,
+    "career_interests": 1, "strong_subjects": 1, "career_goal": 1,
+}
+
+
+def _clean(value) -> str:
+    return str(value or '').strip().lower()
+
+
+def bucket_of(assessment: dict) -> dict:
+    interests = [_clean(i) for i in assessment.get('career_interests') or [] if _clean(i)]
+    return {
+        "stream": _clean(assessment.get('stream')),
+        "marks_band": marks_band(assessment.get('marks_percentage'), BUCKET_MARKS_WIDTH),
+        "career_goal": _clean(assessment.get('career_goal')),
+        # Students list their strongest interests first
+        "interests": sorted(set(interests[:TOP_INTERESTS])),
+    }
+
+
+def bucket_key(bucket: dict) -> str:
+    return "|".join([bucket["stream"], str(bucket["marks_band"]), bucket["career_goal"], "+".join(bucket["interests"])])
+
+
+def bucket_profile(bucket: dict, representative: dict) -> dict:
+    """Assessment-shaped profile the bucket's prompt is built from"""
+    interests = [i for i in representative.get('career_interests') or [] if _clean(i) in bucket["interests"]]
+    return {
+        "stream": representative.get('stream', ''),
+        "subjects": representative.get('subjects') or [],
+        "marks_percentage": min(bucket["marks_band"] + BUCKET_MARKS_WIDTH / 2, 100),
+        "career_interests": interests[:TOP_INTERESTS],
+        "strong_subjects": representative.get('strong_subjects') or [],
+        "career_goal": representative.get('career_goal', ''),
+    }
+
+
+class MaterializedRecommendations:
+    """Versioned careers per profile bucket, looked up on the unique (bucket, version) index"""
+
+    def __init__(self, collection, version: str):
+        self.collection = collection
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, assessment: dict) -> Optional[List[dict]]:
+        doc = await self.collection.find_one(
+            {"bucket": bucket_key(bucket_of(assessment)), "version": self.version},
+            {"_id": 0, "careers": 1}
+        )
+        if doc is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return doc["careers"]
+
+    async def put(self, key: str, careers: List[dict], profile: dict, assessments: int):
+        await self.collection.update_one(
+            {"bucket": key, "version": self.version},
+            {"$set": {"careers": careers, "profile": profile, "assessments": assessments, "created_at": datetime.utcnow()}},
+            upsert=True
+        )
+
+    async def keys(self) -> set:
+        docs = await self.collection.find({"version": self.version}, {"_id": 0, "bucket": 1}).to_list(None)
+        return {doc["bucket"] for doc in docs}
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+async def scan_buckets(assessments) -> Dict[str, dict]:
+    """Every bucket seen in the assessments, with its size and a representative profile"""
+    counts: Counter = Counter()
+    buckets: Dict[str, dict] = {}
+    async for assessment in assessments.find({}, PROFILE_FIELDS):
+        bucket = bucket_of(assessment)
+        key = bucket_key(bucket)
+        counts[key] += 1
+        if key not in buckets:
+            buckets[key] = {"bucket": bucket, "representative": assessment}
+    for key, entry in buckets.items():
+        entry["assessments"] = counts[key]
+    return buckets
+
+
+def coverage(buckets: Dict[str, dict], materialized: set) -> dict:
+    total = sum(entry["assessments"] for entry in buckets.values())
+    covered = sum(entry["assessments"] for key, entry in buckets.items() if key in materialized)
+    return {
+        "buckets": len(buckets),
+        "materialized_buckets": len(materialized & set(buckets)),
+        "assessments": total,
+        "covered_assessments": covered,
+        "coverage": round(covered / total, 4) if total else 0.0,
+    }
+
+
+async def precompute(
+    assessments,
+    materialized: MaterializedRecommendations,
+    generate: Callable[[dict], Awaitable[Optional[List[dict]]]],
+    concurrency: int = 4,
+    min_assessments: int = 1,
+    limit: Optional[int] = None,
+) -> dict:
+    """Materialize every missing bucket, largest first, at most `concurrency` LLM calls at a time"""
+    buckets = await scan_buckets(assessments)
+    done = await materialized.keys()
+    todo = sorted(
+        (key for key, entry in buckets.items() if key not in done and entry["assessments"] >= min_assessments),
+        key=lambda key: -buckets[key]["assessments"]
+    )[:limit]
+    semaphore = asyncio.Semaphore(concurrency)
+    failed = []
+
+    async def materialize(key: str):
+        entry = buckets[key]
+        profile = bucket_profile(entry["bucket"], entry["representative"])
+        async with semaphore:
+            try:
+                careers = await generate(profile)
+            except Exception as e:
+                logging.error(f"Precompute failed for bucket {key}: {str(e)}")
+                careers = None
+        if not careers:
+            failed.append(key)
+            return
+        await materialized.put(key, careers, profile, entry["assessments"])
+        done.add(key)
+
+    await asyncio.gather(*(materialize(key) for key in todo))
+    return {"version": materialized.version, "attempted": len(todo), "failed": len(failed), **coverage(buckets, done)}
+
+
+async def _main(args) -> int:
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    materialized = MaterializedRecommendations(db.materialized_recommendations, args.version)
+    try:
+        if args.command == "report":
+            report = {"version": args.version, **coverage(await scan_buckets(db.assessments), await materialized.keys())}
+        else:
+            from emergentintegrations.llm.chat import LlmChat, UserMessage
+            from llm_client import LlmClientManager
+            from llm_json import extract_careers
+            from prompts import CareerPrompt, CAREER_SYSTEM_MESSAGE, JSON_MODE, SCHEMA_MODE
+
+            llm = LlmClientManager(
+                LlmChat,
+                api_key=os.environ.get('EMERGENT_LLM_KEY', ''),
+                system_message=CAREER_SYSTEM_MESSAGE,
+                provider="openai",
+                model="gpt-5.2",
+                max_concurrent=args.concurrency
+            )
+            mode = os.environ.get('LLM_PROMPT_MODE', JSON_MODE)
+            if mode == SCHEMA_MODE and not llm.takes_params():
+                print("The LLM integration takes no response_format, using the json prompt mode")
+                mode = JSON_MODE
+            prompt = CareerPrompt(mode=mode)
+
+            async def generate(profile: dict) -> Optional[List[dict]]:
+                chat = llm.chat(f"precompute-{args.version}", **prompt.request_params())
+                return extract_careers(await chat.send_message(UserMessage(text=prompt.render(profile))))
+
+            report = await precompute(
+                db.assessments, materialized, generate,
+                concurrency=args.concurrency, min_assessments=args.min_assessments, limit=args.limit
+            )
+        for name, value in report.items():
+            print(f"{name:<22}{value}")
+        return 1 if report.get("failed") else 0
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute career recommendations per profile bucket")
+    parser.add_argument("command", choices=["run", "report"])
+    parser.add_argument("--version", default=os.environ.get('RECOMMENDATION_PRECOMPUTE_VERSION', 'v1'))
+    parser.add_argument("--concurrency", type=int, default=4, help="parallel LLM calls")
+    parser.add_argument("--min-assessments", type=int, default=1, help="skip buckets with fewer assessments")
+    parser.add_argument("--limit", type=int, help="materialize at most this many buckets this run")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(_main(args)))
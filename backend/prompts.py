@@ -0,0 +1,156 @@
+from functools import cached_property, lru_cache
+from typing import Optional
+
+from career_catalog import CAREER_FIELDS
+from metrics import estimate_tokens
+
+JSON_MODE = "json"
+SCHEMA_MODE = "schema"
+PROMPT_MODES = (JSON_MODE, SCHEMA_MODE)
+
+CAREER_SYSTEM_MESSAGE = (
+    "You are Edu9's expert career counselor specializing in Indian education system. "
+    "Always respond in valid JSON format."
+)
+
+_LIST_FIELDS = ("top_colleges", "roadmap")
+
+# Structured-output schema: an object so providers that only accept object roots take it
+CAREERS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "careers": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    field: {"type": "array", "items": {"type": "string"}} if field in _LIST_FIELDS else {"type": "string"}
+                    for field in CAREER_FIELDS
+                },
+                "required": list(CAREER_FIELDS),
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["careers"],
+    "additionalProperties": False,
+}
+
+_PROFILE = """Student Profile:
+- 12th Stream: {stream}
+- Subjects Studied: {subjects}
+- Marks/Percentage: {marks_percentage}%
+- Career Interests: {career_interests}
+- Strong Subjects: {strong_subjects}
+- Career Goal: {career_goal}"""
+
+_INTRO = """You are Edu9's career counselor for Indian students after 12th grade.
+Based on the following student profile, recommend the TOP 3 most suitable career paths.
+
+"""
+
+_GUIDANCE = """Focus on these career categories: Engineering/IT, Management (BBA/MBA), Medical & Paramedical, Aviation, Abroad Studies
+
+Keep language simple - parents should understand easily. Be practical and honest about Indian education system."""
+
+# Free-form mode spells the output format out with an example
+_JSON_FORMAT = """For each career, provide:
+1. Career Name
+2. Why it's suitable (2-3 sentences, simple language)
+3. Required Course/Degree
+4. Duration (years)
+5. Estimated Cost (in INR)
+6. Top Colleges in India
+7. Job Prospects (simple explanation)
+8. Expected Starting Salary (in INR per annum)
+9. Step-by-step roadmap (4-5 steps)
+
+Format your response as JSON array with exactly 3 careers:
+[
+  {
+    "name": "Career Name",
+    "suitability": "Why suitable...",
+    "course": "B.Tech/MBBS/BBA etc",
+    "duration": "4 years",
+    "estimated_cost": "₹4-8 Lakhs",
+    "top_colleges": ["College 1", "College 2", "College 3"],
+    "job_prospects": "Job outlook...",
+    "starting_salary": "₹4-6 LPA",
+    "roadmap": ["Step 1", "Step 2", "Step 3", "Step 4"]
+  }
+]"""
+
+# Schema mode: the structure is enforced by response_format, only the content needs describing
+_SCHEMA_FORMAT = (
+    'Reply with a JSON object {"careers": [...]} holding exactly 3 careers with the keys '
+    + ", ".join(CAREER_FIELDS) + """.
+top_colleges (in India) and roadmap (4-5 steps) are string arrays, all other values strings.
+suitability: 2-3 simple sentences. estimated_cost in INR, starting_salary in INR per annum."""
+)
+
+# Compiled once: only the profile is formatted per call
+_TEMPLATES = {
+    JSON_MODE: _INTRO + _PROFILE + "\n\n" + _JSON_FORMAT.replace("{", "{{").replace("}", "}}") + "\n\n" + _GUIDANCE,
+    SCHEMA_MODE: _INTRO + _PROFILE + "\n\n" + _SCHEMA_FORMAT.replace("{", "{{").replace("}", "}}") + "\n\n" + _GUIDANCE,
+}
+
+
+@lru_cache(maxsize=None)
+def _encoding():
+    """The o200k_base encoding, loaded on first count: reading its vocab is slow"""
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:  # tiktoken is optional (and may lack its vocab offline), the heuristic is the fallback
+        return None
+
+
+def count_tokens(text: Optional[str]) -> int:
+    """Token count with tiktoken when installed, else the ~4 characters per token estimate"""
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return estimate_tokens(text)
+
+
+class CareerPrompt:
+    """Career recommendation prompt for one output mode, with its request parameters"""
+
+    def __init__(self, mode: str = JSON_MODE, max_output_tokens: int = 1200):
+        if mode not in PROMPT_MODES:
+            raise ValueError(f"Unknown prompt mode {mode}, expected one of {PROMPT_MODES}")
+        self.mode = mode
+        self.max_output_tokens = max_output_tokens
+        self._template = _TEMPLATES[mode]
+
+    @cached_property
+    def system_tokens(self) -> int:
+        return count_tokens(CAREER_SYSTEM_MESSAGE)
+
+    def render(self, assessment: dict) -> str:
+        # The student's name is left out: it does not change the advice and
+        # answers are shared between students with the same profile
+        return self._template.format(
+            stream=assessment['stream'],
+            subjects=', '.join(assessment['subjects']),
+            marks_percentage=assessment['marks_percentage'],
+            career_interests=', '.join(assessment['career_interests']),
+            strong_subjects=', '.join(assessment['strong_subjects']),
+            career_goal=assessment['career_goal']
+        )
+
+    def prompt_tokens(self, prompt: str) -> int:
+        return self.system_tokens + count_tokens(prompt)
+
+    def request_params(self) -> dict:
+        """Provider parameters: the output token budget and, in schema mode, strict structured output"""
+        params = {"max_tokens": self.max_output_tokens}
+        if self.mode == SCHEMA_MODE:
+            params["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": "career_recommendations", "strict": True, "schema": CAREERS_SCHEMA},
+            }
+        return params
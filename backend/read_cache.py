@@ -0,0 +1,85 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+
+from ttl_cache import TTLCache
+
+# Cached "not found" so absent memberships are not re-queried on every poll
+_MISSING = object()
+
+
+class ReadThroughCache:
+    """Per-process read-through cache for hot lookups, invalidated on writes.
+
+    A load that was already running when its key was invalidated may have
+    read the old document, so its result is returned but not cached: each
+    key with loads in flight has a generation that invalidate() bumps.
+    """
+
+    def __init__(self, name: str, max_entries: int = 10000, ttl_seconds: float = 60):
+        self.name = name
+        self.entries = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.invalidations = 0
+        self.stale_loads = 0
+        # key -> [loads in flight, generation], only while a load is running
+        self._loading: Dict[Hashable, List[int]] = {}
+        # Bumped by clear(), which invalidates every key at once
+        self._epoch = 0
+
+    async def get(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = self.entries.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        state = self._loading.setdefault(key, [0, 0])
+        state[0] += 1
+        started = (state[1], self._epoch)
+        try:
+            value = await loader()
+        finally:
+            state[0] -= 1
+            if not state[0]:
+                del self._loading[key]
+        if (state[1], self._epoch) == started:
+            self.entries.set(key, value)
+        else:
+            self.stale_loads += 1
+        return value
+
+    def invalidate(self, key: Hashable):
+        self.entries.pop(key)
+        state = self._loading.get(key)
+        if state is not None:
+            state[1] += 1
+        self.invalidations += 1
+
+    def clear(self):
+        self.entries.clear()
+        self._epoch += 1
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        return {**self.entries.stats(), "invalidations": self.invalidations, "stale_loads": self.stale_loads}
+
+
+async def watch_invalidations(collection, cache: ReadThroughCache, key_field: str = "user_id"):
+    """Invalidate cache entries from a change stream so other workers' writes are seen.
+
+    Needs a replica set. Deletes carry no document, so they clear the cache.
+    """
+    while True:
+        try:
+            async with collection.watch(full_document="updateLookup") as stream:
+                async for change in stream:
+                    document = change.get("fullDocument") or {}
+                    key = document.get(key_field)
+                    if key is None:
+                        cache.clear()
+                    else:
+                        cache.invalidate(key)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Standalone servers reject change streams; TTL still bounds staleness
+            logging.warning(f"Change stream for {cache.name} cache stopped: {str(e)}")
+            cache.clear()
+            await asyncio.sleep(30)
@@ -0,0 +1,114 @@
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from ttl_cache import TTLCache
+
+# Students within the same marks band get the same recommendations
+MARKS_BAND_WIDTH = 5
+# Part of every key: bump it when older cached answers must never be served.
+# Version 1 answers came from prompts that named the student, so one student's
+# name could reach every other student with the same profile.
+FINGERPRINT_VERSION = 2
+
+
+def _normalize_list(values) -> List[str]:
+    return sorted({str(v).strip().lower() for v in values or [] if str(v).strip()})
+
+
+def marks_band(marks, width: int = MARKS_BAND_WIDTH) -> int:
+    """Lower bound of the marks band a percentage falls into"""
+    try:
+        marks = float(marks)
+    except (TypeError, ValueError):
+        marks = 0.0
+    marks = min(max(marks, 0.0), 100.0)
+    return int(marks // width) * width
+
+
+def normalize_profile(assessment: dict) -> dict:
+    """Reduce an assessment to the fields that drive the recommendation"""
+    return {
+        "stream": str(assessment.get('stream', '')).strip().lower(),
+        "subjects": _normalize_list(assessment.get('subjects')),
+        "marks_band": marks_band(assessment.get('marks_percentage')),
+        "career_interests": _normalize_list(assessment.get('career_interests')),
+        "strong_subjects": _normalize_list(assessment.get('strong_subjects')),
+        "career_goal": str(assessment.get('career_goal', '')).strip().lower(),
+    }
+
+
+def profile_fingerprint(assessment: dict) -> str:
+    """Canonical hash of the normalized assessment profile"""
+    profile = {"version": FINGERPRINT_VERSION, **normalize_profile(assessment)}
+    canonical = json.dumps(profile, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class RecommendationCache:
+    """Two-tier cache of LLM careers: in-process LRU backed by a Mongo collection"""
+
+    def __init__(self, collection, max_entries: int = 2048, ttl_seconds: int = 7 * 24 * 3600):
+        self.collection = collection
+        self.ttl_seconds = ttl_seconds
+        self.local = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.mongo_hits = 0
+        self.mongo_misses = 0
+        self.writes = 0
+
+    async def get(self, key: str) -> Optional[List[dict]]:
+        careers = self.local.get(key)
+        if careers is not None:
+            return careers
+
+        try:
+            doc = await self.collection.find_one(
+                {"key": key, "expires_at": {"$gt": datetime.utcnow()}},
+                {"_id": 0, "careers": 1, "expires_at": 1},
+            )
+        except Exception as e:
+            logging.warning(f"Recommendation cache read failed: {str(e)}")
+            return None
+
+        if not doc:
+            self.mongo_misses += 1
+            return None
+
+        self.mongo_hits += 1
+        # Keep the local copy no longer than the shared one
+        remaining = (doc['expires_at'] - datetime.utcnow()).total_seconds()
+        self.local.set(key, doc['careers'], ttl_seconds=min(self.ttl_seconds, max(remaining, 0)))
+        return doc['careers']
+
+    async def set(self, key: str, careers: List[dict]):
+        self.local.set(key, careers)
+        now = datetime.utcnow()
+        try:
+            await self.collection.update_one(
+                {"key": key},
+                {"$set": {
+                    "careers": careers,
+                    "created_at": now,
+                    "expires_at": now + timedelta(seconds=self.ttl_seconds),
+                }},
+                upsert=True,
+            )
+            self.writes += 1
+        except Exception as e:
+            logging.warning(f"Recommendation cache write failed: {str(e)}")
+
+    def stats(self) -> dict:
+        local = self.local.stats()
+        return {
+            "memory": local,
+            "mongo": {
+                "hits": self.mongo_hits,
+                "misses": self.mongo_misses,
+                "writes": self.writes,
+            },
+            "hits": local["hits"] + self.mongo_hits,
+            "misses": self.mongo_misses,
+            "evictions": local["evictions"],
+        }
@@ -0,0 +1,205 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+FINISHED_STATES = (COMPLETED, FAILED)
+
+INTERRUPTED_ERROR = "Interrupted by a server restart, please retry"
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class RecommendationJobQueue:
+    """Bounded background worker pool for career recommendation jobs, state kept in Mongo"""
+
+    def __init__(
+        self,
+        collection,
+        handler: Callable[[str, str], Awaitable[dict]],
+        workers: int = 4,
+        max_pending: int = 1000,
+        poll_interval: float = 0.5,
+        stale_seconds: float = 300,
+        drain_seconds: float = 20,
+    ):
+        self.collection = collection
+        self.handler = handler
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.stale_seconds = stale_seconds
+        self.drain_seconds = drain_seconds
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._tasks: List[asyncio.Task] = []
+        self._done_events: Dict[str, asyncio.Event] = {}
+        self._stopping = False
+
+    async def start(self):
+        """Pick up jobs a previous process left unfinished, then start the workers"""
+        self._stopping = False
+        try:
+            await self.recover_stale()
+        except Exception as e:
+            logging.error(f"Could not recover stale recommendation jobs: {str(e)}")
+        for i in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._worker(), name=f"recommendation-job-{i}"))
+
+    async def recover_stale(self) -> dict:
+        """Requeue queued jobs and fail running ones that nobody updated for stale_seconds.
+
+        Their process stopped without finishing them. A running job may have
+        saved its recommendation already, so it is failed and left for the
+        client to retry rather than generated twice.
+        """
+        now = datetime.utcnow()
+        cutoff = now - timedelta(seconds=self.stale_seconds)
+        requeued = 0
+        while not self._queue.full():
+            # Claimed atomically so two starting processes never requeue the same job
+            job = await self.collection.find_one_and_update(
+                {"status": QUEUED, "updated_at": {"$lt": cutoff}},
+                {"$set": {"updated_at": now}},
+                projection={"_id": 0, "id": 1},
+            )
+            if not job:
+                break
+            self._queue.put_nowait(job["id"])
+            requeued += 1
+        failed = await self._fail(
+            {"status": {"$in": [QUEUED, RUNNING]}, "updated_at": {"$lt": cutoff}},
+            INTERRUPTED_ERROR
+        )
+        if requeued or failed:
+            logging.warning(f"Recovered stale recommendation jobs: {requeued} requeued, {failed} failed")
+        return {"requeued": requeued, "failed": failed}
+
+    async def stop(self):
+        """Let the workers finish queued jobs for up to drain_seconds, then fail what is left"""
+        self._stopping = True
+        try:
+            await asyncio.wait_for(self._queue.join(), self.drain_seconds)
+        except asyncio.TimeoutError:
+            logging.warning(f"{self._queue.qsize()} recommendation jobs still queued after {self.drain_seconds}s")
+        # A cancelled worker marks its own running job failed (see _run)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        unstarted = []
+        while not self._queue.empty():
+            unstarted.append(self._queue.get_nowait())
+            self._queue.task_done()
+        if unstarted:
+            try:
+                await self._fail({"id": {"$in": unstarted}, "status": QUEUED}, INTERRUPTED_ERROR)
+            except Exception as e:
+                logging.error(f"Could not fail {len(unstarted)} unstarted recommendation jobs: {str(e)}")
+        for event in self._done_events.values():
+            event.set()
+        self._done_events.clear()
+
+    async def _fail(self, query: dict, error: str) -> int:
+        result = await self.collection.update_many(
+            query, {"$set": {"status": FAILED, "error": error, "updated_at": datetime.utcnow()}}
+        )
+        return result.modified_count
+
+    async def submit(self, assessment_id: str, user_id: str) -> dict:
+        if self._stopping or self._queue.full():
+            raise JobQueueFull()
+        now = datetime.utcnow()
+        job = {
+            "id": str(uuid.uuid4()),
+            "assessment_id": assessment_id,
+            "user_id": user_id,
+            "status": QUEUED,
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        await self.collection.insert_one(dict(job))
+        self._done_events[job["id"]] = asyncio.Event()
+        self._queue.put_nowait(job["id"])
+        return job
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        return await self.collection.find_one({"id": job_id}, {"_id": 0})
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[dict]:
+        """Long-poll until the job finishes or the timeout elapses"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        event = self._done_events.get(job_id)
+        if event is not None:
+            try:
+                await asyncio.wait_for(event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+        # Job owned by another worker process, or run by another one after a
+        # restart requeued it: poll its Mongo state
+        while True:
+            job = await self.get(job_id)
+            if job is None or job["status"] in FINISHED_STATES or loop.time() >= deadline:
+                return job
+            await asyncio.sleep(min(self.poll_interval, max(deadline - loop.time(), 0)))
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                logging.error(f"Recommendation job {job_id} crashed: {str(e)}")
+            finally:
+                self._queue.task_done()
+                event = self._done_events.pop(job_id, None)
+                if event is not None:
+                    event.set()
+
+    async def _run(self, job_id: str):
+        job = await self.collection.find_one_and_update(
+            {"id": job_id, "status": QUEUED},
+            {"$set": {"status": RUNNING, "updated_at": datetime.utcnow()}},
+        )
+        if not job:
+            return
+        update = {"updated_at": datetime.utcnow()}
+        try:
+            update["result"] = await self.handler(job["assessment_id"], job["user_id"])
+            update["status"] = COMPLETED
+        except asyncio.CancelledError:
+            # Shutting down past the drain deadline: record the outcome so waiting clients stop polling
+            await self.collection.update_one({"id": job_id}, {"$set": {
+                "status": FAILED,
+                "error": INTERRUPTED_ERROR,
+                "updated_at": datetime.utcnow(),
+            }})
+            raise
+        except HTTPException as e:
+            update["status"] = FAILED
+            update["error"] = e.detail
+        except Exception as e:
+            logging.error(f"Recommendation job {job_id} failed: {str(e)}")
+            update["status"] = FAILED
+            update["error"] = "Recommendation generation failed"
+        update["updated_at"] = datetime.utcnow()
+        await self.collection.update_one({"id": job_id}, {"$set": update})
+
+    def stats(self) -> dict:
+        return {
+            "workers": len(self._tasks),
+            "pending": self._queue.qsize(),
+            "max_pending": self._queue.maxsize,
+        }
@@ -1,32 +1,205 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Header
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse, Response
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
+import json
+import asyncio
+import time
 import logging
 from pathlib import Path
+from contextlib import aclosing, asynccontextmanager
 from pydantic import BaseModel, Field
 from typing import List, Optional
 import uuid
 from datetime import datetime
 import random
 
-# LLM Integration
-from emergentintegrations.llm.chat import LlmChat, UserMessage
+from recommendation_cache import RecommendationCache, profile_fingerprint
+from singleflight import SingleFlight
+from recommendation_jobs import RecommendationJobQueue, JobQueueFull
+from llm_json import JsonArrayStreamParser, extract_careers
+from db_indexes import ensure_indexes
+from career_catalog import rank_careers, scoring_model
+from bulk_ingest import FORMATS, detect_format, iter_rows, ingest_rows
+from otp_store import OtpStore, is_well_formed, upsert_user_by_phone
+from read_cache import ReadThroughCache, watch_invalidations
+from pagination import InvalidCursor, fetch_page, iter_ndjson
+from fast_json import FastJSONResponse, public_projection, model_defaults, fill_defaults
+from slots import SlotEngine, InvalidSlot, SlotUnavailable, normalize_date
+from llm_client import LlmClientManager, LlmOverloaded
+from circuit_breaker import CircuitBreaker, CircuitOpen, STATE_VALUES
+import metrics
+from metrics import MetricsMiddleware, MongoCommandListener, MongoPoolListener, observe_llm_call
+from prompts import CareerPrompt, CAREER_SYSTEM_MESSAGE, JSON_MODE, SCHEMA_MODE, count_tokens
+from precompute import MaterializedRecommendations
+from write_behind import WriteBehindBuffer
+from database import Database, create_client, WRITE_CRITICAL, WRITE_STANDARD, WRITE_BACKGROUND
+from compression import CompressionMiddleware, matching_etag
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# MongoDB connection, opened per process by the lifespan (see create_app) so
+# workers forked from a preloaded master never share a client
+client: Optional[AsyncIOMotorClient] = None
+db = None
+# Routes read and write through mongo's read and write classes (see database.py)
+mongo: Optional[Database] = None
+# Lag-tolerant screens read from secondaries at most this far behind the primary
+MONGO_REPLICA_MAX_STALENESS_SECONDS = int(os.environ.get('MONGO_REPLICA_MAX_STALENESS_SECONDS', '90'))
+mongo_pool_listener = MongoPoolListener()
 
 # LLM Key
 EMERGENT_LLM_KEY = os.environ.get('EMERGENT_LLM_KEY', '')
 
-# Create the main app without a prefix
-app = FastAPI()
+# LLM integration classes, imported on first use (see load_llm_integration)
+LlmChat = None
+UserMessage = None
+
+# Shared LLM client, created at startup (see startup_llm_client)
+llm_client: Optional[LlmClientManager] = None
+LLM_MAX_CONCURRENCY = int(os.environ.get('LLM_MAX_CONCURRENCY', '8'))
+LLM_MAX_WAITING = int(os.environ.get('LLM_MAX_WAITING', '32'))
+LLM_WAIT_TIMEOUT_SECONDS = float(os.environ.get('LLM_WAIT_TIMEOUT_SECONDS', '5'))
+# Past this the request gets the fallback; the LLM answer is still cached when it lands
+LLM_LATENCY_BUDGET_SECONDS = float(os.environ.get('LLM_LATENCY_BUDGET_SECONDS', '15'))
+# Serve fallbacks instantly while the provider keeps failing or running slow
+llm_breaker = CircuitBreaker(
+    "llm",
+    window_seconds=float(os.environ.get('LLM_BREAKER_WINDOW_SECONDS', '60')),
+    min_calls=int(os.environ.get('LLM_BREAKER_MIN_CALLS', '10')),
+    failure_ratio=float(os.environ.get('LLM_BREAKER_FAILURE_RATIO', '0.5')),
+    slow_call_seconds=LLM_LATENCY_BUDGET_SECONDS,
+    open_seconds=float(os.environ.get('LLM_BREAKER_OPEN_SECONDS', '30'))
+)
+# "json" asks for the free-form array with an example, "schema" for strict structured output,
+# which startup_llm_client turns back to "json" when the integration cannot send response_format
+career_prompt = CareerPrompt(
+    mode=os.environ.get('LLM_PROMPT_MODE', JSON_MODE),
+    max_output_tokens=int(os.environ.get('LLM_MAX_OUTPUT_TOKENS', '1200'))
+)
+
+# OTPs live in a TTL-indexed collection as keyed hashes
+OTP_TTL_SECONDS = int(os.environ.get('OTP_TTL_SECONDS', '300'))
+OTP_SECRET = os.environ.get('OTP_SECRET', '')
+OTP_MAX_ATTEMPTS = int(os.environ.get('OTP_MAX_ATTEMPTS', '5'))
+# Demo builds accept any 4-digit code since no SMS is sent
+OTP_DEMO_MODE = os.environ.get('OTP_DEMO_MODE', 'true').lower() in ('1', 'true', 'yes')
+
+# JSON responses at least this large are sent gzip/brotli compressed when the client accepts it
+COMPRESSION_MIN_BYTES = int(os.environ.get('COMPRESSION_MIN_BYTES', '1024'))
+
+# Per-user lookups polled on every app screen, invalidated by our own writes
+READ_CACHE_MAX_ENTRIES = int(os.environ.get('READ_CACHE_MAX_ENTRIES', '10000'))
+READ_CACHE_TTL_SECONDS = float(os.environ.get('READ_CACHE_TTL_SECONDS', '60'))
+assessment_cache = ReadThroughCache("assessments", READ_CACHE_MAX_ENTRIES, READ_CACHE_TTL_SECONDS)
+membership_cache = ReadThroughCache("memberships", READ_CACHE_MAX_ENTRIES, READ_CACHE_TTL_SECONDS)
+# Change streams (replica set only) keep other workers' caches coherent
+READ_CACHE_CHANGE_STREAMS = os.environ.get('READ_CACHE_CHANGE_STREAMS', 'false').lower() in ('1', 'true', 'yes')
+
+# Cache of LLM careers keyed on the normalized assessment profile
+RECOMMENDATION_CACHE_MAX_ENTRIES = int(os.environ.get('RECOMMENDATION_CACHE_MAX_ENTRIES', '2048'))
+RECOMMENDATION_CACHE_TTL_SECONDS = int(os.environ.get('RECOMMENDATION_CACHE_TTL_SECONDS', str(7 * 24 * 3600)))
+
+# Append-only collections listed here are written in batches (write-behind)
+WRITE_BEHIND_COLLECTIONS = {
+    name.strip() for name in os.environ.get('WRITE_BEHIND_COLLECTIONS', 'audit_events').split(',') if name.strip()
+}
+WRITE_BEHIND_MAX_BATCH = int(os.environ.get('WRITE_BEHIND_MAX_BATCH', '100'))
+WRITE_BEHIND_FLUSH_SECONDS = float(os.environ.get('WRITE_BEHIND_FLUSH_SECONDS', '0.05'))
+
+# Per-bucket careers written by the precompute.py batch job
+RECOMMENDATION_PRECOMPUTE_VERSION = os.environ.get('RECOMMENDATION_PRECOMPUTE_VERSION', 'v1')
+
+# Concurrent generations for the same assessment share one task
+recommendation_flights = SingleFlight()
+
+# Counsellor slots: unique index on reservations, availability from memory
+DEFAULT_COUNSELLOR_COUNT = int(os.environ.get('DEFAULT_COUNSELLOR_COUNT', '3'))
+SLOT_INDEX_TTL_SECONDS = float(os.environ.get('SLOT_INDEX_TTL_SECONDS', '30'))
+
+# Background generation for POST /career-recommendations?mode=async
+RECOMMENDATION_JOB_WORKERS = int(os.environ.get('RECOMMENDATION_JOB_WORKERS', '4'))
+RECOMMENDATION_JOB_MAX_PENDING = int(os.environ.get('RECOMMENDATION_JOB_MAX_PENDING', '1000'))
+# Queued or running jobs untouched this long belong to a process that is gone
+RECOMMENDATION_JOB_STALE_SECONDS = float(os.environ.get('RECOMMENDATION_JOB_STALE_SECONDS', '300'))
+# Shutdown lets queued jobs finish this long, within gunicorn's graceful_timeout
+RECOMMENDATION_JOB_DRAIN_SECONDS = float(os.environ.get('RECOMMENDATION_JOB_DRAIN_SECONDS', '20'))
+MAX_JOB_WAIT_SECONDS = 60
+
+# Mongo-backed services, bound to the database by init_services at startup
+otp_store: Optional[OtpStore] = None
+recommendation_cache: Optional[RecommendationCache] = None
+recommendation_writes: Optional[WriteBehindBuffer] = None
+audit_writes: Optional[WriteBehindBuffer] = None
+write_behind_buffers = ()
+materialized_recommendations: Optional[MaterializedRecommendations] = None
+slot_engine: Optional[SlotEngine] = None
+recommendation_jobs: Optional[RecommendationJobQueue] = None
+
+def init_services(database):
+    """Bind the Mongo-backed services to the process's database"""
+    global db, mongo, otp_store, recommendation_cache, recommendation_writes, audit_writes, write_behind_buffers
+    global materialized_recommendations, slot_engine, recommendation_jobs
+    db = database
+    mongo = Database(db, max_staleness_seconds=MONGO_REPLICA_MAX_STALENESS_SECONDS)
+    otp_store = OtpStore(
+        mongo.writes(WRITE_STANDARD).otp_codes,
+        ttl_seconds=OTP_TTL_SECONDS,
+        secret=OTP_SECRET,
+        max_attempts=OTP_MAX_ATTEMPTS
+    )
+    # Lost cache writes only cost a regeneration
+    recommendation_cache = RecommendationCache(
+        mongo.writes(WRITE_BACKGROUND).recommendation_cache,
+        max_entries=RECOMMENDATION_CACHE_MAX_ENTRIES,
+        ttl_seconds=RECOMMENDATION_CACHE_TTL_SECONDS,
+    )
+    recommendation_writes = WriteBehindBuffer(
+        mongo.writes(WRITE_STANDARD).career_recommendations,
+        enabled='career_recommendations' in WRITE_BEHIND_COLLECTIONS,
+        max_batch=WRITE_BEHIND_MAX_BATCH,
+        flush_interval=WRITE_BEHIND_FLUSH_SECONDS
+    )
+    audit_writes = WriteBehindBuffer(
+        mongo.writes(WRITE_BACKGROUND).audit_events,
+        enabled='audit_events' in WRITE_BEHIND_COLLECTIONS,
+        max_batch=WRITE_BEHIND_MAX_BATCH,
+        flush_interval=WRITE_BEHIND_FLUSH_SECONDS
+    )
+    write_behind_buffers = (recommendation_writes, audit_writes)
+    # Written offline by the batch job, so any secondary has it
+    materialized_recommendations = MaterializedRecommendations(
+        mongo.replica.materialized_recommendations,
+        version=RECOMMENDATION_PRECOMPUTE_VERSION
+    )
+    slot_engine = SlotEngine(
+        mongo.writes(WRITE_CRITICAL).counsellors,
+        mongo.writes(WRITE_CRITICAL).slot_reservations,
+        default_count=DEFAULT_COUNSELLOR_COUNT,
+        index_ttl_seconds=SLOT_INDEX_TTL_SECONDS
+    )
+    recommendation_jobs = RecommendationJobQueue(
+        mongo.writes(WRITE_STANDARD).recommendation_jobs,
+        run_career_recommendations,
+        workers=RECOMMENDATION_JOB_WORKERS,
+        max_pending=RECOMMENDATION_JOB_MAX_PENDING,
+        stale_seconds=RECOMMENDATION_JOB_STALE_SECONDS,
+        drain_seconds=RECOMMENDATION_JOB_DRAIN_SECONDS,
+    )
+
+def load_llm_integration():
+    """Import the LLM integration on first use: it pulls in every provider SDK"""
+    global LlmChat, UserMessage
+    if LlmChat is None or UserMessage is None:
+        from emergentintegrations.llm import chat
+        LlmChat, UserMessage = chat.LlmChat, chat.UserMessage
+
+def new_llm_chat(**kwargs):
+    load_llm_integration()
+    return LlmChat(**kwargs)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -49,7 +222,9 @@ class OTPResponse(BaseModel):
 class User(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
-    phone: str
+    # None for guests, so they stay outside the unique phone index
+    phone: Optional[str] = None
+    guest: bool = False
     verified: bool = False
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -98,6 +273,7 @@ class Booking(BaseModel):
     date: str
     time: str
     status: str = "confirmed"
+    counsellor_id: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 class BookingCreate(BaseModel):
@@ -123,39 +299,43 @@ class MembershipCreate(BaseModel):
     name: str
     phone: str
 
+# Read routes fetch only these fields and encode the documents directly
+ASSESSMENT_FIELDS = public_projection(Assessment)
+BOOKING_FIELDS = public_projection(Booking)
+# Bookings made before the slot engine have no counsellor_id
+BOOKING_DEFAULTS = model_defaults(Booking)
+MEMBERSHIP_FIELDS = public_projection(Membership)
+
 # ============== Auth Routes ==============
 
 @api_router.post("/auth/send-otp", response_model=OTPResponse)
 async def send_otp(request: OTPRequest):
     """Send OTP (Mock - always succeeds)"""
-    # Store user if not exists
-    existing_user = await db.users.find_one({"phone": request.phone})
-    if not existing_user:
-        user = User(name=request.name, phone=request.phone)
-        await db.users.insert_one(user.dict())
+    # Store user if not exists and issue a code, both writes in parallel
+    user = User(name=request.name, phone=request.phone)
+    code, _ = await asyncio.gather(
+        otp_store.issue(request.phone),
+        upsert_user_by_phone(mongo.writes(WRITE_STANDARD).users, request.phone, {}, user.dict())
+    )
     
-    # In production, send actual SMS here
-    # For demo, OTP is always "1234" or any 4-digit code
+    # In production, send `code` by SMS here
+    # For demo, any 4-digit code is accepted (see OTP_DEMO_MODE)
     return OTPResponse(success=True, message="OTP sent successfully")
 
 @api_router.post("/auth/verify-otp", response_model=OTPResponse)
 async def verify_otp(request: OTPVerify):
-    """Verify OTP (Mock - any 4-digit code works)"""
-    # For demo, accept any 4-digit OTP
-    if len(request.otp) == 4 and request.otp.isdigit():
-        user = await db.users.find_one({"phone": request.phone})
-        if user:
-            await db.users.update_one(
-                {"phone": request.phone},
-                {"$set": {"verified": True}}
-            )
-            return OTPResponse(success=True, message="OTP verified", user_id=user['id'])
-        else:
-            # Create user if doesn't exist
-            new_user = User(name="User", phone=request.phone, verified=True)
-            await db.users.insert_one(new_user.dict())
-            return OTPResponse(success=True, message="OTP verified", user_id=new_user.id)
-    return OTPResponse(success=False, message="Invalid OTP")
+    """Verify OTP (Mock - any 4-digit code works in demo mode)"""
+    if not is_well_formed(request.otp):
+        return OTPResponse(success=False, message="Invalid OTP")
+    if not OTP_DEMO_MODE and not await otp_store.consume(request.phone, request.otp):
+        return OTPResponse(success=False, message="Invalid OTP")
+    
+    # Mark verified, creating the user if it doesn't exist
+    new_user = User(name="User", phone=request.phone, verified=True).dict()
+    del new_user["verified"]
+    user = await upsert_user_by_phone(mongo.writes(WRITE_STANDARD).users, request.phone, {"verified": True}, new_user)
+    await record_event("otp_verified", user['id'])
+    return OTPResponse(success=True, message="OTP verified", user_id=user['id'])
 
 @api_router.post("/auth/skip")
 async def skip_auth():
@@ -164,10 +344,10 @@ async def skip_auth():
     user = User(
         id=guest_id,
         name="Guest User",
-        phone="0000000000",
+        guest=True,
         verified=True
     )
-    await db.users.insert_one(user.dict())
+    await mongo.writes(WRITE_STANDARD, guest_id).users.insert_one(user.dict())
     return {"success": True, "user_id": guest_id, "message": "Guest access granted"}
 
 # ============== Assessment Routes ==============
@@ -175,7 +355,14 @@ async def skip_auth():
 @api_router.post("/assessments", response_model=Assessment)
 async def create_assessment(input_data: AssessmentCreate):
     """Save student assessment data"""
-    assessment = Assessment(
+    assessment = build_assessment(input_data)
+    await mongo.writes(WRITE_STANDARD, assessment.user_id).assessments.insert_one(assessment.dict())
+    assessment_cache.invalidate(assessment.user_id)
+    await record_event("assessment_created", assessment.user_id, assessment_id=assessment.id)
+    return assessment
+
+def build_assessment(input_data: AssessmentCreate) -> Assessment:
+    return Assessment(
         user_id=input_data.user_id,
         student_name=input_data.student_name,
         stream=input_data.stream,
@@ -189,285 +376,485 @@ async def create_assessment(input_data: AssessmentCreate):
             phone=input_data.parent_phone
         )
     )
-    await db.assessments.insert_one(assessment.dict())
-    return assessment
+
+@api_router.post("/assessments/bulk")
+async def bulk_create_assessments(
+    file: UploadFile = File(...),
+    format: Optional[str] = None,
+    generate_recommendations: bool = False,
+    batch_size: int = 500
+):
+    """Bulk import assessments from a school CSV/JSONL export"""
+    fmt = format or detect_format(file.filename, file.content_type)
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format, use one of: {', '.join(FORMATS)}")
+
+    report = await ingest_rows(
+        iter_rows(file.file, fmt),
+        mongo.writes(WRITE_STANDARD).assessments,
+        lambda row: build_assessment(AssessmentCreate(**row)).dict(),
+        batch_size=min(max(batch_size, 1), 1000)
+    )
+    for row in report["assessments"]:
+        mongo.wrote(row["user_id"])
+        assessment_cache.invalidate(row["user_id"])
+
+    if generate_recommendations:
+        # Queue generation only for the rows that were stored
+        report["job_ids"] = []
+        report["jobs_rejected"] = 0
+        for row in report["assessments"]:
+            try:
+                job = await recommendation_jobs.submit(row["id"], row["user_id"])
+                report["job_ids"].append(job["id"])
+            except JobQueueFull:
+                report["jobs_rejected"] += 1
+
+    return {"success": True, **report}
 
 @api_router.get("/assessments/{user_id}", response_model=Optional[Assessment])
 async def get_assessment(user_id: str):
     """Get assessment by user ID"""
-    assessment = await db.assessments.find_one({"user_id": user_id})
-    if assessment:
-        return Assessment(**assessment)
-    return None
+    assessment = await assessment_cache.get(
+        user_id, lambda: mongo.reads(user_id).assessments.find_one({"user_id": user_id}, ASSESSMENT_FIELDS)
+    )
+    return FastJSONResponse(assessment)
 
 # ============== Career Recommendation Routes ==============
 
 @api_router.post("/career-recommendations")
-async def generate_career_recommendations(assessment_id: str, user_id: str):
+async def generate_career_recommendations(assessment_id: str, user_id: str, mode: str = "sync"):
     """Generate AI-powered career recommendations"""
-    # Get assessment data
-    assessment = await db.assessments.find_one({"id": assessment_id})
+    if mode == "async":
+        # Hand off to the worker pool and let the client poll the job
+        try:
+            job = await recommendation_jobs.submit(assessment_id, user_id)
+        except JobQueueFull:
+            raise HTTPException(status_code=503, detail="Too many pending recommendation jobs, try again shortly")
+        return JSONResponse(status_code=202, content={
+            "success": True,
+            "job_id": job["id"],
+            "status": job["status"]
+        })
+    return await run_career_recommendations(assessment_id, user_id)
+
+async def run_career_recommendations(assessment_id: str, user_id: str) -> dict:
+    # Retries and double-taps wait on the generation already in flight
+    return await recommendation_flights.do(
+        (assessment_id, user_id),
+        lambda: _generate_career_recommendations(assessment_id, user_id)
+    )
+
+async def _generate_career_recommendations(assessment_id: str, user_id: str) -> dict:
+    # Get assessment data; on the primary, as it may have been created through another worker a moment ago
+    assessment = await mongo.primary.assessments.find_one({"id": assessment_id})
     if not assessment:
         raise HTTPException(status_code=404, detail="Assessment not found")
     
-    # Build prompt for AI
-    prompt = f"""You are Edu9's career counselor for Indian students after 12th grade. 
-Based on the following student profile, recommend the TOP 3 most suitable career paths.
-
-Student Profile:
-- Name: {assessment['student_name']}
-- 12th Stream: {assessment['stream']}
-- Subjects Studied: {', '.join(assessment['subjects'])}
-- Marks/Percentage: {assessment['marks_percentage']}%
-- Career Interests: {', '.join(assessment['career_interests'])}
-- Strong Subjects: {', '.join(assessment['strong_subjects'])}
-- Career Goal: {assessment['career_goal']}
-
-For each career, provide:
-1. Career Name
-2. Why it's suitable (2-3 sentences, simple language)
-3. Required Course/Degree
-4. Duration (years)
-5. Estimated Cost (in INR)
-6. Top Colleges in India
-7. Job Prospects (simple explanation)
-8. Expected Starting Salary (in INR per annum)
-9. Step-by-step roadmap (4-5 steps)
-
-Focus on these career categories: Engineering/IT, Management (BBA/MBA), Medical & Paramedical, Aviation, Abroad Studies
-
-Format your response as JSON array with exactly 3 careers:
-[
-  {{
-    "name": "Career Name",
-    "suitability": "Why suitable...",
-    "course": "B.Tech/MBBS/BBA etc",
-    "duration": "4 years",
-    "estimated_cost": "₹4-8 Lakhs",
-    "top_colleges": ["College 1", "College 2", "College 3"],
-    "job_prospects": "Job outlook...",
-    "starting_salary": "₹4-6 LPA",
-    "roadmap": ["Step 1", "Step 2", "Step 3", "Step 4"]
-  }}
-]
-
-Keep language simple - parents should understand easily. Be practical and honest about Indian education system."""
-
-    try:
-        # Initialize LLM Chat
-        chat = LlmChat(
-            api_key=EMERGENT_LLM_KEY,
-            session_id=f"career-{assessment_id}",
-            system_message="You are Edu9's expert career counselor specializing in Indian education system. Always respond in valid JSON format."
-        ).with_model("openai", "gpt-5.2")
-        
-        # Send message
-        user_message = UserMessage(text=prompt)
-        response = await chat.send_message(user_message)
-        
-        # Parse response - extract JSON from response
-        import json
-        import re
-        
-        # Try to extract JSON array from response
-        json_match = re.search(r'\[[\s\S]*\]', response)
-        if json_match:
-            careers_data = json.loads(json_match.group())
-        else:
-            # Fallback careers if parsing fails
-            careers_data = get_fallback_careers(assessment)
-        
-        # Save recommendation
-        recommendation = CareerRecommendation(
-            assessment_id=assessment_id,
-            user_id=user_id,
-            careers=careers_data
-        )
-        await db.career_recommendations.insert_one(recommendation.dict())
-        
+    # Students with the same profile share one LLM answer
+    cache_key = profile_fingerprint(assessment)
+    cached_careers, source = await precomputed_careers(assessment, cache_key)
+    if cached_careers is not None:
+        metrics.recommendations_total.inc(source)
+        recommendation = await save_recommendation(assessment_id, user_id, cached_careers)
         return {
             "success": True,
             "recommendation_id": recommendation.id,
-            "careers": careers_data
+            "careers": cached_careers
         }
-        
+    
+    # Build prompt for AI
+    prompt = career_prompt.render(assessment)
+
+    # Shielded so a call that outlives the budget still finishes and fills the cache
+    llm_call = asyncio.ensure_future(request_career_llm(assessment_id, prompt, cache_key))
+    try:
+        careers_data = await asyncio.wait_for(asyncio.shield(llm_call), LLM_LATENCY_BUDGET_SECONDS)
+    except asyncio.TimeoutError:
+        logging.warning(f"LLM call for {assessment_id} over the {LLM_LATENCY_BUDGET_SECONDS}s budget, serving fallback")
+        metrics.llm_budget_exceeded_total.inc()
+        llm_call.add_done_callback(_log_late_llm_failure)
+        return await fallback_recommendation(assessment, assessment_id, user_id)
+    except (LlmOverloaded, CircuitOpen) as e:
+        logging.warning(f"LLM call shed: {str(e)}")
+        return await fallback_recommendation(assessment, assessment_id, user_id)
     except Exception as e:
         logging.error(f"LLM Error: {str(e)}")
-        # Return fallback recommendations
-        careers_data = get_fallback_careers(assessment)
-        recommendation = CareerRecommendation(
-            assessment_id=assessment_id,
-            user_id=user_id,
-            careers=careers_data
-        )
-        await db.career_recommendations.insert_one(recommendation.dict())
-        
-        return {
-            "success": True,
-            "recommendation_id": recommendation.id,
-            "careers": careers_data,
-            "note": "Using merit-based recommendations"
-        }
+        return await fallback_recommendation(assessment, assessment_id, user_id)
 
-def get_fallback_careers(assessment: dict) -> List[dict]:
-    """Generate fallback careers based on stream and marks"""
-    stream = assessment.get('stream', 'Science')
-    marks = assessment.get('marks_percentage', 70)
-    interests = assessment.get('career_interests', [])
+    if careers_data:
+        metrics.recommendations_total.inc("llm")
+    else:
+        # Fallback careers if parsing fails
+        metrics.recommendations_total.inc("fallback")
+        careers_data = get_fallback_careers(assessment)
+    
+    # Save recommendation
+    recommendation = await save_recommendation(assessment_id, user_id, careers_data)
     
-    careers_by_stream = {
-        "Science": [
-            {
-                "name": "Software Engineering (B.Tech CSE)",
-                "suitability": "Your strong Science background and analytical skills make you ideal for IT. High demand in India with excellent growth.",
-                "course": "B.Tech Computer Science",
-                "duration": "4 years",
-                "estimated_cost": "₹4-15 Lakhs",
-                "top_colleges": ["IITs", "NITs", "BITS Pilani", "VIT", "SRM"],
-                "job_prospects": "Very high demand. Companies like TCS, Infosys, Google, Microsoft hire freshers regularly.",
-                "starting_salary": "₹4-12 LPA",
-                "roadmap": ["Clear JEE/State entrance exam", "Get admission in B.Tech CSE", "Learn programming & projects", "Internships in 3rd year", "Campus placement in 4th year"]
-            },
-            {
-                "name": "Medicine (MBBS)",
-                "suitability": "If you have interest in helping people and have good memory, MBBS offers a respected and stable career.",
-                "course": "MBBS + MD/MS",
-                "duration": "5.5 years (MBBS) + 3 years (PG)",
-                "estimated_cost": "₹20-80 Lakhs",
-                "top_colleges": ["AIIMS", "CMC Vellore", "JIPMER", "MAMC Delhi", "KEM Mumbai"],
-                "job_prospects": "Always in demand. Can work in hospitals, start own clinic, or join government service.",
-                "starting_salary": "₹6-15 LPA",
-                "roadmap": ["Clear NEET UG exam", "Complete MBBS from good college", "Do internship seriously", "Prepare for NEET PG", "Specialize in chosen field"]
-            },
-            {
-                "name": "Data Science & AI",
-                "suitability": "Your Maths and Science skills are perfect for this futuristic field. One of the highest paying careers today.",
-                "course": "B.Tech + M.Tech/MS in Data Science",
-                "duration": "4-6 years",
-                "estimated_cost": "₹5-20 Lakhs",
-                "top_colleges": ["IITs", "IISc Bangalore", "ISI Kolkata", "IIIT Hyderabad"],
-                "job_prospects": "Extremely high demand. Every company needs data scientists. Work from home options available.",
-                "starting_salary": "₹8-20 LPA",
-                "roadmap": ["B.Tech in CSE/IT/Maths", "Learn Python, Statistics, ML", "Online certifications", "Build portfolio projects", "Apply to tech companies"]
-            }
-        ],
-        "Commerce": [
-            {
-                "name": "Chartered Accountancy (CA)",
-                "suitability": "Your Commerce background is perfect for CA. Most respected finance career in India with excellent income.",
-                "course": "CA Foundation + Intermediate + Final",
-                "duration": "4-5 years",
-                "estimated_cost": "₹1-3 Lakhs",
-                "top_colleges": ["ICAI (Institute of Chartered Accountants)"],
-                "job_prospects": "Very high demand in companies, audit firms, and self-practice. Can earn very well.",
-                "starting_salary": "₹7-15 LPA",
-                "roadmap": ["Register for CA Foundation", "Clear Foundation exam", "Complete articleship training", "Clear Intermediate & Final", "Join firm or start practice"]
-            },
-            {
-                "name": "BBA + MBA",
-                "suitability": "Great path for business and management career. Opens doors to corporate leadership roles.",
-                "course": "BBA + MBA",
-                "duration": "3 + 2 years",
-                "estimated_cost": "₹10-25 Lakhs",
-                "top_colleges": ["IIMs", "XLRI", "FMS Delhi", "SP Jain", "Christ University"],
-                "job_prospects": "Wide range of jobs - Marketing, Finance, HR, Operations in top companies.",
-                "starting_salary": "₹6-25 LPA (depends on college)",
-                "roadmap": ["Complete BBA from good college", "Gain 1-2 years work experience", "Prepare for CAT/XAT", "Get into top MBA college", "Summer internship & placement"]
-            },
-            {
-                "name": "Investment Banking & Finance",
-                "suitability": "If you love numbers and markets, this is one of the highest paying careers in Commerce stream.",
-                "course": "B.Com + CFA/MBA Finance",
-                "duration": "5-6 years",
-                "estimated_cost": "₹8-20 Lakhs",
-                "top_colleges": ["SRCC Delhi", "St. Xavier's", "Narsee Monjee", "Christ University"],
-                "job_prospects": "Jobs in banks, mutual funds, stock broking. Can earn very high with experience.",
-                "starting_salary": "₹6-15 LPA",
-                "roadmap": ["B.Com from top college", "Learn about stock markets", "Do CFA or MBA Finance", "Internship in finance sector", "Join investment firm"]
-            }
-        ],
-        "Arts": [
-            {
-                "name": "Law (LLB)",
-                "suitability": "Arts students excel in Law. Great career for those who like arguments, reading, and helping people.",
-                "course": "BA LLB / LLB",
-                "duration": "5 years (Integrated) / 3 years",
-                "estimated_cost": "₹3-15 Lakhs",
-                "top_colleges": ["NLSIU Bangalore", "NALSAR Hyderabad", "NLU Delhi", "NUJS Kolkata"],
-                "job_prospects": "Work as advocate, legal advisor, judge, or in corporate legal teams.",
-                "starting_salary": "₹4-12 LPA",
-                "roadmap": ["Clear CLAT/AILET exam", "Complete law degree", "Internships under senior lawyers", "Enroll with Bar Council", "Start practice or join firm"]
-            },
-            {
-                "name": "Journalism & Mass Communication",
-                "suitability": "If you love writing, speaking, and staying updated, media is exciting and rewarding.",
-                "course": "BA/BMM in Journalism",
-                "duration": "3 years",
-                "estimated_cost": "₹2-8 Lakhs",
-                "top_colleges": ["IIMC Delhi", "Xavier's Mumbai", "Symbiosis Pune", "ACJ Chennai"],
-                "job_prospects": "Work in news channels, newspapers, digital media, PR agencies.",
-                "starting_salary": "₹3-8 LPA",
-                "roadmap": ["Complete Journalism degree", "Internship at media house", "Build portfolio of work", "Specialize in area of interest", "Join media organization"]
-            },
-            {
-                "name": "Civil Services (IAS/IPS)",
-                "suitability": "Arts graduates have high success rate in UPSC. Most prestigious career to serve nation.",
-                "course": "Any Graduation + UPSC Prep",
-                "duration": "3-5 years",
-                "estimated_cost": "₹2-5 Lakhs (coaching)",
-                "top_colleges": ["Any recognized university", "Coaching: Vajiram, Vision IAS"],
-                "job_prospects": "Become IAS, IPS, IFS officer. Lead government departments. Serve nation.",
-                "starting_salary": "₹8-12 LPA + perks",
-                "roadmap": ["Complete graduation", "Start UPSC preparation", "Clear Prelims exam", "Clear Mains exam", "Clear Interview & training"]
-            }
-        ]
+    return {
+        "success": True,
+        "recommendation_id": recommendation.id,
+        "careers": careers_data
     }
+
+async def precomputed_careers(assessment: dict, cache_key: str):
+    """Careers already known for the profile and where they came from, (None, None) when the LLM is needed"""
+    careers = await recommendation_cache.get(cache_key)
+    if careers is not None:
+        return careers, "cache"
+    # Batch-precomputed answer for the profile's bucket (stream, marks band, goal, top interests)
+    careers = await materialized_recommendations.get(assessment)
+    if careers is not None:
+        return careers, "materialized"
+    return None, None
+
+async def request_career_llm(assessment_id: str, prompt: str, cache_key: str) -> Optional[List[dict]]:
+    """Ask the LLM for careers and cache a parsed answer, None when the reply has no career list"""
+    # Fail fast while the provider is unhealthy, before queueing for a slot
+    probe = llm_breaker.allow()
+    try:
+        # Wait for a free LLM slot, or shed straight to the fallback when saturated
+        async with llm_client.slot():
+            llm_started = time.perf_counter()
+            try:
+                chat = llm_client.chat(f"career-{assessment_id}", **career_prompt.request_params())
+                response = await chat.send_message(UserMessage(text=prompt))
+            except Exception:
+                llm_breaker.record_failure(probe)
+                observe_llm_call(
+                    time.perf_counter() - llm_started, "error",
+                    career_prompt.prompt_tokens(prompt), mode=career_prompt.mode
+                )
+                raise
+            llm_seconds = time.perf_counter() - llm_started
+            llm_breaker.record_success(llm_seconds, probe)
+    finally:
+        # Frees a half-open probe that never reached the provider (shed or cancelled)
+        llm_breaker.release(probe)
+
+    # Parse response - extract JSON array of careers from response
+    careers_data = extract_careers(response)
+    observe_llm_call(
+        llm_seconds,
+        "ok" if careers_data else "parse_error",
+        career_prompt.prompt_tokens(prompt),
+        count_tokens(response),
+        mode=career_prompt.mode
+    )
+    if careers_data:
+        await recommendation_cache.set(cache_key, careers_data)
+    return careers_data
+
+def _log_late_llm_failure(task: asyncio.Future):
+    if not task.cancelled() and task.exception() is not None:
+        logging.error(f"LLM Error after budget: {str(task.exception())}")
+
+async def fallback_recommendation(assessment: dict, assessment_id: str, user_id: str) -> dict:
+    """Save and return merit-based careers when the LLM is unavailable"""
+    metrics.recommendations_total.inc("fallback")
+    careers_data = get_fallback_careers(assessment)
+    recommendation = await save_recommendation(assessment_id, user_id, careers_data)
     
-    return careers_by_stream.get(stream, careers_by_stream["Science"])
+    return {
+        "success": True,
+        "recommendation_id": recommendation.id,
+        "careers": careers_data,
+        "note": "Using merit-based recommendations"
+    }
+
+@api_router.post("/career-recommendations/stream")
+async def stream_career_recommendations(assessment_id: str, user_id: str):
+    """Stream AI career recommendations over Server-Sent Events as each career is generated"""
+    assessment = await mongo.primary.assessments.find_one({"id": assessment_id})
+    if not assessment:
+        raise HTTPException(status_code=404, detail="Assessment not found")
+    return StreamingResponse(
+        _career_events(assessment, assessment_id, user_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def _career_events(assessment: dict, assessment_id: str, user_id: str):
+    note = None
+    cache_key = profile_fingerprint(assessment)
+    careers_data, source = await precomputed_careers(assessment, cache_key)
+    if careers_data is not None:
+        metrics.recommendations_total.inc(source)
+        for career in careers_data:
+            yield sse_event("career", career)
+    else:
+        careers_data = []
+        parser = JsonArrayStreamParser()
+        prompt = career_prompt.render(assessment)
+        completion = []
+        outcome = "ok"
+        llm_started = time.perf_counter()
+        probe = None
+        try:
+            try:
+                probe = llm_breaker.allow()
+                async with llm_client.slot():
+                    llm_started = time.perf_counter()
+                    chat = llm_client.chat(f"career-{assessment_id}", **career_prompt.request_params())
+                    user_message = UserMessage(text=prompt)
+                    # Closed as soon as the array ends, so the provider stream is not left open
+                    async with aclosing(stream_llm_reply(chat, user_message)) as reply:
+                        async for chunk in reply:
+                            completion.append(chunk)
+                            for career in parser.feed(chunk):
+                                careers_data.append(career)
+                                yield sse_event("career", career)
+                            if parser.finished:
+                                break
+            except (LlmOverloaded, CircuitOpen) as e:
+                logging.warning(f"LLM call shed: {str(e)}")
+                outcome = "shed"
+            except Exception as e:
+                logging.error(f"LLM Error: {str(e)}")
+                outcome = "error"
+            if outcome == "ok" and not careers_data:
+                outcome = "parse_error"
+            if outcome != "shed":
+                llm_seconds = time.perf_counter() - llm_started
+                if outcome == "error":
+                    llm_breaker.record_failure(probe)
+                else:
+                    llm_breaker.record_success(llm_seconds, probe)
+                observe_llm_call(
+                    llm_seconds,
+                    outcome,
+                    career_prompt.prompt_tokens(prompt),
+                    count_tokens(''.join(completion)),
+                    mode=career_prompt.mode
+                )
+        finally:
+            # Frees a half-open probe that was shed, or whose client went away mid-stream
+            llm_breaker.release(probe)
+
+        if len(careers_data) >= FALLBACK_CAREER_COUNT:
+            metrics.recommendations_total.inc("llm")
+            if parser.finished:
+                await recommendation_cache.set(cache_key, careers_data)
+        elif careers_data:
+            # The reply broke off early or had elements that would not decode: what was
+            # sent stays, ranked careers make up the rest, and nothing short is cached
+            metrics.recommendations_total.inc("llm_partial")
+            note = "Completed with merit-based recommendations"
+            for career in top_up_careers(assessment, careers_data):
+                careers_data.append(career)
+                yield sse_event("career", career)
+        else:
+            metrics.recommendations_total.inc("fallback")
+            note = "Using merit-based recommendations"
+            careers_data = get_fallback_careers(assessment)
+            for career in careers_data:
+                yield sse_event("career", career)
+
+    # Persist the full list once the stream is complete
+    recommendation = await save_recommendation(assessment_id, user_id, careers_data)
+    done = {"success": True, "recommendation_id": recommendation.id}
+    if note:
+        done["note"] = note
+    yield sse_event("done", done)
+
+async def stream_llm_reply(chat, message):
+    """Yield the LLM reply in chunks as the provider produces them"""
+    stream_message = getattr(chat, "stream_message", None)
+    if stream_message is None:
+        # Integration without streaming support: the whole reply is one chunk
+        yield await chat.send_message(message)
+        return
+    async with aclosing(stream_message(message)) as chunks:
+        async for chunk in chunks:
+            yield chunk
+
+async def save_recommendation(assessment_id: str, user_id: str, careers_data: List[dict]) -> CareerRecommendation:
+    """Persist a generated recommendation for the user"""
+    recommendation = CareerRecommendation(
+        assessment_id=assessment_id,
+        user_id=user_id,
+        careers=careers_data
+    )
+    mongo.wrote(user_id)
+    await recommendation_writes.add(recommendation.dict())
+    await record_event("recommendation_created", user_id, recommendation_id=recommendation.id)
+    return recommendation
+
+def _job_response(job: Optional[dict]) -> dict:
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {
+        "success": True,
+        "job_id": job["id"],
+        "status": job["status"],
+        "result": job.get("result"),
+        "error": job.get("error")
+    }
+
+@api_router.get("/recommendation-jobs/{job_id}")
+async def get_recommendation_job(job_id: str):
+    """Get the state of an async recommendation job"""
+    return _job_response(await recommendation_jobs.get(job_id))
+
+@api_router.get("/recommendation-jobs/{job_id}/wait")
+async def wait_recommendation_job(job_id: str, timeout: float = 25):
+    """Long-poll an async recommendation job until it finishes or the timeout elapses"""
+    timeout = min(max(timeout, 0), MAX_JOB_WAIT_SECONDS)
+    return _job_response(await recommendation_jobs.wait(job_id, timeout))
+
+@api_router.get("/metrics")
+async def get_metrics():
+    """Prometheus metrics in text exposition format"""
+    return PlainTextResponse(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+@api_router.get("/cache/stats")
+async def get_cache_stats():
+    """Hit/miss/eviction counters of the recommendation cache"""
+    return {
+        "recommendation_cache": recommendation_cache.stats(),
+        "recommendation_flights": recommendation_flights.stats(),
+        "recommendation_jobs": recommendation_jobs.stats(),
+        "assessment_cache": assessment_cache.stats(),
+        "membership_cache": membership_cache.stats(),
+        "slots": slot_engine.stats(),
+        "llm_client": llm_client.stats() if llm_client else None,
+        "llm_breaker": llm_breaker.stats(),
+        "materialized_recommendations": materialized_recommendations.stats(),
+        "write_behind": {buffer.name: buffer.stats() for buffer in write_behind_buffers},
+        "mongo": {**mongo.stats(), "pool_checked_out": sum(mongo_pool_listener.checked_out.values())}
+    }
+
+FALLBACK_CAREER_COUNT = 3
+
+def get_fallback_careers(assessment: dict) -> List[dict]:
+    """Generate fallback careers ranked on stream, marks, subjects and interests"""
+    return rank_careers(assessment, limit=FALLBACK_CAREER_COUNT)
+
+def top_up_careers(assessment: dict, careers: List[dict]) -> List[dict]:
+    """Ranked careers to follow a partial LLM list up to FALLBACK_CAREER_COUNT, skipping any it already named"""
+    named = {str(career.get('name', '')).strip().lower() for career in careers}
+    ranked = rank_careers(assessment, limit=FALLBACK_CAREER_COUNT + len(careers))
+    extra = [career for career in ranked if career['name'].strip().lower() not in named]
+    return extra[:max(FALLBACK_CAREER_COUNT - len(careers), 0)]
+
+# Recommendations are never updated once saved, so the id is a strong validator
+RECOMMENDATION_ETAG_FIELDS = {"_id": 0, "id": 1}
+RECOMMENDATION_FIELDS = {"_id": 0, "id": 1, "careers": 1}
+# Clients keep the careers but check back each visit
+RECOMMENDATION_CACHE_HEADERS = {"Cache-Control": "private, no-cache"}
+
+def recommendation_etag(recommendation: dict) -> str:
+    return f'"{recommendation["id"]}"'
 
 @api_router.get("/career-recommendations/{user_id}")
-async def get_career_recommendations(user_id: str):
-    """Get career recommendations for a user"""
-    recommendation = await db.career_recommendations.find_one(
+async def get_career_recommendations(user_id: str, if_none_match: Optional[str] = Header(None)):
+    """Get career recommendations for a user, 304 when the client's copy is still the latest"""
+    replica = mongo.reads(user_id)
+    pending = latest_pending_recommendation(user_id)
+    if if_none_match:
+        # Answered from the (user_id, created_at, id) index alone
+        latest = pending or await replica.career_recommendations.find_one(
+            {"user_id": user_id}, RECOMMENDATION_ETAG_FIELDS, sort=[("created_at", -1)]
+        )
+        matched = latest and matching_etag(if_none_match, recommendation_etag(latest))
+        if matched:
+            metrics.http_not_modified_total.inc("/api/career-recommendations/{user_id}")
+            return Response(status_code=304, headers={"ETag": matched, **RECOMMENDATION_CACHE_HEADERS})
+    recommendation = pending or await replica.career_recommendations.find_one(
         {"user_id": user_id},
+        RECOMMENDATION_FIELDS,
         sort=[("created_at", -1)]
     )
     if recommendation:
-        return {
+        return FastJSONResponse({
             "success": True,
             "careers": recommendation.get('careers', [])
-        }
+        }, headers={"ETag": recommendation_etag(recommendation), **RECOMMENDATION_CACHE_HEADERS})
     return {"success": False, "message": "No recommendations found"}
 
+def latest_pending_recommendation(user_id: str) -> Optional[dict]:
+    """The user's newest recommendation still in the write-behind buffer, so reads see it before the flush"""
+    pending = recommendation_writes.pending(lambda doc: doc["user_id"] == user_id)
+    return pending[-1] if pending else None
+
 # ============== Booking Routes ==============
 
 @api_router.post("/bookings", response_model=Booking)
 async def create_booking(input_data: BookingCreate):
     """Create a consultation booking"""
-    booking = Booking(
-        user_id=input_data.user_id,
-        name=input_data.name,
-        phone=input_data.phone,
-        consultation_type=input_data.consultation_type,
-        date=input_data.date,
-        time=input_data.time
-    )
-    await db.bookings.insert_one(booking.dict())
+    try:
+        booking = Booking(
+            user_id=input_data.user_id,
+            name=input_data.name,
+            phone=input_data.phone,
+            consultation_type=input_data.consultation_type,
+            # Stored as reserved, so the booking and its reservation name the same day
+            date=normalize_date(input_data.date),
+            time=input_data.time
+        )
+        booking.counsellor_id = await slot_engine.reserve(booking.date, booking.time, booking.id, booking.user_id)
+    except InvalidSlot as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except SlotUnavailable:
+        raise HTTPException(status_code=409, detail="This slot is fully booked, please pick another time")
+    try:
+        await mongo.writes(WRITE_CRITICAL, booking.user_id).bookings.insert_one(booking.dict())
+    except Exception:
+        await slot_engine.release(booking.date, booking.time, booking.counsellor_id)
+        raise
+    await record_event("booking_created", booking.user_id, booking_id=booking.id)
     return booking
 
+@api_router.get("/slots")
+async def get_slots(date: str):
+    """Free counsellors per time slot on a date (YYYY-MM-DD)"""
+    try:
+        slots = await slot_engine.availability(date)
+    except InvalidSlot as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse({"date": date, "slots": slots})
+
 @api_router.get("/bookings/{user_id}", response_model=List[Booking])
 async def get_bookings(user_id: str):
     """Get all bookings for a user"""
-    bookings = await db.bookings.find({"user_id": user_id}).to_list(100)
-    return [Booking(**b) for b in bookings]
+    bookings = await mongo.reads(user_id).bookings.find({"user_id": user_id}, BOOKING_FIELDS).to_list(100)
+    return FastJSONResponse([fill_defaults(booking, BOOKING_DEFAULTS) for booking in bookings])
+
+MAX_BOOKINGS_PAGE = 100
+
+@api_router.get("/bookings/{user_id}/page")
+async def get_bookings_page(user_id: str, cursor: Optional[str] = None, limit: int = 20):
+    """Newest-first page of a user's bookings; pass next_cursor back to continue"""
+    try:
+        page = await fetch_page(
+            mongo.reads(user_id).bookings, {"user_id": user_id}, cursor,
+            limit=min(max(limit, 1), MAX_BOOKINGS_PAGE), projection=BOOKING_FIELDS
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    bookings = [fill_defaults(booking, BOOKING_DEFAULTS) for booking in page["items"]]
+    return FastJSONResponse({"bookings": bookings, "next_cursor": page["next_cursor"]})
+
+@api_router.get("/bookings/{user_id}/stream")
+async def stream_bookings(user_id: str, batch_size: int = 100):
+    """Every booking of a user as NDJSON, written as documents come off the cursor"""
+    return StreamingResponse(
+        iter_ndjson(mongo.reads(user_id).bookings, {"user_id": user_id}, BOOKING_FIELDS,
+                    batch_size=min(max(batch_size, 1), 1000), defaults=BOOKING_DEFAULTS),
+        media_type="application/x-ndjson"
+    )
 
 # ============== Membership Routes ==============
 
 @api_router.post("/memberships", response_model=Membership)
 async def create_membership(input_data: MembershipCreate):
     """Create membership (Demo payment - always succeeds)"""
-    # Check if user already has membership
-    existing = await db.memberships.find_one({"user_id": input_data.user_id, "status": "active"})
+    # Check if user already has membership, on the primary so a paid one is never missed
+    existing = await mongo.primary.memberships.find_one({"user_id": input_data.user_id, "status": "active"})
     if existing:
         return Membership(**existing)
     
@@ -476,16 +863,70 @@ async def create_membership(input_data: MembershipCreate):
         name=input_data.name,
         phone=input_data.phone
     )
-    await db.memberships.insert_one(membership.dict())
+    await mongo.writes(WRITE_CRITICAL, membership.user_id).memberships.insert_one(membership.dict())
+    membership_cache.invalidate(membership.user_id)
+    await record_event("membership_created", membership.user_id, membership_id=membership.id)
     return membership
 
 @api_router.get("/memberships/{user_id}", response_model=Optional[Membership])
 async def get_membership(user_id: str):
     """Get membership status for a user"""
-    membership = await db.memberships.find_one({"user_id": user_id, "status": "active"})
-    if membership:
-        return Membership(**membership)
-    return None
+    membership = await membership_cache.get(
+        user_id, lambda: mongo.reads(user_id).memberships.find_one({"user_id": user_id, "status": "active"}, MEMBERSHIP_FIELDS)
+    )
+    return FastJSONResponse(membership)
+
+# ============== User Summary Routes ==============
+
+# Only what the home screen renders, so the summary stays one small payload
+SUMMARY_ASSESSMENT_FIELDS = {"_id": 0, "id": 1, "stream": 1, "marks_percentage": 1, "career_goal": 1, "career_interests": 1}
+SUMMARY_RECOMMENDATION_FIELDS = {"_id": 0, "id": 1, "created_at": 1, "careers.name": 1, "careers.course": 1, "careers.starting_salary": 1}
+SUMMARY_BOOKING_FIELDS = {"_id": 0, "id": 1, "consultation_type": 1, "date": 1, "time": 1, "status": 1}
+SUMMARY_MEMBERSHIP_FIELDS = {"_id": 0, "id": 1, "status": 1, "amount": 1, "created_at": 1}
+SUMMARY_BOOKINGS_LIMIT = 5
+
+@api_router.get("/users/{user_id}/summary")
+async def get_user_summary(user_id: str):
+    """Home screen data (assessment, latest careers, bookings, membership) in one round trip"""
+    replica = mongo.reads(user_id)
+    assessment, recommendation, bookings, membership = await asyncio.gather(
+        replica.assessments.find_one({"user_id": user_id}, SUMMARY_ASSESSMENT_FIELDS),
+        replica.career_recommendations.find_one(
+            {"user_id": user_id}, SUMMARY_RECOMMENDATION_FIELDS, sort=[("created_at", -1)]
+        ),
+        replica.bookings.find({"user_id": user_id}, SUMMARY_BOOKING_FIELDS)
+            .sort("created_at", -1).limit(SUMMARY_BOOKINGS_LIMIT).to_list(SUMMARY_BOOKINGS_LIMIT),
+        replica.memberships.find_one({"user_id": user_id, "status": "active"}, SUMMARY_MEMBERSHIP_FIELDS)
+    )
+    pending = latest_pending_recommendation(user_id)
+    if pending:
+        recommendation = {
+            "id": pending["id"],
+            "created_at": pending["created_at"],
+            "careers": [
+                {field: career[field] for field in ("name", "course", "starting_salary") if field in career}
+                for career in pending["careers"]
+            ]
+        }
+    return FastJSONResponse({
+        "user_id": user_id,
+        "assessment": assessment,
+        "recommendation": recommendation,
+        "bookings": bookings,
+        "membership": membership
+    })
+
+# ============== Audit Events ==============
+
+async def record_event(event: str, user_id: str, **data):
+    """Append an audit event (batched when audit_events is in WRITE_BEHIND_COLLECTIONS)"""
+    await audit_writes.add({
+        "id": str(uuid.uuid4()),
+        "event": event,
+        "user_id": user_id,
+        "data": data,
+        "created_at": datetime.utcnow()
+    })
 
 # ============== Utility Routes ==============
 
@@ -497,16 +938,59 @@ async def root():
 async def health_check():
     return {"status": "healthy", "service": "Edu9 API"}
 
-# Include the router in the main app
-app.include_router(api_router)
+def _recommendation_cache_samples() -> dict:
+    stats = recommendation_cache.stats()
+    return {
+        ("memory", "hit"): stats["memory"]["hits"],
+        ("memory", "miss"): stats["memory"]["misses"],
+        ("memory", "eviction"): stats["memory"]["evictions"],
+        ("memory", "expiration"): stats["memory"]["expirations"],
+        ("mongo", "hit"): stats["mongo"]["hits"],
+        ("mongo", "miss"): stats["mongo"]["misses"],
+        ("mongo", "write"): stats["mongo"]["writes"],
+    }
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_credentials=True,
-    allow_origins=["*"],
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+metrics.registry.callback(
+    "edu9_recommendation_cache_events_total", "Recommendation cache events by tier",
+    ("tier", "event"), _recommendation_cache_samples, kind="counter")
+
+def _read_cache_samples(field: str) -> dict:
+    return {(cache.name,): cache.stats()[field] for cache in (assessment_cache, membership_cache)}
+
+metrics.registry.callback(
+    "edu9_read_cache_hits_total", "Read-through cache hits", ("cache",),
+    lambda: _read_cache_samples("hits"), kind="counter")
+metrics.registry.callback(
+    "edu9_read_cache_misses_total", "Read-through cache misses", ("cache",),
+    lambda: _read_cache_samples("misses"), kind="counter")
+metrics.registry.callback(
+    "edu9_read_cache_hit_ratio", "Read-through cache hit ratio since start", ("cache",),
+    lambda: _read_cache_samples("hit_ratio"))
+metrics.registry.callback(
+    "edu9_recommendation_jobs_pending", "Async recommendation jobs waiting for a worker",
+    (), lambda: {(): recommendation_jobs.stats()["pending"]})
+metrics.registry.callback(
+    "edu9_recommendation_flights_in_flight", "Recommendation generations currently in flight",
+    (), lambda: {(): len(recommendation_flights)})
+metrics.registry.callback(
+    "edu9_llm_calls_in_flight", "LLM calls currently holding a concurrency slot",
+    (), lambda: {(): llm_client.in_flight if llm_client else 0})
+metrics.registry.callback(
+    "edu9_write_behind_pending", "Documents buffered for a write-behind flush", ("collection",),
+    lambda: {(buffer.name,): len(buffer) for buffer in write_behind_buffers})
+metrics.registry.callback(
+    "edu9_llm_circuit_state", "LLM circuit breaker state (0 closed, 1 half-open, 2 open)",
+    (), lambda: {(): STATE_VALUES[llm_breaker.state]})
+metrics.registry.callback(
+    "edu9_llm_calls_waiting", "LLM calls waiting for a concurrency slot",
+    (), lambda: {(): llm_client.waiting if llm_client else 0})
+metrics.registry.callback(
+    "edu9_mongo_pool_checked_out", "Connections checked out of each server's pool", ("member",),
+    lambda: {(member,): count for member, count in list(mongo_pool_listener.checked_out.items())})
+metrics.registry.callback(
+    "edu9_mongo_routed_reads_total", "User reads by target (primary after the user's own writes, else replica)",
+    ("target",), lambda: {(target,): count for target, count in mongo.routed_reads.items()} if mongo else {},
+    kind="counter")
 
 # Configure logging
 logging.basicConfig(
@@ -515,6 +999,110 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@app.on_event("shutdown")
+async def startup_db_indexes():
+    failures = await ensure_indexes(db)
+    if failures:
+        logger.warning(f"{failures} indexes could not be created, run db_indexes.py check (dedupe for duplicate phones)")
+
+async def startup_llm_client():
+    global llm_client, career_prompt
+    llm_client = LlmClientManager(
+        new_llm_chat,
+        api_key=EMERGENT_LLM_KEY,
+        system_message=CAREER_SYSTEM_MESSAGE,
+        provider="openai",
+        model="gpt-5.2",
+        max_concurrent=LLM_MAX_CONCURRENCY,
+        max_waiting=LLM_MAX_WAITING,
+        wait_timeout=LLM_WAIT_TIMEOUT_SECONDS
+    )
+    try:
+        takes_params = await asyncio.to_thread(llm_client.takes_params)
+    except Exception as e:
+        logger.warning(f"Could not check the LLM integration for request params: {str(e)}")
+        return
+    if not takes_params:
+        logger.warning("The LLM integration takes no request params: max_tokens and response_format are not sent")
+        if career_prompt.mode == SCHEMA_MODE:
+            # The schema prompt leaves the output format to response_format
+            logger.warning("Structured output is not enforced, using the json prompt mode")
+            career_prompt = CareerPrompt(mode=JSON_MODE, max_output_tokens=career_prompt.max_output_tokens)
+
+async def startup_slot_engine():
+    try:
+        await slot_engine.load_counsellors()
+    except Exception as e:
+        logger.warning(f"Could not load counsellor calendars, using defaults: {str(e)}")
+
+def warm_up():
+    """Import what the app loads lazily: the LLM integration, numpy for the fallback ranking, the tokenizer"""
+    load_llm_integration()
+    scoring_model()
+    count_tokens(CAREER_SYSTEM_MESSAGE)
+
+async def startup_warm_up():
+    # Requests are served meanwhile; a no-op in workers forked from a preloaded master (gunicorn.conf.py)
+    try:
+        await asyncio.to_thread(warm_up)
+    except Exception as e:
+        logger.warning(f"Warm-up failed, modules load on first use: {str(e)}")
+
+cache_watchers = []
+
+async def startup_cache_watchers():
+    if READ_CACHE_CHANGE_STREAMS:
+        cache_watchers.append(asyncio.create_task(watch_invalidations(db.assessments, assessment_cache)))
+        cache_watchers.append(asyncio.create_task(watch_invalidations(db.memberships, membership_cache)))
+
 async def shutdown_db_client():
+    for watcher in cache_watchers:
+        watcher.cancel()
+    cache_watchers.clear()
+    await recommendation_jobs.stop()
+    # Drain after the jobs so their last recommendations are written too
+    for buffer in write_behind_buffers:
+        await buffer.stop()
     client.close()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Per-process resources: the Mongo client, the LLM client and the background workers"""
+    global client
+    if not OTP_DEMO_MODE and not OTP_SECRET:
+        # Unkeyed hashes of 4-digit codes are trivially reversed from a database dump
+        raise RuntimeError("OTP_SECRET must be set when OTP_DEMO_MODE is off")
+    client = create_client(os.environ['MONGO_URL'], event_listeners=[MongoCommandListener(), mongo_pool_listener])
+    init_services(client[os.environ['DB_NAME']])
+    await startup_llm_client()
+    warm_up_task = asyncio.create_task(startup_warm_up())
+    await startup_db_indexes()
+    await startup_slot_engine()
+    await recommendation_jobs.start()
+    for buffer in write_behind_buffers:
+        buffer.start()
+    await startup_cache_watchers()
+    yield
+    await warm_up_task
+    await shutdown_db_client()
+
+def create_app() -> FastAPI:
+    """Build the API app; nothing connects until its lifespan starts in the serving process"""
+    app = FastAPI(lifespan=lifespan)
+
+    # Include the router in the main app
+    app.include_router(api_router)
+
+    app.add_middleware(CompressionMiddleware, minimum_size=COMPRESSION_MIN_BYTES)
+
+    app.add_middleware(MetricsMiddleware)
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_credentials=True,
+        allow_origins=["*"],
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    return app
+
+app = create_app()
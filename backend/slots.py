@@ -0,0 +1,183 @@
+from bisect import bisect_left, insort
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from pymongo.errors import DuplicateKeyError
+
+from ttl_cache import TTLCache
+
+# The time slots the booking screen offers
+DEFAULT_SLOT_TIMES = ("10:00 AM", "11:00 AM", "12:00 PM", "2:00 PM", "3:00 PM", "4:00 PM", "5:00 PM")
+ALL_WEEKDAYS = (0, 1, 2, 3, 4, 5, 6)
+
+
+class InvalidSlot(ValueError):
+    pass
+
+
+class SlotUnavailable(Exception):
+    pass
+
+
+def slot_minutes(label: str) -> int:
+    """Minutes since midnight for a '2:00 PM' style slot label"""
+    try:
+        parsed = datetime.strptime(label.strip().upper(), "%I:%M %p")
+    except (ValueError, AttributeError):
+        raise InvalidSlot(f"Invalid time slot: {label}")
+    return parsed.hour * 60 + parsed.minute
+
+
+def parse_date(value: str) -> datetime:
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except (ValueError, TypeError):
+        raise InvalidSlot(f"Invalid date, expected YYYY-MM-DD: {value}")
+
+
+def normalize_date(value: str) -> str:
+    """Zero-padded YYYY-MM-DD, so '2026-1-5' and '2026-01-05' reserve the same day"""
+    return parse_date(value).strftime("%Y-%m-%d")
+
+
+def default_counsellors(count: int) -> List[dict]:
+    """Calendars used while the counsellors collection is empty"""
+    return [{
+        "id": f"counsellor-{i + 1}",
+        "name": f"Edu9 Counsellor {i + 1}",
+        "working_days": list(ALL_WEEKDAYS),
+        "slot_times": list(DEFAULT_SLOT_TIMES),
+    } for i in range(count)]
+
+
+class DaySlots:
+    """Free (minute, counsellor_id) pairs for one date, kept sorted so lookups bisect"""
+
+    def __init__(self, free: List[Tuple[int, str]]):
+        self.free = sorted(free)
+
+    def claim(self, minute: int) -> Optional[str]:
+        i = bisect_left(self.free, (minute, ""))
+        if i < len(self.free) and self.free[i][0] == minute:
+            return self.free.pop(i)[1]
+        return None
+
+    def release(self, minute: int, counsellor_id: str):
+        i = bisect_left(self.free, (minute, counsellor_id))
+        if i == len(self.free) or self.free[i] != (minute, counsellor_id):
+            insort(self.free, (minute, counsellor_id))
+
+    def counts(self) -> Dict[int, int]:
+        counts: Dict[int, int] = {}
+        for minute, _ in self.free:
+            counts[minute] = counts.get(minute, 0) + 1
+        return counts
+
+
+class SlotEngine:
+    """Counsellor availability served from an in-memory per-day index.
+
+    The unique (date, slot, counsellor_id) index on the reservations
+    collection is the source of truth: a reservation is one insert and a
+    duplicate key means another worker took that counsellor first. The
+    per-day index is rebuilt from reservations once it is older than
+    index_ttl_seconds, so other workers' bookings show up within that window.
+    """
+
+    def __init__(self, counsellors, reservations, default_count: int = 3,
+                 index_ttl_seconds: float = 30, max_days: int = 400):
+        self.counsellors = counsellors
+        self.reservations = reservations
+        self._use_calendars(default_counsellors(default_count))
+        self._days = TTLCache(max_entries=max_days, ttl_seconds=index_ttl_seconds)
+        self.reserved = 0
+        self.conflicts = 0
+
+    async def load_counsellors(self):
+        calendars = await self.counsellors.find({"active": {"$ne": False}}, {"_id": 0}).to_list(1000)
+        if calendars:
+            self._use_calendars(calendars)
+        self._days.clear()
+
+    def _use_calendars(self, calendars: List[dict]):
+        labels = {}
+        for calendar in calendars:
+            for label in calendar.get("slot_times", DEFAULT_SLOT_TIMES):
+                labels.setdefault(slot_minutes(label), label)
+        self.calendars = calendars
+        # minute -> label for every slot any counsellor offers, in time order
+        self.slot_labels = dict(sorted(labels.items()))
+
+    def _open_slots(self, day: datetime) -> List[Tuple[int, str]]:
+        slots = []
+        for calendar in self.calendars:
+            if day.weekday() in calendar.get("working_days", ALL_WEEKDAYS):
+                for label in calendar.get("slot_times", DEFAULT_SLOT_TIMES):
+                    slots.append((slot_minutes(label), calendar["id"]))
+        return slots
+
+    async def _day(self, date: str) -> DaySlots:
+        # date is already normalized, as reservations and the index are keyed on it
+        day_slots = self._days.get(date)
+        if day_slots is None:
+            open_slots = self._open_slots(parse_date(date))
+            taken = await self.reservations.find(
+                {"date": date}, {"_id": 0, "slot": 1, "counsellor_id": 1}
+            ).to_list(None)
+            taken = {(r["slot"], r["counsellor_id"]) for r in taken}
+            day_slots = DaySlots([slot for slot in open_slots if slot not in taken])
+            self._days.set(date, day_slots)
+        return day_slots
+
+    async def availability(self, date: str) -> List[dict]:
+        """Free counsellors per time slot on a date"""
+        counts = (await self._day(normalize_date(date))).counts()
+        return [{"time": label, "available": counts.get(minute, 0)} for minute, label in self.slot_labels.items()]
+
+    async def reserve(self, date: str, time: str, booking_id: str, user_id: str) -> str:
+        """Atomically reserve a free counsellor for the slot, returns the counsellor id"""
+        minute = slot_minutes(time)
+        if minute not in self.slot_labels:
+            raise InvalidSlot(f"{time} is not a consultation slot")
+        date = normalize_date(date)
+        day_slots = await self._day(date)
+        while True:
+            counsellor_id = day_slots.claim(minute)
+            if counsellor_id is None:
+                raise SlotUnavailable(f"No counsellor free on {date} at {time}")
+            try:
+                await self.reservations.insert_one({
+                    "date": date,
+                    # Minutes since midnight, so '2:00 PM' and '02:00 pm' are one slot
+                    "slot": minute,
+                    "time": time,
+                    "counsellor_id": counsellor_id,
+                    "booking_id": booking_id,
+                    "user_id": user_id,
+                    "created_at": datetime.utcnow(),
+                })
+            except DuplicateKeyError:
+                # Taken by another worker since our index was built, try the next counsellor
+                self.conflicts += 1
+                continue
+            except Exception:
+                day_slots.release(minute, counsellor_id)
+                raise
+            self.reserved += 1
+            return counsellor_id
+
+    async def release(self, date: str, time: str, counsellor_id: str):
+        minute = slot_minutes(time)
+        date = normalize_date(date)
+        await self.reservations.delete_one({"date": date, "slot": minute, "counsellor_id": counsellor_id})
+        day_slots = self._days.get(date)
+        if day_slots is not None:
+            day_slots.release(minute, counsellor_id)
+
+    def stats(self) -> dict:
+        return {
+            "days_indexed": len(self._days),
+            "counsellors": len(self.calendars),
+            "reserved": self.reserved,
+            "conflicts": self.conflicts,
+        }
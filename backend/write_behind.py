@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import time
+from typing import Callable, List, Optional
+
+from pymongo.errors import BulkWriteError
+
+import metrics
+
+
+class WriteBehindBuffer:
+    """Batches inserts into an append-only collection.
+
+    Documents are queued in memory and written with one insert_many once
+    max_batch are waiting or the oldest has waited flush_interval seconds.
+    They stay visible through pending() until their batch is written, so a
+    user reading right after a write still sees it. When disabled, add()
+    is a plain insert_one.
+    """
+
+    def __init__(self, collection, enabled: bool = True, max_batch: int = 100,
+                 flush_interval: float = 0.05, max_pending: int = 10000):
+        self.collection = collection
+        self.name = collection.name
+        self.enabled = enabled
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._buffer: List[dict] = []
+        self._has_documents = asyncio.Event()
+        self._batch_full = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self.enabled:
+            self._task = asyncio.create_task(self._run(), name=f"write-behind-{self.name}")
+
+    async def stop(self):
+        """Stop the background flusher and write out everything still buffered"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+        if self._buffer:
+            logging.error(f"Write-behind for {self.name} lost {len(self._buffer)} documents on shutdown")
+
+    async def add(self, document: dict):
+        if not self.enabled:
+            await self.collection.insert_one(document)
+            return
+        if len(self._buffer) >= self.max_pending:
+            # Mongo is not keeping up: make the writer wait instead of growing without bound
+            await self.flush()
+        self._buffer.append(document)
+        self._has_documents.set()
+        if len(self._buffer) >= self.max_batch:
+            self._batch_full.set()
+
+    def pending(self, match: Callable[[dict], bool]) -> List[dict]:
+        """Buffered documents not yet in Mongo that match, oldest first"""
+        return [document for document in self._buffer if match(document)]
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    async def _run(self):
+        while True:
+            await self._has_documents.wait()
+            try:
+                await asyncio.wait_for(self._batch_full.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            if not await self.flush():
+                # Back off instead of spinning while Mongo is unreachable
+                await asyncio.sleep(max(self.flush_interval, 1.0))
+
+    async def flush(self) -> bool:
+        """Write buffered documents in batches, False when a batch has to be retried later"""
+        async with self._flush_lock:
+            while self._buffer:
+                batch = self._buffer[:self.max_batch]
+                started = time.perf_counter()
+                try:
+                    await self.collection.insert_many(batch, ordered=False)
+                    failed = 0
+                except BulkWriteError as e:
+                    # The rest of the batch was written, only these documents are lost
+                    failed = len(e.details.get("writeErrors", []))
+                    logging.error(f"Write-behind for {self.name} rejected {failed} documents: {str(e)}")
+                except Exception as e:
+                    # Keep the batch buffered and retry on the next flush
+                    logging.error(f"Write-behind flush for {self.name} failed: {str(e)}")
+                    metrics.write_behind_flush_seconds.observe(time.perf_counter() - started, self.name, "error")
+                    return False
+                metrics.write_behind_flush_seconds.observe(time.perf_counter() - started, self.name, "ok")
+                metrics.write_behind_documents_total.inc(self.name, "written", amount=len(batch) - failed)
+                if failed:
+                    metrics.write_behind_documents_total.inc(self.name, "rejected", amount=failed)
+                # Removed only once written so pending() covers documents in flight
+                del self._buffer[:len(batch)]
+            if not self._buffer:
+                self._has_documents.clear()
+            if len(self._buffer) < self.max_batch:
+                self._batch_full.clear()
+            return True
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "pending": len(self._buffer),
+            "max_batch": self.max_batch,
+            "flush_interval": self.flush_interval,
+        }
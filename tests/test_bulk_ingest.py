@@ -0,0 +1,91 @@
+import asyncio
+import io
+from typing import List
+
+from pydantic import BaseModel
+from pymongo.errors import BulkWriteError
+
+from bulk_ingest import ingest_rows, iter_rows
+
+HEADER = b"name,grade,subjects\n"
+
+
+class Row(BaseModel):
+    name: str
+    grade: int
+    subjects: List[str] = []
+
+
+def build_document(row: dict) -> dict:
+    row = Row(**row)
+    return {"id": f"id-{row.name}", "user_id": f"user-{row.name}", **row.model_dump()}
+
+
+class FakeAssessments:
+    """Unordered insert_many that rejects the documents named in reject"""
+
+    def __init__(self, reject=()):
+        self.reject = set(reject)
+        self.documents = []
+        self.batches = []
+
+    async def insert_many(self, documents, ordered=True):
+        assert not ordered
+        self.batches.append(len(documents))
+        errors = []
+        for index, document in enumerate(documents):
+            if document["name"] in self.reject:
+                errors.append({"index": index, "code": 11000, "errmsg": f"duplicate {document['name']}"})
+            else:
+                self.documents.append(document)
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(documents) - len(errors)})
+
+
+def ingest(content, collection=None, fmt="csv", batch_size=500):
+    collection = collection or FakeAssessments()
+    file = io.BytesIO(content) if isinstance(content, bytes) else content
+    return asyncio.run(ingest_rows(iter_rows(file, fmt), collection, build_document, batch_size)), collection
+
+
+def test_valid_rows_are_inserted_in_batches():
+    report, collection = ingest(HEADER + b"".join(b"s%d,10,Maths;Physics\n" % i for i in range(5)), batch_size=2)
+    assert (report["total_rows"], report["inserted"], report["failed"], report["complete"]) == (5, 5, 0, True)
+    assert collection.batches == [2, 2, 1]
+    assert [entry["row"] for entry in report["assessments"]] == [2, 3, 4, 5, 6]
+    assert collection.documents[0]["subjects"] == ["Maths", "Physics"]
+
+
+def test_validation_errors_are_reported_by_row():
+    report, collection = ingest(HEADER + b"ok,10,\nbad,tenth,\nalso-ok,12,\n")
+    assert (report["inserted"], report["failed"]) == (2, 1)
+    assert [error["row"] for error in report["errors"]] == [3]
+    assert report["errors"][0]["error"].startswith("grade:")
+
+
+def test_bulk_write_errors_map_back_to_row_numbers():
+    # The invalid row is skipped before insert_many, so write indexes and row numbers differ
+    content = HEADER + b"a,10,\nbad,x,\nb,10,\nc,10,\n"
+    report, collection = ingest(content, FakeAssessments(reject={"c"}))
+    assert (report["inserted"], report["failed"]) == (2, 2)
+    assert [error["row"] for error in report["errors"]] == [3, 5]
+    assert report["errors"][1]["error"] == "duplicate c"
+    assert [entry["row"] for entry in report["assessments"]] == [2, 4]
+
+
+def test_undecodable_line_part_way_through_a_batch_keeps_the_rows_before_it():
+    chunks = [HEADER, b"a,10,\n", b"b,10,\n", b"caf\xe9,10,\n", b"d,10,\n"]
+    report, collection = ingest(iter(chunks), batch_size=10)
+    assert report["complete"] is False
+    assert [entry["row"] for entry in report["assessments"]] == [2, 3]
+    # The stop entry names the first row not read and is not counted as a failed row
+    assert report["errors"][-1]["row"] == 4
+    assert "not UTF-8" in report["errors"][-1]["error"]
+    assert (report["total_rows"], report["inserted"], report["failed"]) == (2, 2, 0)
+
+
+def test_jsonl_rows_that_are_not_objects_fail_on_their_own():
+    content = b'{"name": "a", "grade": 10}\n[1, 2]\n{not json\n{"name": "b", "grade": 11}\n'
+    report, _ = ingest(content, fmt="jsonl")
+    assert (report["inserted"], report["failed"]) == (2, 2)
+    assert [error["row"] for error in report["errors"]] == [2, 3]
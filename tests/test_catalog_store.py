@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+import career_catalog
+from career_catalog import BUILTIN_CATALOG, rank_careers
+from catalog_store import FIELDS, CatalogFormatError, CatalogStore, compile_catalog
+
+
+def values(field):
+    return sorted({value for career in BUILTIN_CATALOG for value in career[field]})
+
+
+def profiles(count, seed=7):
+    rng = random.Random(seed)
+    streams, interests, subjects, goals = values("streams"), values("interests"), values("subjects"), values("goals")
+    for _ in range(count):
+        yield {
+            "stream": rng.choice(streams),
+            "marks_percentage": rng.randint(35, 99),
+            "career_interests": rng.sample(interests, 2),
+            "strong_subjects": rng.sample(subjects, 2),
+            "subjects": rng.sample(subjects, 5),
+            "career_goal": rng.choice(goals),
+        }
+
+
+def rankings(monkeypatch, catalog):
+    monkeypatch.setattr(career_catalog, "CAREER_CATALOG", catalog)
+    career_catalog.scoring_model.cache_clear()
+    try:
+        return [rank_careers(profile, limit=5) for profile in profiles(300)]
+    finally:
+        career_catalog.scoring_model.cache_clear()
+
+
+@pytest.fixture
+def compiled(tmp_path):
+    path = tmp_path / "career_catalog.bin"
+    compile_catalog(BUILTIN_CATALOG, path, builtin=True)
+    return CatalogStore(path)
+
+
+def test_round_trip_keeps_every_career_field(compiled):
+    assert len(compiled) == len(BUILTIN_CATALOG)
+    assert compiled.builtin
+    for view, career in zip(compiled, BUILTIN_CATALOG):
+        assert {field: view[field] for field in FIELDS} == {field: career[field] for field in FIELDS}
+
+
+def test_ranking_from_the_compiled_catalog_matches_the_builtin_one(monkeypatch, compiled):
+    assert rankings(monkeypatch, compiled) == rankings(monkeypatch, BUILTIN_CATALOG)
+
+
+def test_stale_compiled_catalog_falls_back_to_builtin(monkeypatch, tmp_path):
+    path = tmp_path / "career_catalog.bin"
+    compile_catalog(BUILTIN_CATALOG[:-1], path, builtin=True)
+    monkeypatch.setattr(career_catalog, "CATALOG_PATH", str(path))
+    assert career_catalog.load_catalog() is BUILTIN_CATALOG
+
+
+def test_current_compiled_catalog_is_used(monkeypatch, tmp_path):
+    path = tmp_path / "career_catalog.bin"
+    compile_catalog(BUILTIN_CATALOG, path, builtin=True)
+    monkeypatch.setattr(career_catalog, "CATALOG_PATH", str(path))
+    assert isinstance(career_catalog.load_catalog(), CatalogStore)
+
+
+def test_rejects_files_that_are_not_compiled_catalogs(tmp_path):
+    path = tmp_path / "career_catalog.bin"
+    path.write_bytes(b"not a catalog" * 10)
+    with pytest.raises(CatalogFormatError):
+        CatalogStore(path)
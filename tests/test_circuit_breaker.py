@@ -0,0 +1,161 @@
+import pytest
+
+import circuit_breaker
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpen
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", clock)
+    return clock
+
+
+def breaker(**options):
+    settings = {"window_seconds": 60, "min_calls": 4, "failure_ratio": 0.5, "slow_call_seconds": 5, "open_seconds": 30}
+    settings.update(options)
+    return CircuitBreaker("test", **settings)
+
+
+def trip(circuit):
+    for _ in range(circuit.min_calls):
+        circuit.allow()
+        circuit.record_failure()
+    assert circuit.state == OPEN
+
+
+def half_open(circuit, clock):
+    trip(circuit)
+    clock.now += circuit.open_seconds
+    assert circuit.state == HALF_OPEN
+
+
+def test_waits_for_min_calls_before_judging(clock):
+    circuit = breaker()
+    for _ in range(3):
+        assert circuit.allow() is None
+        circuit.record_failure()
+    assert circuit.state == CLOSED
+    circuit.allow()
+    circuit.record_success(0.1)
+    # 3 of 4 calls failed once min_calls is reached
+    assert circuit.state == OPEN
+
+
+def test_stays_closed_below_failure_ratio(clock):
+    circuit = breaker()
+    circuit.allow()
+    circuit.record_failure()
+    for _ in range(3):
+        circuit.allow()
+        circuit.record_success(0.1)
+    assert circuit.state == CLOSED
+
+
+def test_opens_on_failure_ratio_and_rejects(clock):
+    circuit = breaker()
+    for _ in range(2):
+        circuit.allow()
+        circuit.record_success(0.1)
+    for _ in range(2):
+        circuit.allow()
+        circuit.record_failure()
+    assert circuit.state == OPEN
+    with pytest.raises(CircuitOpen):
+        circuit.allow()
+    assert circuit.stats()["rejected"] == 1
+
+
+def test_slow_calls_count_as_failures(clock):
+    circuit = breaker()
+    for _ in range(4):
+        circuit.allow()
+        circuit.record_success(5.0)
+    assert circuit.state == OPEN
+
+
+def test_failures_outside_the_window_are_forgotten(clock):
+    circuit = breaker()
+    for _ in range(3):
+        circuit.allow()
+        circuit.record_failure()
+    clock.now += 61
+    circuit.allow()
+    circuit.record_failure()
+    assert circuit.state == CLOSED
+
+
+def test_half_opens_after_open_seconds_and_allows_one_probe(clock):
+    circuit = breaker()
+    trip(circuit)
+    clock.now += 29
+    assert circuit.state == OPEN
+    clock.now += 1
+    assert circuit.state == HALF_OPEN
+    assert circuit.allow() is not None
+    with pytest.raises(CircuitOpen):
+        circuit.allow()
+
+
+def test_probe_success_closes(clock):
+    circuit = breaker()
+    half_open(circuit, clock)
+    probe = circuit.allow()
+    circuit.record_success(0.1, probe)
+    circuit.release(probe)
+    assert circuit.state == CLOSED
+    assert circuit.allow() is None
+
+
+def test_probe_failure_reopens(clock):
+    circuit = breaker()
+    half_open(circuit, clock)
+    probe = circuit.allow()
+    circuit.record_failure(probe)
+    circuit.release(probe)
+    assert circuit.state == OPEN
+    assert circuit.stats()["opened"] == 2
+    with pytest.raises(CircuitOpen):
+        circuit.allow()
+
+
+def test_slow_probe_reopens(clock):
+    circuit = breaker()
+    half_open(circuit, clock)
+    probe = circuit.allow()
+    circuit.record_success(5.0, probe)
+    assert circuit.state == OPEN
+
+
+def test_released_probe_lets_the_next_call_probe(clock):
+    circuit = breaker()
+    half_open(circuit, clock)
+    # Shed before reaching the dependency: reports nothing
+    circuit.release(circuit.allow())
+    assert circuit.state == HALF_OPEN
+    assert circuit.allow() is not None
+
+
+def test_calls_started_before_half_open_cannot_resolve_it(clock):
+    circuit = breaker()
+    earlier = circuit.allow()
+    half_open(circuit, clock)
+    probe = circuit.allow()
+
+    # An older call finishing now neither closes the circuit nor frees the probe
+    circuit.record_success(0.1, earlier)
+    circuit.release(earlier)
+    assert circuit.state == HALF_OPEN
+    with pytest.raises(CircuitOpen):
+        circuit.allow()
+
+    circuit.record_success(0.1, probe)
+    assert circuit.state == CLOSED
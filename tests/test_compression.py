@@ -0,0 +1,119 @@
+import asyncio
+import gzip
+import json
+
+import pytest
+
+import compression
+from compression import CompressionMiddleware, matching_etag, negotiate_encoding
+
+ETAG = '"abc123"'
+
+
+@pytest.fixture
+def with_brotli(monkeypatch):
+    # Negotiation only asks whether brotli is importable
+    monkeypatch.setattr(compression, "brotli", object())
+
+
+@pytest.fixture
+def without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate, br", "br"),
+    ("gzip;q=1.0, br;q=0.5", "gzip"),
+    ("br;q=0, gzip", "gzip"),
+    ("gzip;q=0, br;q=0", None),
+    ("deflate, identity", None),
+    ("*", "br"),
+    ("*;q=0.5, br;q=0.1", "gzip"),
+    ("gzip;q=0, *", "br"),
+    ("GZIP", "gzip"),
+    ("gzip;q=abc, br;q=0.2", "br"),
+])
+def test_negotiate_encoding_with_brotli(with_brotli, header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("br", None),
+    ("br, gzip;q=0.1", "gzip"),
+    ("*", "gzip"),
+])
+def test_negotiate_encoding_never_picks_br_without_brotli(without_brotli, header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+@pytest.mark.parametrize("if_none_match, expected", [
+    (None, None),
+    ('"other"', None),
+    (ETAG, ETAG),
+    ('"abc123-gzip"', '"abc123-gzip"'),
+    ('"abc123-br"', '"abc123-br"'),
+    ('W/"abc123-gzip"', 'W/"abc123-gzip"'),
+    ('"other", "abc123-gzip"', '"abc123-gzip"'),
+    ("*", ETAG),
+])
+def test_matching_etag_accepts_compressed_variants(if_none_match, expected):
+    assert matching_etag(if_none_match, ETAG) == expected
+
+
+def json_app(body: bytes, headers=(), more_body=False):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [
+            (b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()), *headers]})
+        await send({"type": "http.response.body", "body": body, "more_body": more_body})
+        if more_body:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+    return app
+
+
+def run(app, accept_encoding="gzip", minimum_size=100):
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "headers": [(b"accept-encoding", accept_encoding.encode())]}
+    asyncio.run(CompressionMiddleware(app, minimum_size=minimum_size)(scope, None, send))
+    return dict(sent[0]["headers"]), sent[1:]
+
+
+LARGE = json.dumps([{"career": "Software Engineering", "rank": i} for i in range(50)]).encode()
+
+
+def test_large_json_is_compressed_with_its_own_etag(without_brotli):
+    headers, bodies = run(json_app(LARGE, [(b"etag", ETAG.encode())]))
+    assert headers[b"content-encoding"] == b"gzip"
+    assert headers[b"etag"] == b'"abc123-gzip"'
+    assert headers[b"vary"] == b"Accept-Encoding"
+    assert gzip.decompress(bodies[0]["body"]) == LARGE
+    assert headers[b"content-length"] == str(len(bodies[0]["body"])).encode()
+
+
+def test_body_under_the_threshold_passes_through():
+    headers, bodies = run(json_app(b'{"ok": true}'))
+    assert b"content-encoding" not in headers
+    assert headers[b"vary"] == b"Accept-Encoding"
+    assert bodies[0]["body"] == b'{"ok": true}'
+
+
+def test_streamed_body_passes_through():
+    headers, bodies = run(json_app(LARGE, more_body=True))
+    assert b"content-encoding" not in headers
+    assert [message["body"] for message in bodies] == [LARGE, b""]
+
+
+def test_existing_vary_is_merged_once():
+    headers, _ = run(json_app(LARGE, [(b"vary", b"Origin")]))
+    assert headers[b"vary"] == b"Origin, Accept-Encoding"
+    headers, _ = run(json_app(LARGE, [(b"Vary", b"Origin, accept-encoding")]))
+    assert headers[b"Vary"] == b"Origin, accept-encoding"
+
+
+def test_no_acceptable_encoding_leaves_the_response_alone():
+    headers, bodies = run(json_app(LARGE), accept_encoding="identity")
+    assert b"vary" not in headers
+    assert bodies[0]["body"] == LARGE
@@ -0,0 +1,96 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from llm_json import JsonArrayStreamParser, array_spans, extract_careers
+
+CORPUS_PATH = Path(__file__).resolve().parent.parent / "backend" / "benchmarks" / "llm_replies.jsonl"
+with open(CORPUS_PATH, encoding="utf-8") as f:
+    CORPUS = {entry["name"]: entry["reply"] for entry in (json.loads(line) for line in f if line.strip())}
+
+# Recorded replies that hold no complete career list
+UNPARSEABLE = {"truncated_reply", "no_json"}
+PARSEABLE = sorted(set(CORPUS) - UNPARSEABLE)
+
+
+def stream(reply: str, chunk_size: int):
+    parser = JsonArrayStreamParser()
+    items = []
+    for i in range(0, len(reply), chunk_size):
+        items.extend(parser.feed(reply[i:i + chunk_size]))
+    return parser, items
+
+
+def test_corpus_covers_both_outcomes():
+    assert PARSEABLE and UNPARSEABLE <= set(CORPUS)
+
+
+@pytest.mark.parametrize("name", PARSEABLE)
+def test_extract_careers_parses_recorded_replies(name):
+    careers = extract_careers(CORPUS[name])
+    assert len(careers) == 3
+    assert all(isinstance(career["name"], str) and career["name"] for career in careers)
+    assert all(isinstance(career["roadmap"], list) for career in careers)
+
+
+@pytest.mark.parametrize("name", sorted(UNPARSEABLE))
+def test_extract_careers_rejects_replies_without_a_list(name):
+    assert extract_careers(CORPUS[name]) is None
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 100000])
+@pytest.mark.parametrize("name", PARSEABLE)
+def test_stream_parser_matches_extract_careers(name, chunk_size):
+    parser, items = stream(CORPUS[name], chunk_size)
+    assert parser.finished
+    assert items == extract_careers(CORPUS[name])
+
+
+def test_stream_parser_yields_complete_elements_of_a_truncated_reply():
+    parser, items = stream(CORPUS["truncated_reply"], 16)
+    assert not parser.finished
+    # The reply stops inside the second career
+    assert len(items) == 1
+    assert set(items[0]) >= {"name", "course", "roadmap"}
+
+
+def test_stream_parser_ignores_text_after_the_array():
+    parser = JsonArrayStreamParser()
+    assert parser.feed('Sure: [{"a": 1}] and [{"b": 2}]') == [{"a": 1}]
+    assert parser.finished
+    assert parser.feed('[{"c": 3}]') == []
+
+
+def test_stream_parser_skips_bracketed_prose():
+    parser = JsonArrayStreamParser()
+    assert parser.feed('Profile [Commerce, 78%] gives [{"name": "CA"}]') == [{"name": "CA"}]
+
+
+def test_stream_parser_handles_braces_and_escapes_in_strings():
+    parser = JsonArrayStreamParser()
+    items = parser.feed('[{"name": "A {b} [c] \\" }"}, {"name": "D"}]')
+    assert items == [{"name": 'A {b} [c] " }'}, {"name": "D"}]
+
+
+def test_array_spans_nested_and_in_order():
+    text = 'x [1, [2, 3]] y [4]'
+    assert array_spans(text) == [(2, 13), (6, 12), (16, 19)]
+
+
+def test_array_spans_ignores_brackets_inside_strings():
+    text = '["a]", "[b"]'
+    assert array_spans(text) == [(0, len(text))]
+
+
+def test_array_spans_skips_unclosed_and_resyncs_after_mismatch():
+    assert array_spans('see [details') == []
+    text = '[1, {2]] then [3]'
+    assert array_spans(text) == [(text.index('[3]'), len(text))]
+
+
+@pytest.mark.parametrize("name", sorted(CORPUS))
+def test_array_spans_are_balanced_slices(name):
+    reply = CORPUS[name]
+    for start, end in array_spans(reply):
+        assert reply[start] == "[" and reply[end - 1] == "]"
@@ -0,0 +1,174 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from otp_store import OtpStore, is_well_formed, upsert_user_by_phone
+
+PHONE = "9876543210"
+
+
+def matches(document, query):
+    for field, condition in query.items():
+        value = document.get(field)
+        if isinstance(condition, dict):
+            if "$gt" in condition and not (value is not None and value > condition["$gt"]):
+                return False
+            if "$gte" in condition and not (value is not None and value >= condition["$gte"]):
+                return False
+            if "$not" in condition and matches(document, {field: condition["$not"]}):
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class FakeOtpCodes:
+    """The otp_codes collection, for the queries OtpStore issues"""
+
+    def __init__(self):
+        self.documents = []
+
+    def _find(self, query):
+        return next((document for document in self.documents if matches(document, query)), None)
+
+    async def update_one(self, query, update, upsert=False):
+        document = self._find(query)
+        if document is None and upsert:
+            document = dict(query)
+            self.documents.append(document)
+        document.update(update["$set"])
+
+    async def find_one_and_delete(self, query, projection=None):
+        document = self._find(query)
+        if document is not None:
+            self.documents.remove(document)
+        return document
+
+    async def find_one_and_update(self, query, update, projection=None, return_document=None):
+        document = self._find(query)
+        if document is not None:
+            for field, amount in update["$inc"].items():
+                document[field] = document.get(field, 0) + amount
+        return document
+
+    async def delete_one(self, query):
+        document = self._find(query)
+        if document is not None:
+            self.documents.remove(document)
+
+
+def wrong(code):
+    return f"{(int(code) + 1) % 10000:04d}"
+
+
+def test_issued_code_is_stored_only_as_a_keyed_hash():
+    collection = FakeOtpCodes()
+    code = asyncio.run(OtpStore(collection, secret="s1").issue(PHONE))
+    assert is_well_formed(code)
+    stored = collection.documents[0]
+    assert code not in stored["code_hash"]
+    assert stored["code_hash"] != OtpStore(FakeOtpCodes(), secret="s2")._hash(PHONE, code)
+    assert stored["expires_at"] > datetime.utcnow()
+
+
+def test_code_is_accepted_once():
+    async def scenario():
+        store = OtpStore(FakeOtpCodes(), secret="s")
+        code = await store.issue(PHONE)
+        return await store.consume(PHONE, code), await store.consume(PHONE, code)
+
+    assert asyncio.run(scenario()) == (True, False)
+
+
+def test_expired_code_is_rejected():
+    async def scenario():
+        collection = FakeOtpCodes()
+        store = OtpStore(collection, secret="s")
+        code = await store.issue(PHONE)
+        collection.documents[0]["expires_at"] = datetime.utcnow() - timedelta(seconds=1)
+        return await store.consume(PHONE, code)
+
+    assert asyncio.run(scenario()) is False
+
+
+def test_code_is_deleted_after_max_wrong_guesses():
+    async def scenario():
+        collection = FakeOtpCodes()
+        store = OtpStore(collection, secret="s", max_attempts=3)
+        code = await store.issue(PHONE)
+        guesses = [await store.consume(PHONE, wrong(code)) for _ in range(2)]
+        attempts = collection.documents[0]["attempts"]
+        guesses.append(await store.consume(PHONE, wrong(code)))
+        # Even the right code is refused once the guesses are used up
+        return guesses, attempts, collection.documents, await store.consume(PHONE, code)
+
+    guesses, attempts, remaining, late = asyncio.run(scenario())
+    assert guesses == [False, False, False]
+    assert attempts == 2
+    assert remaining == []
+    assert late is False
+
+
+def test_reissuing_a_code_resets_the_attempts():
+    async def scenario():
+        store = OtpStore(FakeOtpCodes(), secret="s", max_attempts=2)
+        code = await store.issue(PHONE)
+        await store.consume(PHONE, wrong(code))
+        code = await store.issue(PHONE)
+        await store.consume(PHONE, wrong(code))
+        return await store.consume(PHONE, code)
+
+    assert asyncio.run(scenario()) is True
+
+
+class FakeUsers:
+    """find_one_and_update upserts, losing the first race when raced is set"""
+
+    def __init__(self, raced=False):
+        self.documents = []
+        self.raced = raced
+        self.calls = 0
+
+    async def find_one_and_update(self, query, update, projection=None, upsert=False, return_document=None):
+        self.calls += 1
+        document = next((d for d in self.documents if d["phone"] == query["phone"]), None)
+        if document is None:
+            if self.raced:
+                # Another request inserted the user between our lookup and insert
+                self.raced = False
+                self.documents.append({"id": "winner", "phone": query["phone"]})
+                raise DuplicateKeyError("E11000 duplicate key error")
+            document = {**query, **update["$setOnInsert"]}
+            self.documents.append(document)
+        document.update(update.get("$set", {}))
+        return {"id": document["id"]}
+
+
+def test_upsert_user_by_phone_creates_then_updates():
+    async def scenario():
+        users = FakeUsers()
+        created = await upsert_user_by_phone(users, PHONE, {}, {"id": "u1", "name": "User"})
+        updated = await upsert_user_by_phone(users, PHONE, {"verified": True}, {"id": "u2", "name": "User"})
+        return created, updated, users.documents
+
+    created, updated, documents = asyncio.run(scenario())
+    assert created == updated == {"id": "u1"}
+    assert documents == [{"phone": PHONE, "id": "u1", "name": "User", "verified": True}]
+
+
+def test_upsert_user_by_phone_retries_a_lost_race():
+    users = FakeUsers(raced=True)
+    user = asyncio.run(upsert_user_by_phone(users, PHONE, {"verified": True}, {"id": "u1", "name": "User"}))
+    assert user == {"id": "winner"}
+    assert users.calls == 2
+
+
+def test_upsert_user_by_phone_gives_up_after_one_retry():
+    class AlwaysDuplicate:
+        async def find_one_and_update(self, *args, **kwargs):
+            raise DuplicateKeyError("E11000 duplicate key error")
+
+    with pytest.raises(DuplicateKeyError):
+        asyncio.run(upsert_user_by_phone(AlwaysDuplicate(), PHONE, {}, {"id": "u1"}))
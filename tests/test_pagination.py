@@ -0,0 +1,104 @@
+import asyncio
+import base64
+from datetime import datetime, timedelta
+
+import pytest
+
+from pagination import InvalidCursor, decode_cursor, encode_cursor, fetch_page, keyset_filter
+
+START = datetime(2026, 3, 1, 9, 30, 15, 250000)
+
+
+def matches(document, query):
+    for field, condition in query.items():
+        if field == "$or":
+            if not any(matches(document, branch) for branch in condition):
+                return False
+        elif isinstance(condition, dict):
+            if not document[field] < condition["$lt"]:
+                return False
+        elif document[field] != condition:
+            return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def sort(self, keys):
+        for field, direction in reversed(keys):
+            self.documents.sort(key=lambda document: document[field], reverse=direction < 0)
+        return self
+
+    def limit(self, count):
+        self.documents = self.documents[:count]
+        return self
+
+    async def to_list(self, length):
+        return self.documents[:length]
+
+
+class FakeBookings:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def find(self, query, projection=None):
+        return FakeCursor([dict(document) for document in self.documents if matches(document, query)])
+
+
+def bookings():
+    # Three timestamps shared by several bookings each, plus another user's bookings
+    documents = []
+    for i in range(11):
+        documents.append({"id": f"b{i:02d}", "user_id": "u1", "created_at": START + timedelta(minutes=i // 4)})
+        documents.append({"id": f"o{i:02d}", "user_id": "u2", "created_at": START + timedelta(minutes=i)})
+    return documents
+
+
+def newest_first(documents):
+    return sorted(documents, key=lambda document: (document["created_at"], document["id"]), reverse=True)
+
+
+def test_cursor_round_trip_keeps_microseconds_and_id():
+    cursor = encode_cursor({"created_at": START, "id": "b07", "user_id": "u1"})
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (START, "b07")
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    base64.urlsafe_b64encode(b"not json").decode(),
+    base64.urlsafe_b64encode(b'{"id": "b1"}').decode(),
+    base64.urlsafe_b64encode(b'{"created_at": "yesterday", "id": "b1"}').decode(),
+    base64.urlsafe_b64encode(b'["2026-03-01T09:30:15", "b1"]').decode(),
+])
+def test_garbage_cursors_are_invalid(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+def test_keyset_filter_breaks_ties_on_id():
+    documents = [{"id": document_id, "created_at": START} for document_id in ("a", "b", "c")]
+    query = keyset_filter({}, encode_cursor({"created_at": START, "id": "b"}))
+    assert [document["id"] for document in documents if matches(document, query)] == ["a"]
+    assert keyset_filter({"user_id": "u1"}, None) == {"user_id": "u1"}
+
+
+def test_walking_every_page_matches_the_full_order():
+    async def walk(limit):
+        collection = FakeBookings(bookings())
+        pages, cursor = [], None
+        while True:
+            page = await fetch_page(collection, {"user_id": "u1"}, cursor, limit, {"_id": 0})
+            pages.append(page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return pages
+
+    expected = [document["id"] for document in newest_first(d for d in bookings() if d["user_id"] == "u1")]
+    for limit in (1, 3, 4, 11, 20):
+        pages = asyncio.run(walk(limit))
+        assert [document["id"] for page in pages for document in page] == expected
+        assert all(len(page) == limit for page in pages[:-1])
+        assert 0 < len(pages[-1]) <= limit
@@ -0,0 +1,86 @@
+import asyncio
+
+from read_cache import ReadThroughCache
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_loads_once_then_serves_from_cache():
+    async def scenario():
+        cache = ReadThroughCache("test")
+        loads = []
+
+        async def loader():
+            loads.append(1)
+            return None
+
+        assert await cache.get("u1", loader) is None
+        assert await cache.get("u1", loader) is None
+        return len(loads)
+
+    assert run(scenario()) == 1
+
+
+def test_load_overtaken_by_invalidate_is_not_cached():
+    async def scenario():
+        cache = ReadThroughCache("test")
+        release = asyncio.Event()
+
+        async def old_read():
+            await release.wait()
+            return None
+
+        reader = asyncio.create_task(cache.get("u1", old_read))
+        await asyncio.sleep(0)
+        # The write lands while the read is still in flight
+        cache.invalidate("u1")
+        release.set()
+        assert await reader is None
+
+        async def new_read():
+            return {"status": "active"}
+
+        return await cache.get("u1", new_read), cache.stats()["stale_loads"]
+
+    assert run(scenario()) == ({"status": "active"}, 1)
+
+
+def test_clear_discards_loads_in_flight():
+    async def scenario():
+        cache = ReadThroughCache("test")
+        release = asyncio.Event()
+
+        async def old_read():
+            await release.wait()
+            return "old"
+
+        reader = asyncio.create_task(cache.get("u1", old_read))
+        await asyncio.sleep(0)
+        cache.clear()
+        release.set()
+        await reader
+
+        async def new_read():
+            return "new"
+
+        return await cache.get("u1", new_read)
+
+    assert run(scenario()) == "new"
+
+
+def test_failed_load_leaves_no_state_behind():
+    async def scenario():
+        cache = ReadThroughCache("test")
+
+        async def failing():
+            raise RuntimeError("down")
+
+        try:
+            await cache.get("u1", failing)
+        except RuntimeError:
+            pass
+        return cache._loading
+
+    assert run(scenario()) == {}
@@ -0,0 +1,168 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from recommendation_jobs import COMPLETED, FAILED, INTERRUPTED_ERROR, QUEUED, RUNNING, RecommendationJobQueue
+
+
+def matches(document, query):
+    for field, condition in query.items():
+        value = document.get(field)
+        if isinstance(condition, dict):
+            if "$in" in condition and value not in condition["$in"]:
+                return False
+            if "$lt" in condition and not (value is not None and value < condition["$lt"]):
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class FakeJobs:
+    """The recommendation_jobs collection, for the queries the job queue issues"""
+
+    def __init__(self, documents=()):
+        self.documents = [dict(document) for document in documents]
+
+    def _find(self, query):
+        return next((document for document in self.documents if matches(document, query)), None)
+
+    async def insert_one(self, document):
+        self.documents.append(dict(document))
+
+    async def find_one(self, query, projection=None):
+        document = self._find(query)
+        return dict(document) if document else None
+
+    async def find_one_and_update(self, query, update, projection=None):
+        document = self._find(query)
+        if document is None:
+            return None
+        before = dict(document)
+        document.update(update["$set"])
+        return before
+
+    async def update_one(self, query, update):
+        document = self._find(query)
+        if document is not None:
+            document.update(update["$set"])
+
+    async def update_many(self, query, update):
+        matched = [document for document in self.documents if matches(document, query)]
+        for document in matched:
+            document.update(update["$set"])
+        return SimpleNamespace(modified_count=len(matched))
+
+    def status(self, job_id):
+        return self._find({"id": job_id})["status"]
+
+
+def job(job_id, status, age_seconds):
+    return {"id": job_id, "assessment_id": f"a-{job_id}", "user_id": "u1", "status": status,
+            "result": None, "error": None, "updated_at": datetime.utcnow() - timedelta(seconds=age_seconds)}
+
+
+def queue(collection, handler, **options):
+    return RecommendationJobQueue(collection, handler, **{"workers": 1, "poll_interval": 0.01, **options})
+
+
+async def quick(assessment_id, user_id):
+    return {"careers": [assessment_id]}
+
+
+def test_stop_drains_queued_jobs_before_the_deadline():
+    async def scenario():
+        collection = FakeJobs()
+        jobs = queue(collection, quick, drain_seconds=5)
+        await jobs.start()
+        submitted = [await jobs.submit(f"a{i}", "u1") for i in range(3)]
+        await jobs.stop()
+        return [collection.status(job["id"]) for job in submitted]
+
+    assert asyncio.run(scenario()) == [COMPLETED] * 3
+
+
+def test_stop_past_the_deadline_fails_running_and_unstarted_jobs():
+    async def scenario():
+        collection = FakeJobs()
+        started = asyncio.Event()
+
+        async def stuck(assessment_id, user_id):
+            started.set()
+            await asyncio.sleep(60)
+
+        jobs = queue(collection, stuck, drain_seconds=0.05)
+        await jobs.start()
+        running = await jobs.submit("a1", "u1")
+        unstarted = await jobs.submit("a2", "u1")
+        await started.wait()
+        await jobs.stop()
+        return [collection._find({"id": j["id"]}) for j in (running, unstarted)]
+
+    running, unstarted = asyncio.run(scenario())
+    assert (running["status"], running["error"]) == (FAILED, INTERRUPTED_ERROR)
+    assert (unstarted["status"], unstarted["error"]) == (FAILED, INTERRUPTED_ERROR)
+
+
+def test_submit_is_refused_once_stopping():
+    async def scenario():
+        jobs = queue(FakeJobs(), quick)
+        await jobs.start()
+        await jobs.stop()
+        try:
+            await jobs.submit("a1", "u1")
+        except Exception as e:
+            return type(e).__name__
+
+    assert asyncio.run(scenario()) == "JobQueueFull"
+
+
+def test_start_requeues_stale_queued_jobs_and_fails_stale_running_ones():
+    async def scenario():
+        collection = FakeJobs([
+            job("stale-queued", QUEUED, 600),
+            job("stale-running", RUNNING, 600),
+            job("fresh-queued", QUEUED, 5),
+            job("fresh-running", RUNNING, 5),
+        ])
+        jobs = queue(collection, quick, stale_seconds=300)
+        report = await jobs.recover_stale()
+        await jobs.start()
+        await jobs.stop()
+        return report, {document["id"]: document["status"] for document in collection.documents}
+
+    report, statuses = asyncio.run(scenario())
+    assert report == {"requeued": 1, "failed": 1}
+    assert statuses == {
+        "stale-queued": COMPLETED,
+        "stale-running": FAILED,
+        # Possibly still owned by a live process
+        "fresh-queued": QUEUED,
+        "fresh-running": RUNNING,
+    }
+
+
+def test_wait_polls_mongo_for_jobs_without_a_local_event():
+    async def scenario():
+        collection = FakeJobs([job("elsewhere", RUNNING, 1)])
+        jobs = queue(collection, quick)
+
+        async def finish_elsewhere():
+            await asyncio.sleep(0.05)
+            await collection.update_one({"id": "elsewhere"}, {"$set": {"status": COMPLETED, "result": {"ok": 1}}})
+
+        finisher = asyncio.create_task(finish_elsewhere())
+        result = await jobs.wait("elsewhere", timeout=2)
+        await finisher
+        return result
+
+    result = asyncio.run(scenario())
+    assert (result["status"], result["result"]) == (COMPLETED, {"ok": 1})
+
+
+def test_wait_returns_the_current_state_at_the_timeout():
+    async def scenario():
+        jobs = queue(FakeJobs([job("slow", RUNNING, 1)]), quick)
+        return await jobs.wait("slow", timeout=0.05)
+
+    assert asyncio.run(scenario())["status"] == RUNNING
@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from slots import DaySlots, InvalidSlot, SlotEngine, SlotUnavailable, normalize_date, slot_minutes
+
+DATE = "2026-11-02"
+TEN_AM = slot_minutes("10:00 AM")
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    async def to_list(self, length):
+        return list(self.documents)
+
+
+class FakeReservations:
+    """Reservations with the unique (date, slot, counsellor_id) index; taken_elsewhere
+    holds rows another worker inserted after our day index was built"""
+
+    def __init__(self, taken_elsewhere=()):
+        self.rows = {}
+        self.taken_elsewhere = set(taken_elsewhere)
+
+    def find(self, query, projection=None):
+        return FakeCursor([row for row in self.rows.values() if row["date"] == query["date"]])
+
+    async def insert_one(self, document):
+        key = (document["date"], document["slot"], document["counsellor_id"])
+        if key in self.rows or key in self.taken_elsewhere:
+            raise DuplicateKeyError("E11000 duplicate key error")
+        self.rows[key] = document
+
+    async def delete_one(self, query):
+        self.rows.pop((query["date"], query["slot"], query["counsellor_id"]), None)
+
+
+def engine(reservations, counsellors=3):
+    return SlotEngine(counsellors=None, reservations=reservations, default_count=counsellors)
+
+
+def test_day_slots_claims_each_counsellor_once():
+    day = DaySlots([(TEN_AM, "c2"), (TEN_AM, "c1"), (TEN_AM + 60, "c1")])
+    assert day.claim(TEN_AM) == "c1"
+    assert day.claim(TEN_AM) == "c2"
+    assert day.claim(TEN_AM) is None
+    assert day.counts() == {TEN_AM + 60: 1}
+
+
+def test_day_slots_release_returns_the_slot_once():
+    day = DaySlots([(TEN_AM, "c1")])
+    assert day.claim(TEN_AM) == "c1"
+    day.release(TEN_AM, "c1")
+    day.release(TEN_AM, "c1")
+    assert day.free == [(TEN_AM, "c1")]
+    assert day.claim(TEN_AM) == "c1"
+
+
+def test_reserve_moves_to_the_next_counsellor_on_duplicate_key():
+    reservations = FakeReservations(taken_elsewhere={(DATE, TEN_AM, "counsellor-1")})
+    slots = engine(reservations)
+
+    counsellor_id = asyncio.run(slots.reserve(DATE, "10:00 AM", "booking-1", "user-1"))
+
+    assert counsellor_id == "counsellor-2"
+    assert slots.stats()["conflicts"] == 1
+    assert set(reservations.rows) == {(DATE, TEN_AM, "counsellor-2")}
+
+
+def test_reserve_raises_when_every_counsellor_is_taken():
+    taken = {(DATE, TEN_AM, f"counsellor-{i}") for i in (1, 2)}
+    slots = engine(FakeReservations(taken_elsewhere=taken), counsellors=2)
+
+    with pytest.raises(SlotUnavailable):
+        asyncio.run(slots.reserve(DATE, "10:00 AM", "booking-1", "user-1"))
+    assert slots.stats()["conflicts"] == 2
+
+
+def test_release_frees_the_counsellor_again():
+    async def scenario():
+        slots = engine(FakeReservations(), counsellors=1)
+        first = await slots.reserve(DATE, "10:00 AM", "booking-1", "user-1")
+        with pytest.raises(SlotUnavailable):
+            await slots.reserve(DATE, "10:00 AM", "booking-2", "user-2")
+        await slots.release(DATE, "10:00 AM", first)
+        return await slots.reserve(DATE, "10:00 AM", "booking-3", "user-3")
+
+    assert asyncio.run(scenario()) == "counsellor-1"
+
+
+def test_reserve_rejects_times_no_counsellor_offers():
+    with pytest.raises(InvalidSlot):
+        asyncio.run(engine(FakeReservations()).reserve(DATE, "9:15 PM", "booking-1", "user-1"))
+
+
+def test_unpadded_dates_reserve_the_same_day():
+    async def scenario():
+        reservations = FakeReservations()
+        slots = engine(reservations, counsellors=1)
+        await slots.reserve(DATE, "10:00 AM", "booking-1", "user-1")
+        with pytest.raises(SlotUnavailable):
+            await slots.reserve("2026-11-2", "10:00 AM", "booking-2", "user-2")
+        # A worker that indexes the day from reservations sees it taken too
+        other_worker = engine(reservations, counsellors=1)
+        with pytest.raises(SlotUnavailable):
+            await other_worker.reserve("2026-11-2", "10:00 AM", "booking-3", "user-3")
+        availability = await other_worker.availability("2026-11-2")
+        return reservations, availability
+
+    reservations, availability = asyncio.run(scenario())
+    assert set(reservations.rows) == {(DATE, TEN_AM, "counsellor-1")}
+    assert {"time": "10:00 AM", "available": 0} in availability
+    assert normalize_date("2026-1-5") == "2026-01-05"
@@ -0,0 +1,103 @@
+import asyncio
+
+from write_behind import WriteBehindBuffer
+
+
+class FakeCollection:
+    name = "audit_events"
+
+    def __init__(self):
+        self.batches = []
+        self.fail_next = 0
+
+    async def insert_many(self, documents, ordered=True):
+        if self.fail_next:
+            self.fail_next -= 1
+            raise ConnectionError("primary stepped down")
+        self.batches.append([document["n"] for document in documents])
+
+    async def insert_one(self, document):
+        self.batches.append([document["n"]])
+
+
+def docs(start, count):
+    return [{"n": n} for n in range(start, start + count)]
+
+
+async def eventually(condition, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.005)
+
+
+def test_flushes_as_soon_as_a_batch_is_full():
+    async def scenario():
+        collection = FakeCollection()
+        # Long interval: only the batch size can trigger this flush
+        buffer = WriteBehindBuffer(collection, max_batch=3, flush_interval=30)
+        buffer.start()
+        for document in docs(0, 3):
+            await buffer.add(document)
+        await eventually(lambda: collection.batches)
+        await buffer.stop()
+        return collection.batches
+
+    assert asyncio.run(scenario()) == [[0, 1, 2]]
+
+
+def test_flushes_a_partial_batch_after_the_interval():
+    async def scenario():
+        collection = FakeCollection()
+        buffer = WriteBehindBuffer(collection, max_batch=100, flush_interval=0.02)
+        buffer.start()
+        for document in docs(0, 2):
+            await buffer.add(document)
+        assert collection.batches == []
+        await eventually(lambda: collection.batches)
+        pending = len(buffer)
+        await buffer.stop()
+        return collection.batches, pending
+
+    assert asyncio.run(scenario()) == ([[0, 1]], 0)
+
+
+def test_failed_insert_keeps_the_batch_visible_and_retries_it():
+    async def scenario():
+        collection = FakeCollection()
+        collection.fail_next = 1
+        buffer = WriteBehindBuffer(collection, max_batch=10, flush_interval=30)
+        for document in docs(0, 2):
+            await buffer.add(document)
+
+        assert await buffer.flush() is False
+        still_pending = [document["n"] for document in buffer.pending(lambda document: True)]
+        assert await buffer.flush() is True
+        return still_pending, collection.batches, len(buffer)
+
+    assert asyncio.run(scenario()) == ([0, 1], [[0, 1]], 0)
+
+
+def test_stop_drains_everything_buffered():
+    async def scenario():
+        collection = FakeCollection()
+        buffer = WriteBehindBuffer(collection, max_batch=2, flush_interval=30)
+        buffer.start()
+        for document in docs(0, 5):
+            await buffer.add(document)
+        await buffer.stop()
+        return [n for batch in collection.batches for n in batch], len(buffer)
+
+    assert asyncio.run(scenario()) == ([0, 1, 2, 3, 4], 0)
+
+
+def test_disabled_buffer_writes_through():
+    async def scenario():
+        collection = FakeCollection()
+        buffer = WriteBehindBuffer(collection, enabled=False)
+        buffer.start()
+        await buffer.add({"n": 7})
+        await buffer.stop()
+        return collection.batches
+
+    assert asyncio.run(scenario()) == [[7]]